@@ -34,13 +34,54 @@ def create_app(config_name=None):
         app.config.from_object(config_class)
         config_class.init_app(app)
     
+    # Catálogo precalculado (registros, índice por id y JSON de la API)
+    from app.data.catalog import init_catalog
+    init_catalog(app)
+    
+    # Assets con huella de contenido (asset_url en las plantillas)
+    from app.assets import init_assets
+    init_assets(app)
+    
     # Registrar blueprints
     from app.blueprints.pokeneas import pokeneas_bp
     app.register_blueprint(pokeneas_bp)
     
-    # Ruta de salud para verificar que la app está corriendo
+    # Imágenes desde la caché local (/img/<key>)
+    from app.blueprints.images import images_bp
+    app.register_blueprint(images_bp)
+    
+    # Miniaturas (/thumb/<size>/<key>, srcset y `flask thumbnails generate`)
+    from app.services.thumbnails import init_thumbnails
+    init_thumbnails(app)
+    
+    # Métricas Prometheus (/metrics)
+    if app.config.get('METRICS_ENABLED', True):
+        from app.metrics import init_metrics
+        init_metrics(app)
+    
+    # Cabecera Server-Timing por etapas
+    if app.config.get('SERVER_TIMING_ENABLED', True):
+        from app.timing import init_timing
+        init_timing(app)
+    
+    # Compresión gzip/brotli de HTML y JSON
+    if app.config.get('COMPRESSION_ENABLED', True):
+        from app.compression import init_compression
+        init_compression(app)
+    
+    # Comandos `flask pokeneas ...` y verificación opcional del catálogo
+    from app.cli import pokeneas_cli, verify_on_startup
+    app.cli.add_command(pokeneas_cli)
+    verify_on_startup(app)
+    
+    # Ruta de salud para verificar que la app está corriendo. La app sigue
+    # sirviendo con S3 caído, así que el circuito se informa sin cambiar el 200
     @app.route('/health')
     def health():
-        return {'status': 'healthy'}, 200
+        body = {'status': 'healthy'}
+        s3_client = app.extensions.get('s3_client')
+        if s3_client is not None:
+            body['s3_circuit'] = s3_client.breaker.stats()
+        return body, 200
     
     return app
@@ -0,0 +1,219 @@
+"""
+Assets estáticos con huella de contenido (fingerprinting).
+
+Al crear la aplicación se calcula el hash de cada archivo de static/ y
+las plantillas enlazan a css/base.<hash>.css vía `asset_url`. Como la
+URL cambia con el contenido, esas respuestas se sirven con
+`Cache-Control: immutable` y un año de vigencia. Si existen hermanos
+precomprimidos con la misma huella (base.<hash>.css.br,
+base.<hash>.css.gz) se sirven directamente; los de un contenido anterior
+no coinciden con la URL y se ignoran.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+import click
+from flask import abort, current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se generan .gz
+    brotli = None
+
+# Extensiones que vale la pena precomprimir
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.json', '.txt', '.xml')
+
+# Sufijo de archivo de cada codificación, en orden de preferencia
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def fingerprint(filename: str, body: bytes, hash_length: int = 12) -> str:
+    """
+    Nombre con huella de un archivo (css/base.css → css/base.<hash>.css).
+    
+    Args:
+        filename: Ruta o nombre del archivo
+        body: Contenido del archivo
+        hash_length: Caracteres del hash incluidos en el nombre
+    
+    Returns:
+        Nombre con la huella antes de la extensión
+    """
+    digest = hashlib.sha1(body).hexdigest()[:hash_length]
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{digest}{ext}"
+
+
+class AssetManifest:
+    """Mapa entre rutas originales de static/ y sus rutas con huella."""
+    
+    def __init__(self, static_folder: str, hash_length: int = 12):
+        """
+        Recorre static/ y calcula la huella de cada archivo.
+        
+        Args:
+            static_folder: Carpeta de archivos estáticos
+            hash_length: Caracteres del hash incluidos en el nombre
+        """
+        self.static_folder = static_folder
+        self.fingerprinted: Dict[str, str] = {}
+        self.originals: Dict[str, str] = {}
+        if not static_folder or not os.path.isdir(static_folder):
+            return
+        
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    hashed = fingerprint(filename, f.read(), hash_length)
+                self.fingerprinted[filename] = hashed
+                self.originals[hashed] = filename
+    
+    def resolve(self, hashed: str) -> Optional[str]:
+        """Retorna la ruta original de una ruta con huella (None si no existe)."""
+        return self.originals.get(hashed)
+
+
+def precompress_folder(folder: str, min_size: int = 500, hash_length: int = 12) -> int:
+    """
+    Genera hermanos .gz (y .br si brotli está disponible) para los assets.
+    
+    Los hermanos llevan la huella del contenido comprimido (base.css →
+    base.<hash>.css.gz) y se borran los de huellas anteriores, así que un
+    archivo editado después de precomprimir nunca se sirve con el cuerpo viejo.
+    
+    Args:
+        folder: Carpeta de archivos estáticos
+        min_size: Tamaño mínimo en bytes para comprimir
+        hash_length: Caracteres del hash (el mismo que usa AssetManifest)
+    
+    Returns:
+        Número de archivos generados
+    """
+    written = 0
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                body = f.read()
+            if len(body) < min_size:
+                continue
+            hashed = os.path.join(root, fingerprint(name, body, hash_length))
+            stem, ext = os.path.splitext(name)
+            stale = re.compile(rf"{re.escape(stem)}\.[0-9a-f]{{{hash_length}}}{re.escape(ext)}\.(gz|br)")
+            for sibling in files:
+                if stale.fullmatch(sibling) and not os.path.join(root, sibling).startswith(hashed):
+                    os.remove(os.path.join(root, sibling))
+            
+            variants = {'.gz': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(body, quality=11)
+            for suffix, data in variants.items():
+                # Solo vale la pena si ahorra bytes
+                if len(data) < len(body):
+                    with open(hashed + suffix, 'wb') as f:
+                        f.write(data)
+                    written += 1
+    return written
+
+
+def get_asset_manifest() -> AssetManifest:
+    """Obtiene el manifiesto de assets de la aplicación actual."""
+    return current_app.extensions['asset_manifest']
+
+
+def asset_url(filename: str) -> str:
+    """
+    URL de un archivo de static/ con su huella de contenido.
+    
+    Args:
+        filename: Ruta relativa a static/ (p. ej. 'css/base.css')
+    
+    Returns:
+        URL con huella, o la URL estática normal si el archivo no está en el manifiesto
+    """
+    hashed = get_asset_manifest().fingerprinted.get(filename)
+    if hashed is None:
+        return url_for('static', filename=filename)
+    return url_for('assets', filename=hashed)
+
+
+def serve_asset(filename: str):
+    """
+    Sirve un asset con huella con caché inmutable de larga duración.
+    
+    Prefiere un hermano precomprimido con la misma huella si el cliente lo acepta.
+    """
+    manifest = get_asset_manifest()
+    original = manifest.resolve(filename)
+    if original is None:
+        abort(404)
+    
+    max_age = current_app.config.get('ASSETS_MAX_AGE', 31536000)
+    accepted = request.accept_encodings
+    response = None
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+        if accepted[encoding] and os.path.isfile(os.path.join(manifest.static_folder, filename + suffix)):
+            response = send_from_directory(
+                manifest.static_folder, filename + suffix,
+                mimetype=mimetypes.guess_type(original)[0] or 'application/octet-stream',
+                max_age=max_age
+            )
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(manifest.static_folder, original, max_age=max_age)
+    
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = f"public, max-age={max_age}, immutable"
+    return response
+
+
+# Comandos `flask assets ...`
+assets_cli = AppGroup('assets', help='Gestión de los archivos estáticos.')
+
+
+@assets_cli.command('precompress')
+def precompress_command():
+    """Genera los hermanos .gz/.br de los archivos de static/."""
+    written = precompress_folder(current_app.static_folder)
+    click.echo(f"{written} archivos precomprimidos generados")
+
+
+@assets_cli.command('manifest')
+def manifest_command():
+    """Muestra las rutas con huella de cada archivo de static/."""
+    for filename, hashed in sorted(get_asset_manifest().fingerprinted.items()):
+        click.echo(f"{filename} -> {hashed}")
+
+
+def init_assets(app):
+    """
+    Calcula el manifiesto de huellas y registra la ruta de assets.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    app.extensions['asset_manifest'] = AssetManifest(
+        app.static_folder if app.config.get('ASSETS_FINGERPRINT', True) else None
+    )
+    prefix = app.static_url_path or '/static'
+    app.add_url_rule(f"{prefix}/assets/<path:filename>", 'assets', serve_asset)
+    app.add_template_global(asset_url)
+    app.cli.add_command(assets_cli)
+
+
+if __name__ == '__main__':
+    # Paso de build sin aplicación: python -m app.assets [carpeta]
+    import sys
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), '..', 'static')
+    print(f"{precompress_folder(folder)} archivos precomprimidos generados")
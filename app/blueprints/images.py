@@ -0,0 +1,77 @@
+"""
+Blueprint de imágenes - /img/<key> servido desde la caché local.
+"""
+import os
+from flask import Blueprint, Response, current_app, jsonify, send_file
+from app.services.thumbnails import IMAGE_EXTENSIONS
+from app.storage.blob_cache import get_blob_cache
+from app.storage.circuit_breaker import CircuitOpenError
+from app.timing import span
+
+# Crear blueprint
+images_bp = Blueprint('images', __name__)
+
+
+@images_bp.route('/img/<path:key>', methods=['GET'])
+def get_image(key):
+    """
+    Sirve un objeto del bucket desde la caché local en disco.
+    
+    El primer acceso lo descarga de S3. Los aciertos se envían con
+    send_file (sendfile vía wsgi.file_wrapper, con Range y ETag) o, si
+    IMAGE_ACCEL_REDIRECT_PREFIX está definido, delegando el envío a nginx
+    con X-Accel-Redirect.
+    
+    Solo se sirven imágenes y solo con IMAGE_PROXY_ENABLED: la ruta no
+    debe exponer el resto del bucket (p. ej. uno privado en modo presignado).
+    
+    Returns:
+        Contenido del objeto con ETag (su SHA-256) e IMAGE_CACHE_CONTROL
+    """
+    if not current_app.config.get('IMAGE_PROXY_ENABLED', False) or not key.lower().endswith(IMAGE_EXTENSIONS):
+        return jsonify({
+            "error": "Imagen no encontrada",
+            "message": f"No existe el objeto {key}"
+        }), 404
+    
+    try:
+        blob_cache = get_blob_cache()
+        with span('blob'):
+            entry = blob_cache.get(key)
+        if entry is None:
+            return jsonify({
+                "error": "Imagen no encontrada",
+                "message": f"No existe el objeto {key}"
+            }), 404
+        
+        cache_control = current_app.config.get('IMAGE_CACHE_CONTROL', 'public, max-age=86400')
+        accel_prefix = current_app.config.get('IMAGE_ACCEL_REDIRECT_PREFIX', '')
+        if accel_prefix:
+            # nginx resuelve Range y condicionales sobre el archivo interno
+            relative = os.path.relpath(entry.path, blob_cache.directory).replace(os.sep, '/')
+            response = Response(mimetype=entry.content_type)
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{relative}"
+            response.set_etag(entry.digest)
+        else:
+            response = send_file(
+                entry.path,
+                mimetype=entry.content_type,
+                conditional=True,
+                etag=entry.digest
+            )
+        response.headers['Cache-Control'] = cache_control
+        return response
+    except CircuitOpenError as e:
+        response = jsonify({
+            "error": "S3 no disponible",
+            "message": str(e)
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+        return response
+    except Exception as e:
+        current_app.logger.error(f"Error en /img/{key}: {e}")
+        return jsonify({
+            "error": "Error al obtener la imagen",
+            "message": str(e)
+        }), 500
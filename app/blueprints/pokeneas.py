@@ -1,27 +1,62 @@
 """
 Blueprint de Pokeneas - Rutas principales de la aplicación.
 """
-from flask import Blueprint, jsonify, render_template, render_template_string, current_app
-import boto3
-import os
+import base64
+import hashlib
+import re
+from flask import (
+    Blueprint, Response, jsonify, make_response, render_template,
+    render_template_string, stream_template, stream_with_context, current_app, request, url_for
+)
+from app.compression import set_compression_key
+from app.data.indexes import parse_altura
+from app.metrics import record_cache_lookup
+from app.services.page_cache import CachedPage, get_page_cache
 from app.services.pokeneas_service import get_pokeneas_service
+from app.services.sampling import UnknownProfileError
+from app.storage.bucket_index import get_bucket_index
+from app.storage.circuit_breaker import CircuitOpenError
+from app.storage.s3 import get_s3_client
+from app.timing import span
 
 # Crear blueprint
 pokeneas_bp = Blueprint('pokeneas', __name__)
 
+# Máximo de claves por página que admite list_objects_v2
+MAX_PAGE_SIZE = 1000
+
+# Prefijo de los tokens de continuación generados desde el índice del bucket
+INDEX_TOKEN_PREFIX = 'k.'
+
+# Range de /api/pokeneas/export: "items=<Pokeneas a omitir>-"
+EXPORT_RANGE_RE = re.compile(r'^items=(\d+)-$')
+
+# Parámetros que activan el modo filtro de /api/pokeneas
+FILTER_PARAMS = ('habilidad', 'altura_min', 'altura_max', 'id_min', 'id_max', 'after', 'limit')
+# Parámetros del modo aleatorio, que no se combinan con los de filtro
+BATCH_PARAMS = ('count', 'replace', 'seed', 'profile')
+
 
 @pokeneas_bp.route('/api/pokenea', methods=['GET'])
 def get_pokenea_api():
     """
     Endpoint API que retorna un Pokenea aleatorio en formato JSON.
     
+    El cuerpo se toma ya serializado del catálogo precalculado.
+    
+    Query params:
+        profile: Perfil de selección por rareza (default: RARITY_DEFAULT_PROFILE)
+    
     Returns:
         JSON con: id, nombre, altura, habilidad, container_id
     """
     try:
         service = get_pokeneas_service()
-        pokenea_data = service.get_pokenea_for_api()
-        return jsonify(pokenea_data), 200
+        with span('service'):
+            body = service.get_pokenea_api_payload(request.args.get('profile'))
+        return Response(body, mimetype='application/json'), 200
+    except UnknownProfileError as e:
+        return _unknown_profile(e)
     except Exception as e:
         current_app.logger.error(f"Error en /api/pokenea: {e}")
         return jsonify({
@@ -30,17 +65,274 @@ def get_pokenea_api():
         }), 500
 
 
+@pokeneas_bp.route('/api/pokenea/<int:pokenea_id>', methods=['GET'])
+def get_pokenea_by_id_api(pokenea_id):
+    """
+    Endpoint API que retorna un Pokenea concreto en formato JSON.
+    
+    La respuesta es determinista: lleva un ETag fuerte precalculado,
+    responde 304 a If-None-Match y envía API_CACHE_CONTROL.
+    
+    Returns:
+        JSON con: id, nombre, altura, habilidad, container_id
+    """
+    try:
+        service = get_pokeneas_service()
+        with span('service'):
+            payload = service.get_pokenea_api_payload_by_id(pokenea_id)
+        if payload is None:
+            return jsonify({
+                "error": "Pokenea no encontrado",
+                "message": f"No existe un Pokenea con id {pokenea_id}"
+            }), 404
+        body, etag = payload
+        return _conditional_response(
+            body, etag, 'application/json',
+            current_app.config.get('API_CACHE_CONTROL', 'public, max-age=3600')
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error en /api/pokenea/{pokenea_id}: {e}")
+        return jsonify({
+            "error": "Error al obtener Pokenea",
+            "message": str(e)
+        }), 500
+
+
+@pokeneas_bp.route('/api/pokeneas', methods=['GET'])
+def get_pokeneas_batch_api():
+    """
+    Endpoint API que retorna varios Pokeneas aleatorios en una sola respuesta.
+    
+    Con cualquiera de FILTER_PARAMS devuelve en cambio los Pokeneas que
+    cumplen los filtros (ver _filter_pokeneas). Mezclar parámetros de
+    ambos modos (p. ej. count y limit) responde 400 en lugar de ignorar
+    los del modo aleatorio.
+    
+    Query params:
+        count: Número de Pokeneas (1 a API_BATCH_MAX_COUNT, default 1)
+        replace: "false" para no repetir Pokeneas (default "true")
+        seed: Semilla opcional para obtener resultados reproducibles
+        profile: Perfil de selección por rareza; los ponderados requieren replace=true
+    
+    Returns:
+        JSON con: count y pokeneas (lista con el formato de /api/pokenea)
+    """
+    filters = [name for name in FILTER_PARAMS if name in request.args]
+    if filters:
+        batch = [name for name in BATCH_PARAMS if name in request.args]
+        if batch:
+            return jsonify({
+                "error": "Parámetros incompatibles",
+                "message": f"{', '.join(batch)} no se combina con los filtros ({', '.join(filters)})"
+            }), 400
+        return _filter_pokeneas()
+    
+    try:
+        count = int(request.args.get('count', '1'))
+    except ValueError:
+        count = None
+    replace = request.args.get('replace', 'true').lower() not in ('0', 'false')
+    seed = request.args.get('seed')
+    profile = request.args.get('profile')
+    max_count = current_app.config.get('API_BATCH_MAX_COUNT', 1000)
+    
+    if count is None or not 1 <= count <= max_count:
+        return jsonify({
+            "error": "Parámetro count inválido",
+            "message": f"count debe estar entre 1 y {max_count}"
+        }), 400
+    
+    try:
+        service = get_pokeneas_service()
+        _, weights = service.resolve_profile(profile)
+        if not replace and weights is not None:
+            return jsonify({
+                "error": "Parámetro replace inválido",
+                "message": "Los perfiles ponderados solo admiten replace=true"
+            }), 400
+        if not replace and count > len(service.catalog):
+            return jsonify({
+                "error": "Parámetro count inválido",
+                "message": f"Sin repetición solo hay {len(service.catalog)} Pokeneas"
+            }), 400
+        with span('service'):
+            body = service.get_pokeneas_api_batch(count, replace=replace, seed=seed, profile=profile)
+        return Response(body, mimetype='application/json'), 200
+    except UnknownProfileError as e:
+        return _unknown_profile(e)
+    except Exception as e:
+        current_app.logger.error(f"Error en /api/pokeneas: {e}")
+        return jsonify({
+            "error": "Error al obtener Pokeneas",
+            "message": str(e)
+        }), 500
+
+
+@pokeneas_bp.route('/api/pokeneas/search', methods=['GET'])
+def search_pokeneas_api():
+    """
+    Endpoint API de búsqueda de texto sobre nombre y frase filosófica.
+    
+    Query params:
+        q: Palabras a buscar (sin distinguir mayúsculas ni tildes)
+        limit: Máximo de resultados (1 a API_BATCH_MAX_COUNT, default API_SEARCH_LIMIT)
+    
+    Returns:
+        JSON con: count y pokeneas, del más al menos relevante (BM25)
+    """
+    query = request.args.get('q', '').strip()
+    max_count = current_app.config.get('API_BATCH_MAX_COUNT', 1000)
+    try:
+        limit = int(request.args.get('limit', current_app.config.get('API_SEARCH_LIMIT', 10)))
+    except ValueError:
+        limit = None
+    
+    if not query:
+        return jsonify({
+            "error": "Parámetro q requerido",
+            "message": "Indica las palabras a buscar en q"
+        }), 400
+    if limit is None or not 1 <= limit <= max_count:
+        return jsonify({
+            "error": "Parámetro limit inválido",
+            "message": f"limit debe estar entre 1 y {max_count}"
+        }), 400
+    
+    try:
+        service = get_pokeneas_service()
+        with span('service'):
+            body = service.search_pokeneas_api(query, limit)
+        return Response(body, mimetype='application/json'), 200
+    except Exception as e:
+        current_app.logger.error(f"Error en /api/pokeneas/search: {e}")
+        return jsonify({
+            "error": "Error al buscar Pokeneas",
+            "message": str(e)
+        }), 500
+
+
+@pokeneas_bp.route('/api/pokeneas/export', methods=['GET'])
+def export_pokeneas_api():
+    """
+    Endpoint que transmite el catálogo completo como NDJSON.
+    
+    Una línea por Pokenea, en orden de id, con todos sus campos,
+    imagen_url y container_id. Las URLs se resuelven por lotes de
+    EXPORT_BATCH_SIZE mientras se envía la respuesta.
+    
+    Una descarga interrumpida se reanuda con ?after=<último id recibido>
+    o con la cabecera "Range: items=<líneas recibidas>-" (responde 206).
+    
+    Query params:
+        after: Id del último Pokenea ya recibido
+    """
+    try:
+        after = int(request.args['after']) if 'after' in request.args else None
+    except ValueError:
+        return jsonify({
+            "error": "Parámetro after inválido",
+            "message": "after debe ser el id de un Pokenea"
+        }), 400
+    
+    service = get_pokeneas_service()
+    start = None
+    range_header = request.headers.get('Range')
+    if range_header:
+        match = EXPORT_RANGE_RE.match(range_header.strip())
+        start = int(match.group(1)) if match else None
+    catalog, first, total = service.export_range(after, start)
+    
+    if range_header and (start is None or (start >= total and total)):
+        response = jsonify({
+            "error": "Rango inválido",
+            "message": f"Usa Range: items=<n>- con n menor que {total}"
+        })
+        response.status_code = 416
+        response.headers['Content-Range'] = f"items */{total}"
+        return response
+    
+    body = service.iter_export(
+        catalog, first, current_app.json.dumps,
+        batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 500)
+    )
+    response = Response(stream_with_context(body), mimetype='application/x-ndjson')
+    response.headers['Accept-Ranges'] = 'items'
+    if range_header:
+        response.status_code = 206
+        response.headers['Content-Range'] = f"items {first}-{max(first, total - 1)}/{total}"
+    return response
+
+
+def _filter_pokeneas():
+    """
+    Modo filtro de /api/pokeneas, resuelto con los índices del catálogo.
+    
+    Query params:
+        habilidad: Habilidad exacta (sin distinguir mayúsculas ni tildes)
+        altura_min, altura_max: Rango de altura ("0.3", "0.3m" o "30cm")
+        id_min, id_max: Rango de ids
+        after: Valor de next_after de la página anterior
+        limit: Pokeneas por página (1 a API_BATCH_MAX_COUNT, default API_FILTER_PAGE_SIZE)
+    
+    Returns:
+        JSON con: count, pokeneas (ordenados por id) y next_after
+    """
+    args = request.args
+    max_count = current_app.config.get('API_BATCH_MAX_COUNT', 1000)
+    try:
+        filters = {
+            name: int(args[name]) for name in ('id_min', 'id_max') if name in args
+        }
+        for name in ('altura_min', 'altura_max'):
+            if name in args:
+                filters[name] = parse_altura(args[name])
+                if filters[name] is None:
+                    raise ValueError(f"{name} debe ser una altura como 0.3 o 0.3m")
+        if 'habilidad' in args:
+            filters['habilidad'] = args['habilidad']
+        after = int(args['after']) if 'after' in args else None
+        limit = int(args.get('limit', current_app.config.get('API_FILTER_PAGE_SIZE', 50)))
+        if not 1 <= limit <= max_count:
+            raise ValueError(f"limit debe estar entre 1 y {max_count}")
+    except ValueError as e:
+        return jsonify({
+            "error": "Parámetro de filtro inválido",
+            "message": str(e)
+        }), 400
+    
+    try:
+        service = get_pokeneas_service()
+        with span('service'):
+            body = service.filter_pokeneas_api(limit, after=after, **filters)
+        return Response(body, mimetype='application/json'), 200
+    except Exception as e:
+        current_app.logger.error(f"Error en /api/pokeneas (filtro): {e}")
+        return jsonify({
+            "error": "Error al obtener Pokeneas",
+            "message": str(e)
+        }), 500
+
+
 @pokeneas_bp.route('/pokenea', methods=['GET'])
 def get_pokenea_view():
     """
     Endpoint que renderiza la vista HTML con un Pokenea aleatorio.
     
-    Muestra: imagen, frase filosófica y container_id
+    Muestra: imagen, frase filosófica y container_id. Acepta ?profile= como
+    /api/pokenea.
     """
     try:
         service = get_pokeneas_service()
-        pokenea_data = service.get_pokenea_for_view()
-        return render_template('pokenea.html', pokenea=pokenea_data), 200
+        with span('service'):
+            pokenea = service.get_random_pokenea(request.args.get('profile'))
+        page = _render_pokenea_page(service, pokenea)
+        set_compression_key(page.etag)
+        return Response(page.body, mimetype='text/html'), 200
+    except UnknownProfileError as e:
+        return render_template(
+            'error.html',
+            error_message=f"Perfil desconocido: {e}"
+        ), 400
     except Exception as e:
         current_app.logger.error(f"Error en /pokenea: {e}")
         return render_template(
@@ -49,6 +341,83 @@ def get_pokenea_view():
         ), 500
 
 
+@pokeneas_bp.route('/pokenea/<int:pokenea_id>', methods=['GET'])
+def get_pokenea_by_id_view(pokenea_id):
+    """
+    Endpoint que renderiza la vista HTML de un Pokenea concreto.
+    
+    Usa el ETag de la página cacheada (cambia si rota la URL de la imagen)
+    y envía VIEW_CACHE_CONTROL.
+    """
+    try:
+        service = get_pokeneas_service()
+        with span('service'):
+            pokenea = service.get_pokenea_by_id(pokenea_id)
+        if pokenea is None:
+            return render_template(
+                'error.html',
+                error_message=f"No existe un Pokenea con id {pokenea_id}"
+            ), 404
+        page = _render_pokenea_page(service, pokenea)
+        return _conditional_response(
+            page.body, page.etag, 'text/html',
+            current_app.config.get('VIEW_CACHE_CONTROL', 'public, max-age=300')
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error en /pokenea/{pokenea_id}: {e}")
+        return render_template(
+            'error.html',
+            error_message="Error al cargar el Pokenea"
+        ), 500
+
+
+def _unknown_profile(error: UnknownProfileError):
+    """Respuesta 400 de la API para un perfil de selección no configurado."""
+    return jsonify({
+        "error": "Perfil desconocido",
+        "message": f"No existe el perfil {error}"
+    }), 400
+
+
+def _render_pokenea_page(service, pokenea) -> CachedPage:
+    """
+    Obtiene la página HTML de un Pokenea, desde la caché si es posible.
+    
+    La página renderizada se reutiliza mientras no cambie la URL de la imagen.
+    """
+    with span('storage'):
+        image_url = service.resolve_image_url(pokenea.imagen)
+    
+    page_cache = get_page_cache()
+    with span('cache'):
+        page = page_cache.get(pokenea, image_url) if page_cache is not None else None
+    if page is None:
+        pokenea_data = service.format_for_view(pokenea, image_url)
+        with span('render'):
+            body = render_template('pokenea.html', pokenea=pokenea_data).encode('utf-8')
+        if page_cache is not None:
+            page = page_cache.set(pokenea, image_url, body)
+        else:
+            page = CachedPage(image_url, body)
+    return page
+
+
+def _conditional_response(body: bytes, etag: str, mimetype: str, cache_control: str) -> Response:
+    """
+    Construye una respuesta cacheable que honra If-None-Match con 304.
+    
+    La comparación es débil: el cliente puede devolver el ETag débil de
+    una variante comprimida.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
 @pokeneas_bp.route('/', methods=['GET'])
 def index():
     """Ruta principal que redirige a la vista de Pokenea."""
@@ -58,19 +427,20 @@ def index():
 @pokeneas_bp.route('/imagenes', methods=['GET'])
 def mostrar_imagenes():
     """
-    Endpoint que muestra todas las imágenes almacenadas en S3.
+    Endpoint que muestra las imágenes almacenadas en S3.
     
-    Retorna una página HTML con todas las imágenes del bucket S3.
+    Si el índice del bucket ya tiene una foto, la página se sirve desde
+    memoria (con ETag y 304); si no, se lista S3 en vivo.
+    
+    Query params:
+        prefix: Prefijo de las claves a listar
+        page_size: Imágenes por página (1-1000)
+        continuation_token: Token de la página a mostrar
+        all: Si es "true", transmite el bucket completo a medida que llegan las páginas
+    
+    Retorna una página HTML con las imágenes del bucket S3.
     """
     try:
-        # Obtener credenciales de S3 desde la configuración
-        s3 = boto3.client(
-            "s3",
-            aws_access_key_id=current_app.config.get('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=current_app.config.get('AWS_SECRET_ACCESS_KEY'),
-            region_name=current_app.config.get('S3_REGION', 'us-east-1')
-        )
-        
         S3_BUCKET = current_app.config.get('S3_BUCKET')
         
         if not S3_BUCKET:
@@ -78,78 +448,157 @@ def mostrar_imagenes():
                 "<h1>Error</h1><p>Bucket S3 no configurado</p>"
             ), 500
         
-        # Obtener la lista de objetos (archivos) del bucket
-        objects = s3.list_objects_v2(Bucket=S3_BUCKET)
+        prefix = request.args.get('prefix', '')
+        page_size = request.args.get(
+            'page_size',
+            default=current_app.config.get('IMAGENES_PAGE_SIZE', MAX_PAGE_SIZE),
+            type=int
+        )
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        stream_all = request.args.get('all', '').lower() in ('1', 'true')
+        continuation_token = request.args.get('continuation_token')
+        start_after = _decode_index_token(continuation_token)
+        
+        bucket_index = get_bucket_index()
+        snapshot = bucket_index.snapshot if bucket_index is not None else None
+        
+        # Los tokens opacos de S3 solo se pueden continuar contra S3
+        from_index = snapshot is not None and (not continuation_token or start_after is not None)
+        if bucket_index is not None:
+            record_cache_lookup('bucket_index', from_index)
+        if from_index:
+            return _render_imagenes_from_snapshot(
+                snapshot, S3_BUCKET, prefix, page_size, stream_all, start_after
+            )
+        
+        s3_client = get_s3_client()
+        
+        if stream_all:
+            # Modo bucket completo: el HTML se envía a medida que llegan las páginas
+            images = _stream_images(s3_client, S3_BUCKET, prefix, page_size)
+            return Response(
+                stream_template('imagenes.html', images=images, next_url=None),
+                mimetype='text/html'
+            )
+        
+        with span('storage'):
+            page = s3_client.list_objects_page(
+                prefix=prefix,
+                page_size=page_size,
+                continuation_token=None if start_after is not None else continuation_token,
+                start_after=start_after
+            )
+        images = [_image_entry(S3_BUCKET, obj["Key"]) for obj in page["objects"]]
         
-        # Extraer los nombres de los archivos y construir URLs
-        image_urls = []
-        for obj in objects.get("Contents", []):
-            key = obj["Key"]
-            url = f"https://{S3_BUCKET}.s3.amazonaws.com/{key}"
-            image_urls.append(url)
+        next_url = None
+        if page["next_token"]:
+            next_url = _next_page_url(prefix, page_size, page["next_token"])
         
-        # Renderizar una plantilla HTML básica con las imágenes
-        html = """
-        <!DOCTYPE html>
-        <html lang="es">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Imágenes desde S3</title>
-            <style>
-                body {
-                    font-family: Arial, sans-serif;
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    background-color: #f5f5f5;
-                }
-                h1 {
-                    color: #333;
-                    text-align: center;
-                }
-                .image-grid {
-                    display: grid;
-                    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-                    gap: 20px;
-                    margin-top: 30px;
-                }
-                .image-card {
-                    background: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }
-                .image-card img {
-                    width: 100%;
-                    height: auto;
-                    border-radius: 4px;
-                }
-                .image-card small {
-                    display: block;
-                    margin-top: 10px;
-                    color: #666;
-                    word-break: break-all;
-                }
-            </style>
-        </head>
-        <body>
-            <h1>🖼️ Imágenes desde S3</h1>
-            <div class="image-grid">
-            {% for url in image_urls %}
-                <div class="image-card">
-                    <img src="{{ url }}" alt="Imagen S3">
-                    <small>{{ url }}</small>
-                </div>
-            {% endfor %}
-            </div>
-        </body>
-        </html>
-        """
-        return render_template_string(html, image_urls=image_urls)
+        with span('render'):
+            return render_template('imagenes.html', images=images, next_url=next_url)
         
+    except CircuitOpenError as e:
+        # Sin foto del índice no hay listado anterior que servir
+        response = make_response(render_template_string(
+            "<h1>Error</h1><p>S3 no está disponible en este momento</p>"
+        ), 503)
+        response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+        return response
     except Exception as e:
         current_app.logger.error(f"Error en /imagenes: {e}")
         return render_template_string(
             f"<h1>Error</h1><p>Error al obtener imágenes: {str(e)}</p>"
         ), 500
+
+
+def _render_imagenes_from_snapshot(snapshot, bucket: str, prefix: str, page_size: int,
+                                   stream_all: bool, start_after: str = None) -> Response:
+    """Renderiza /imagenes desde la foto del índice del bucket, sin tocar S3."""
+    etag = _imagenes_etag(snapshot, prefix, page_size, stream_all, start_after)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    if stream_all:
+        images = (_image_entry(bucket, obj.key) for obj in snapshot.iter_prefix(prefix))
+        response = Response(
+            stream_template('imagenes.html', images=images, next_url=None),
+            mimetype='text/html'
+        )
+    else:
+        with span('index'):
+            objects, last_key = snapshot.page(prefix, page_size, start_after)
+        next_url = None
+        if last_key is not None:
+            next_url = _next_page_url(prefix, page_size, _encode_index_token(last_key))
+        with span('render'):
+            response = make_response(render_template(
+                'imagenes.html',
+                images=[_image_entry(bucket, obj.key) for obj in objects],
+                next_url=next_url
+            ))
+    
+    response.set_etag(etag)
+    return response
+
+
+def _imagenes_etag(snapshot, prefix: str, page_size: int, stream_all: bool, start_after: str = None) -> str:
+    """
+    ETag de una página de /imagenes servida desde el índice.
+    
+    Combina la versión de la foto con los parámetros de la página: con solo
+    la versión, todas las páginas compartirían ETag (y variante comprimida).
+    """
+    page = f"{snapshot.etag}\0{prefix}\0{page_size}\0{int(stream_all)}\0{start_after or ''}"
+    return hashlib.sha1(page.encode('utf-8')).hexdigest()
+
+
+def _next_page_url(prefix: str, page_size: int, continuation_token: str) -> str:
+    """Construye el enlace a la página siguiente de /imagenes."""
+    return url_for(
+        '.mostrar_imagenes',
+        prefix=prefix or None,
+        page_size=page_size,
+        continuation_token=continuation_token
+    )
+
+
+def _encode_index_token(key: str) -> str:
+    """Codifica la última clave de una página del índice como token de continuación."""
+    return INDEX_TOKEN_PREFIX + base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
+
+
+def _decode_index_token(token: str):
+    """Retorna la clave codificada en un token del índice, o None si es un token de S3."""
+    if not token or not token.startswith(INDEX_TOKEN_PREFIX):
+        return None
+    try:
+        return base64.urlsafe_b64decode(token[len(INDEX_TOKEN_PREFIX):]).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _object_url(bucket: str, key: str) -> str:
+    """Construye la URL directa de un objeto del bucket."""
+    return f"https://{bucket}.s3.amazonaws.com/{key}"
+
+
+def _image_entry(bucket: str, key: str) -> dict:
+    """Entrada de la galería: clave (para las miniaturas) y URL directa."""
+    return {"key": key, "url": _object_url(bucket, key)}
+
+
+def _stream_images(s3_client, bucket: str, prefix: str, page_size: int):
+    """
+    Genera las entradas de la galería página a página.
+    
+    Como la respuesta ya empezó a enviarse, un error de S3 a mitad del
+    listado solo se registra y corta la galería.
+    """
+    try:
+        for objects in s3_client.iter_object_pages(prefix=prefix, page_size=page_size):
+            for obj in objects:
+                yield _image_entry(bucket, obj["Key"])
+    except Exception as e:
+        current_app.logger.error(f"Error transmitiendo /imagenes: {e}")
@@ -0,0 +1,62 @@
+"""
+Blueprint de miniaturas - /thumb/<size>/<key>.
+"""
+from flask import Blueprint, current_app, jsonify, redirect, send_file
+from app.services.thumbnails import (
+    UnsupportedImageError, get_thumbnail_service, parse_sizes, thumbnails_available
+)
+from app.storage.circuit_breaker import CircuitOpenError
+from app.storage.s3 import get_s3_client
+from app.timing import span
+
+# Crear blueprint
+thumbnails_bp = Blueprint('thumbnails', __name__)
+
+
+@thumbnails_bp.route('/thumb/<int:size>/<path:key>', methods=['GET'])
+def get_thumbnail(size, key):
+    """
+    Sirve la miniatura de una imagen del bucket.
+    
+    Sin Pillow (o con THUMBNAILS_ENABLED=false), o si la miniatura no está
+    en caché y el circuito de S3 está abierto, redirige al original.
+    
+    Returns:
+        JPEG de lado máximo `size`, con ETag y THUMBNAIL_CACHE_CONTROL
+    """
+    try:
+        if not thumbnails_available():
+            return redirect(get_s3_client().get_image_url(key) or '/', code=302)
+        
+        if size not in parse_sizes(current_app.config.get('THUMBNAIL_SIZES', '160,320,640')):
+            return jsonify({
+                "error": "Tamaño no soportado",
+                "message": f"Tamaños disponibles: {current_app.config.get('THUMBNAIL_SIZES')}"
+            }), 404
+        
+        with span('thumbnail'):
+            path = get_thumbnail_service().get_thumbnail(size, key)
+        if path is None:
+            return jsonify({
+                "error": "Imagen no encontrada",
+                "message": f"No existe el objeto {key}"
+            }), 404
+        
+        response = send_file(path, mimetype='image/jpeg', conditional=True)
+        response.headers['Cache-Control'] = current_app.config.get(
+            'THUMBNAIL_CACHE_CONTROL', 'public, max-age=86400'
+        )
+        return response
+    except CircuitOpenError:
+        return redirect(get_s3_client().get_image_url(key) or '/', code=302)
+    except UnsupportedImageError as e:
+        return jsonify({
+            "error": "Formato de imagen no soportado",
+            "message": str(e)
+        }), 415
+    except Exception as e:
+        current_app.logger.error(f"Error en /thumb/{size}/{key}: {e}")
+        return jsonify({
+            "error": "Error al generar la miniatura",
+            "message": str(e)
+        }), 500
@@ -0,0 +1,74 @@
+"""
+Comandos `flask pokeneas ...`.
+"""
+import json
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.services.integrity import STRATEGIES, verify_catalog
+from app.storage.s3 import get_s3_client
+
+pokeneas_cli = AppGroup('pokeneas', help='Operaciones sobre el catálogo de Pokeneas.')
+
+
+@pokeneas_cli.command('verify')
+@click.option('--strategy', type=click.Choice(STRATEGIES), default='list', show_default=True,
+              help='list: un listado paginado del bucket; head: un HEAD por clave')
+@click.option('--workers', type=int, default=None,
+              help='HEAD simultáneos (default: S3_MAX_POOL_CONNECTIONS)')
+@click.option('--output', type=click.Path(dir_okay=False), help='Archivo donde guardar el reporte')
+def verify_command(strategy, workers, output):
+    """Verifica que cada imagen del catálogo exista en el bucket."""
+    if not current_app.config.get('S3_BUCKET'):
+        raise click.ClickException("S3_BUCKET no está configurado")
+    
+    # Sin get_catalog: un comando de una sola vez no necesita el hilo de recarga
+    keys = [record.imagen for record in current_app.extensions['catalog_store'].catalog.records]
+    report = verify_catalog(
+        keys,
+        get_s3_client(),
+        strategy=strategy,
+        max_workers=workers or current_app.config.get('S3_MAX_POOL_CONNECTIONS', 10)
+    )
+    
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    click.echo(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + "\n")
+    if not report["ok"]:
+        raise SystemExit(1)
+
+
+def verify_on_startup(app):
+    """
+    Verificación opcional al arrancar (CATALOG_VERIFY_ON_STARTUP).
+    
+    'warn' registra las claves faltantes; 'strict' además impide arrancar.
+    Con preload_app se ejecuta en el master de gunicorn, así que lee el
+    catálogo del store sin arrancar su hilo de recarga (como warm_up).
+    
+    Args:
+        app: Aplicación Flask
+    """
+    mode = app.config.get('CATALOG_VERIFY_ON_STARTUP', 'off')
+    if mode == 'off' or not app.config.get('S3_BUCKET'):
+        return
+    
+    with app.app_context():
+        try:
+            keys = [record.imagen for record in app.extensions['catalog_store'].catalog.records]
+            report = verify_catalog(keys, get_s3_client())
+        except Exception as e:
+            app.logger.error(f"No se pudo verificar el catálogo: {e}")
+            if mode == 'strict':
+                raise
+            return
+    
+    if report["missing"]:
+        app.logger.warning(
+            f"{len(report['missing'])} imágenes del catálogo no existen en "
+            f"{report['bucket']}: {', '.join(report['missing'][:10])}"
+        )
+        if mode == 'strict':
+            raise RuntimeError("El catálogo referencia imágenes inexistentes en el bucket")
@@ -0,0 +1,212 @@
+"""
+Compresión de respuestas (gzip/brotli) negociada con Accept-Encoding.
+
+Las respuestas estáticas por worker (páginas cacheadas, JSON por id,
+archivos de static/) se comprimen una sola vez y la variante se guarda
+en memoria; los cuerpos transmitidos se comprimen por fragmentos.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+from flask import current_app, g, request
+from app.metrics import record_cache_lookup
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'image/svg+xml',
+])
+
+
+def available_encodings():
+    """Codificaciones soportadas, en orden de preferencia."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding() -> Optional[str]:
+    """
+    Elige la codificación según el Accept-Encoding de la petición actual.
+    
+    Returns:
+        'br', 'gzip' o None si el cliente no acepta ninguna
+    """
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(body: bytes, encoding: str, level: int = None) -> bytes:
+    """
+    Comprime un cuerpo completo.
+    
+    Args:
+        body: Cuerpo sin comprimir
+        encoding: 'br' o 'gzip'
+        level: Nivel de compresión (default: el máximo de cada algoritmo)
+    
+    Returns:
+        Cuerpo comprimido
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if level is None else level)
+    return gzip.compress(body, compresslevel=9 if level is None else level, mtime=0)
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int) -> Iterator[bytes]:
+    """
+    Comprime un cuerpo transmitido fragmento a fragmento.
+    
+    Cada fragmento se vacía del compresor para que el cliente lo reciba
+    sin esperar al final de la respuesta.
+    
+    Args:
+        chunks: Fragmentos del cuerpo original
+        encoding: 'br' o 'gzip'
+        level: Nivel de compresión
+    
+    Yields:
+        Fragmentos comprimidos
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            if chunk:
+                data = compressor.process(chunk) + compressor.flush()
+                if data:
+                    yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            if chunk:
+                data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if data:
+                    yield data
+        yield compressor.flush()
+
+
+class VariantCache:
+    """Caché LRU de variantes comprimidas, indexada por (clave, codificación)."""
+    
+    def __init__(self, max_size: int = 256):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_size: Número máximo de variantes guardadas
+        """
+        self.max_size = max_size
+        self._variants = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compress(self, key: str, encoding: str, body: bytes) -> bytes:
+        """
+        Retorna la variante comprimida, comprimiéndola solo la primera vez.
+        
+        Args:
+            key: Identificador estable del contenido (su ETag)
+            encoding: 'br' o 'gzip'
+            body: Cuerpo sin comprimir
+        
+        Returns:
+            Cuerpo comprimido
+        """
+        cache_key = (key, encoding)
+        with self._lock:
+            variant = self._variants.get(cache_key)
+            if variant is not None:
+                self._variants.move_to_end(cache_key)
+        record_cache_lookup('compression', variant is not None)
+        if variant is not None:
+            return variant
+        
+        variant = compress(body, encoding)
+        with self._lock:
+            self._variants[cache_key] = variant
+            while len(self._variants) > self.max_size:
+                self._variants.popitem(last=False)
+        return variant
+
+
+def set_compression_key(key: str):
+    """
+    Marca la respuesta actual como contenido estático identificado por `key`.
+    
+    Para respuestas sin ETag cuyo cuerpo se repite (p. ej. la página de un
+    Pokenea elegido al azar), permite reutilizar la variante comprimida.
+    
+    Args:
+        key: Identificador estable del contenido
+    """
+    g._compression_key = key
+
+
+def _compress_response(response):
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers:
+        return response
+    if response.status_code not in (200, 304):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    
+    etag, is_weak = response.get_etag()
+    if response.status_code == 304:
+        # Mismo validador que tendría la variante comprimida
+        if etag and not is_weak:
+            response.set_etag(etag, weak=True)
+        return response
+    
+    config = current_app.config
+    if response.is_streamed and not response.direct_passthrough:
+        response.response = compress_stream(
+            response.iter_encoded(), encoding, config.get('COMPRESSION_STREAM_LEVEL', 5)
+        )
+        response.headers.pop('Content-Length', None)
+    else:
+        # Los archivos de static/ llegan en modo passthrough; son pequeños
+        response.direct_passthrough = False
+        body = response.get_data()
+        if len(body) < config.get('COMPRESSION_MIN_SIZE', 500):
+            return response
+        key = etag or g.get('_compression_key')
+        if key:
+            data = get_variant_cache().get_or_compress(key, encoding, body)
+        else:
+            data = compress(body, encoding, config.get('COMPRESSION_STREAM_LEVEL', 5))
+        response.set_data(data)
+    
+    response.headers['Content-Encoding'] = encoding
+    if etag and not is_weak:
+        # La representación comprimida no es idéntica byte a byte
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def get_variant_cache() -> VariantCache:
+    """Obtiene la caché de variantes comprimidas de la aplicación actual."""
+    cache = current_app.extensions.get('compression_variants')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'compression_variants',
+            VariantCache(current_app.config.get('COMPRESSION_CACHE_SIZE', 256))
+        )
+    return cache
+
+
+def init_compression(app):
+    """
+    Registra la compresión de respuestas.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    app.after_request(_compress_response)
@@ -1,6 +1,7 @@
 """
 Configuración de la aplicación Flask por entornos.
 """
+import json
 import os
 from dotenv import load_dotenv
 
@@ -18,6 +19,8 @@ class Config:
     S3_BUCKET = os.getenv('S3_BUCKET', '')
     S3_REGION = os.getenv('S3_REGION', 'us-east-1')
     S3_PUBLIC_BASE_URL = os.getenv('S3_PUBLIC_BASE_URL', '')
+    # Endpoint alternativo (MinIO, emulador local); vacío para AWS
+    S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', '')
     USE_S3_PRESIGNED = os.getenv('USE_S3_PRESIGNED', 'false').lower() == 'true'
     
     # AWS Credentials
@@ -27,6 +30,112 @@ class Config:
     
     # Presigned URL Configuration
     PRESIGNED_URL_EXPIRATION = int(os.getenv('PRESIGNED_URL_EXPIRATION', '3600'))
+    PRESIGNED_URL_CACHE_SIZE = int(os.getenv('PRESIGNED_URL_CACHE_SIZE', '1024'))
+    # Segundos antes del vencimiento en que una URL cacheada se vuelve a firmar
+    PRESIGNED_URL_CACHE_MARGIN = int(os.getenv('PRESIGNED_URL_CACHE_MARGIN', '300'))
+    
+    # Endpoint /metrics e instrumentación Prometheus
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Máximo de Pokeneas por petición en /api/pokeneas
+    API_BATCH_MAX_COUNT = int(os.getenv('API_BATCH_MAX_COUNT', '1000'))
+    # Pokeneas por página en /api/pokeneas con filtros cuando no se indica limit
+    API_FILTER_PAGE_SIZE = int(os.getenv('API_FILTER_PAGE_SIZE', '50'))
+    # Resultados de /api/pokeneas/search cuando no se indica limit
+    API_SEARCH_LIMIT = int(os.getenv('API_SEARCH_LIMIT', '10'))
+    # Pokeneas por lote de URLs en /api/pokeneas/export
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+    
+    # Caché de páginas /pokenea ya renderizadas
+    PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    PAGE_CACHE_MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', '1024'))
+    
+    # Imágenes por página en /imagenes (máximo 1000)
+    IMAGENES_PAGE_SIZE = int(os.getenv('IMAGENES_PAGE_SIZE', '1000'))
+    
+    # Índice en memoria del bucket para /imagenes (refresco en segundo plano)
+    BUCKET_INDEX_ENABLED = os.getenv('BUCKET_INDEX_ENABLED', 'true').lower() == 'true'
+    BUCKET_INDEX_REFRESH_INTERVAL = float(os.getenv('BUCKET_INDEX_REFRESH_INTERVAL', '60'))
+    
+    # Hilos que ejecutan la app WSGI en modo ASGI (asgi.py)
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', '64'))
+    
+    # Cliente boto3 compartido (pool de conexiones, timeouts y reintentos)
+    S3_MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', '10'))
+    S3_CONNECT_TIMEOUT = float(os.getenv('S3_CONNECT_TIMEOUT', '2'))
+    S3_READ_TIMEOUT = float(os.getenv('S3_READ_TIMEOUT', '5'))
+    S3_RETRY_MODE = os.getenv('S3_RETRY_MODE', 'standard')
+    S3_MAX_ATTEMPTS = int(os.getenv('S3_MAX_ATTEMPTS', '3'))
+    # Timeout de lectura por operación (segundos), sin reintentos; las demás usan
+    # S3_READ_TIMEOUT y S3_MAX_ATTEMPTS
+    S3_OPERATION_TIMEOUTS = json.loads(os.getenv(
+        'S3_OPERATION_TIMEOUTS', '{"head_object": 1, "list": 2}'
+    ))
+    
+    # Circuit breaker de S3: fallos seguidos que lo abren y segundos hasta reintentar
+    S3_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('S3_CIRCUIT_FAILURE_THRESHOLD', '5'))
+    S3_CIRCUIT_RESET_TIMEOUT = float(os.getenv('S3_CIRCUIT_RESET_TIMEOUT', '30'))
+    # URL de imagen mientras el circuito está abierto y no hay una URL anterior (vacío: sin imagen)
+    S3_PLACEHOLDER_IMAGE_URL = os.getenv('S3_PLACEHOLDER_IMAGE_URL', '')
+    
+    # Cabecera Server-Timing (y opcionalmente una línea de log JSON por petición)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_LOG = os.getenv('SERVER_TIMING_LOG', 'false').lower() == 'true'
+    
+    # Cache-Control de las respuestas deterministas /api/pokenea/<id> y /pokenea/<id>
+    API_CACHE_CONTROL = os.getenv('API_CACHE_CONTROL', 'public, max-age=3600')
+    # Con URLs presignadas debe ser menor que PRESIGNED_URL_CACHE_MARGIN
+    VIEW_CACHE_CONTROL = os.getenv('VIEW_CACHE_CONTROL', 'public, max-age=300')
+    
+    # Compresión gzip/brotli negociada con Accept-Encoding
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '500'))
+    COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', '256'))
+    # Nivel para cuerpos transmitidos o no cacheables (las variantes cacheadas usan el máximo)
+    COMPRESSION_STREAM_LEVEL = int(os.getenv('COMPRESSION_STREAM_LEVEL', '5'))
+    
+    # Assets de static/ con huella de contenido y caché inmutable
+    ASSETS_FINGERPRINT = os.getenv('ASSETS_FINGERPRINT', 'true').lower() == 'true'
+    ASSETS_MAX_AGE = int(os.getenv('ASSETS_MAX_AGE', str(365 * 24 * 3600)))
+    
+    # Miniaturas /thumb/<size>/<key> (requiere Pillow) con caché en disco
+    THUMBNAILS_ENABLED = os.getenv('THUMBNAILS_ENABLED', 'true').lower() == 'true'
+    THUMBNAIL_SIZES = os.getenv('THUMBNAIL_SIZES', '160,320,640')
+    THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', '82'))
+    THUMBNAIL_CACHE_DIR = os.getenv('THUMBNAIL_CACHE_DIR', '')  # vacío: <tmp>/pokeneas-thumbs
+    THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv('THUMBNAIL_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    THUMBNAIL_CACHE_CONTROL = os.getenv('THUMBNAIL_CACHE_CONTROL', 'public, max-age=86400')
+    # Originales más grandes no se descargan (415)
+    THUMBNAIL_MAX_SOURCE_BYTES = int(os.getenv('THUMBNAIL_MAX_SOURCE_BYTES', str(20 * 1024 * 1024)))
+    # Segundos que se recuerda un original inexistente (404) o inválido (415)
+    THUMBNAIL_NEGATIVE_TTL = int(os.getenv('THUMBNAIL_NEGATIVE_TTL', '300'))
+    
+    # Imágenes servidas desde una caché local (/img/<key>) en lugar de S3
+    IMAGE_PROXY_ENABLED = os.getenv('IMAGE_PROXY_ENABLED', 'false').lower() == 'true'
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', '')  # vacío: <tmp>/pokeneas-blobs
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+    IMAGE_CACHE_TTL = int(os.getenv('IMAGE_CACHE_TTL', '3600'))
+    IMAGE_CACHE_CONTROL = os.getenv('IMAGE_CACHE_CONTROL', 'public, max-age=86400')
+    # Location interna de nginx que apunta a IMAGE_CACHE_DIR (p. ej. /_blobs)
+    IMAGE_ACCEL_REDIRECT_PREFIX = os.getenv('IMAGE_ACCEL_REDIRECT_PREFIX', '')
+    
+    # Fuente del catálogo: vacío (app/data/pokeneas.py), ruta .json o base SQLite
+    CATALOG_SOURCE = os.getenv('CATALOG_SOURCE', '')
+    # Segundos entre comprobaciones de cambios en la fuente (0: sin recarga)
+    CATALOG_RELOAD_INTERVAL = float(os.getenv('CATALOG_RELOAD_INTERVAL', '5'))
+    
+    # Verificar al arrancar que las imágenes del catálogo existan: off, warn o strict
+    CATALOG_VERIFY_ON_STARTUP = os.getenv('CATALOG_VERIFY_ON_STARTUP', 'off').lower()
+    
+    # Perfiles de selección: nombre → peso de cada Pokenea según su rareza
+    # (null: uniforme). El peso es por Pokenea, no por grupo de rareza.
+    RARITY_PROFILES = json.loads(os.getenv(
+        'RARITY_PROFILES',
+        '{"uniforme": null, "rareza": {"comun": 70, "raro": 25, "legendario": 5}}'
+    ))
+    RARITY_DEFAULT_PROFILE = os.getenv('RARITY_DEFAULT_PROFILE', 'uniforme')
+    # Semilla del generador del proceso (vacío: aleatorio); útil para pruebas de carga
+    SAMPLER_SEED = os.getenv('SAMPLER_SEED', '')
     
     @staticmethod
     def init_app(app):
@@ -74,6 +183,8 @@ class TestingConfig(Config):
     # Usar bucket de prueba o mock
     S3_BUCKET = 'test-bucket'
     USE_S3_PRESIGNED = False
+    # Sin hilos de refresco contra S3 durante los tests
+    BUCKET_INDEX_ENABLED = False
 
 
 # Mapeo de configuraciones
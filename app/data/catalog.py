@@ -0,0 +1,331 @@
+"""
+Catálogo inmutable de Pokeneas precalculado al crear la aplicación.
+
+El catálogo se construye desde una fuente (app.data.sources) y se
+publica en un CatalogStore. Si la fuente es un archivo, un hilo lo vigila
+y al cambiar construye un catálogo nuevo y lo publica con una sola
+asignación: los lectores nunca esperan ni ven un catálogo a medias.
+"""
+import hashlib
+import logging
+import os
+import socket
+import threading
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from flask import current_app
+from app.data.indexes import AttributeIndex
+from app.data.search import SearchIndex
+from app.data.sources import CatalogSource, open_source
+
+logger = logging.getLogger(__name__)
+
+
+class PokeneaRecord:
+    """Registro compacto e inmutable de un Pokenea."""
+    
+    __slots__ = ('id', 'nombre', 'altura', 'habilidad', 'imagen', 'frase_filosofica', 'rareza')
+    
+    def __init__(self, id: int, nombre: str, altura: str, habilidad: str,
+                 imagen: str, frase_filosofica: str, rareza: str = 'comun'):
+        values = (id, nombre, altura, habilidad, imagen, frase_filosofica, rareza)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("PokeneaRecord es inmutable")
+    
+    def __getitem__(self, name: str):
+        """Permite el acceso estilo diccionario (pokenea["nombre"])."""
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+    
+    def __repr__(self):
+        return f"PokeneaRecord(id={self.id!r}, nombre={self.nombre!r})"
+    
+    def to_dict(self) -> Dict:
+        """Retorna los campos del registro como diccionario."""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def api_dict(self, container_id: str) -> Dict:
+        """
+        Retorna el payload de la API REST para este Pokenea.
+        
+        Args:
+            container_id: ID del contenedor que atiende la petición
+        
+        Returns:
+            Diccionario con: id, nombre, altura, habilidad, container_id
+        """
+        return {
+            "id": self.id,
+            "nombre": self.nombre,
+            "altura": self.altura,
+            "habilidad": self.habilidad,
+            "container_id": container_id
+        }
+
+
+class Catalog:
+    """
+    Catálogo precalculado.
+    
+    Contiene los registros, un índice id→registro, el JSON de la API de
+    cada Pokenea ya serializado con el container_id del proceso y su ETag
+    fuerte.
+    """
+    
+    __slots__ = ('records', 'by_id', 'positions', 'api_payloads', 'api_etags', 'container_id',
+                 'samplers', 'index', 'search')
+    
+    def __init__(self, records: Tuple[PokeneaRecord, ...], container_id: str,
+                 dumps: Callable[[Dict], str], previous: 'Catalog' = None):
+        """
+        Construye el catálogo.
+        
+        Args:
+            records: Registros de Pokeneas
+            container_id: ID del contenedor (hostname)
+            dumps: Función de serialización JSON (la de la app, igual que jsonify)
+            previous: Catálogo anterior; se reutiliza el JSON de los registros
+                que no cambiaron
+        
+        Raises:
+            ValueError: Si hay ids repetidos
+        """
+        self.records = records
+        self.by_id: Mapping[int, PokeneaRecord] = MappingProxyType(
+            {record.id: record for record in records}
+        )
+        if len(self.by_id) != len(records):
+            raise ValueError("El catálogo tiene ids repetidos")
+        self.positions: Mapping[int, int] = MappingProxyType(
+            {record.id: position for position, record in enumerate(records)}
+        )
+        
+        payloads = []
+        etags = []
+        for record in records:
+            position = previous.positions.get(record.id) if previous is not None else None
+            if position is not None and previous.records[position] is record:
+                payloads.append(previous.api_payloads[position])
+                etags.append(previous.api_etags[position])
+            else:
+                payload = (dumps(record.api_dict(container_id)) + "\n").encode('utf-8')
+                payloads.append(payload)
+                etags.append(content_etag(payload))
+        self.api_payloads = tuple(payloads)
+        self.api_etags = tuple(etags)
+        self.container_id = container_id
+        # Tablas alias por perfil de rareza (app.services.sampling), creadas al primer uso
+        self.samplers: Dict[str, object] = {}
+        # Índices por habilidad, id y altura para /api/pokeneas con filtros
+        self.index = AttributeIndex(records)
+        # Índice de texto; se actualiza solo con los registros que cambiaron
+        self.search = SearchIndex(
+            records,
+            previous.search if previous is not None else None,
+            previous.by_id if previous is not None else None
+        )
+    
+    def __len__(self):
+        return len(self.records)
+
+
+def content_etag(body: bytes) -> str:
+    """
+    Calcula un ETag fuerte (sin comillas) a partir del contenido.
+    
+    Args:
+        body: Cuerpo de la respuesta
+        
+    Returns:
+        Hash hexadecimal del cuerpo
+    """
+    return hashlib.sha1(body).hexdigest()
+
+
+def resolve_container_id() -> str:
+    """
+    Obtiene el ID del contenedor actual.
+    
+    En Docker, el hostname del contenedor es su ID.
+    
+    Returns:
+        ID del contenedor (hostname)
+    """
+    try:
+        return socket.gethostname()
+    except Exception as e:
+        logger.error(f"Error al obtener container ID: {e}")
+        return "unknown"
+
+
+def build_catalog(data: Iterable[Dict], container_id: str,
+                  dumps: Callable[[Dict], str], previous: Catalog = None) -> Catalog:
+    """
+    Construye un catálogo inmutable a partir de los datos crudos.
+    
+    Los registros iguales a los del catálogo anterior se reutilizan, así
+    un cambio en una fila no vuelve a serializar las demás ni invalida
+    sus páginas cacheadas.
+    
+    Args:
+        data: Lista de diccionarios de Pokeneas
+        container_id: ID del contenedor
+        dumps: Función de serialización JSON
+        previous: Catálogo anterior (opcional)
+    
+    Returns:
+        Catálogo precalculado
+    """
+    records = []
+    for item in data:
+        record = PokeneaRecord(**item)
+        old = previous.by_id.get(record.id) if previous is not None else None
+        if old is not None and all(
+            getattr(old, name) == getattr(record, name) for name in PokeneaRecord.__slots__
+        ):
+            record = old
+        records.append(record)
+    return Catalog(tuple(records), container_id, dumps, previous)
+
+
+class CatalogStore:
+    """
+    Catálogo vigente de la aplicación con recarga en caliente.
+    
+    `catalog` se reemplaza con una sola asignación; un hilo en segundo
+    plano consulta la versión de la fuente cada `reload_interval`
+    segundos. Si la fuente nueva es inválida se conserva el catálogo
+    anterior y el error queda en `last_error`.
+    """
+    
+    def __init__(self, source: CatalogSource, container_id: str,
+                 dumps: Callable[[Dict], str], reload_interval: float = 0):
+        """
+        Carga la fuente por primera vez.
+        
+        Args:
+            source: Fuente del catálogo
+            container_id: ID del contenedor
+            dumps: Función de serialización JSON
+            reload_interval: Segundos entre consultas a la fuente (0: sin recarga)
+        """
+        self.source = source
+        self.container_id = container_id
+        self.dumps = dumps
+        self.reload_interval = reload_interval
+        self.catalog: Optional[Catalog] = None
+        self.version = None
+        self.last_error: Optional[str] = None
+        self._listeners: List[Callable[[Catalog], None]] = []
+        
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.reload(force=True)
+    
+    def subscribe(self, listener: Callable[[Catalog], None]):
+        """Registra una función llamada con cada catálogo nuevo publicado."""
+        self._listeners.append(listener)
+    
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recarga la fuente si cambió su versión.
+        
+        Args:
+            force: Recargar aunque la versión no haya cambiado
+        
+        Returns:
+            True si se publicó un catálogo nuevo
+        """
+        version = self.source.version()
+        if not force and version == self.version:
+            return False
+        catalog = build_catalog(self.source.load(), self.container_id, self.dumps, self.catalog)
+        self.catalog = catalog
+        self.version = version
+        for listener in self._listeners:
+            listener(catalog)
+        logger.info(f"Catálogo cargado desde {self.source}: {len(catalog)} Pokeneas")
+        return True
+    
+    def _run(self):
+        """Bucle del hilo de recarga."""
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+                self.last_error = None
+            except Exception as e:
+                # Se sigue sirviendo el último catálogo válido
+                self.last_error = str(e)
+                logger.error(f"Error al recargar el catálogo: {e}")
+    
+    def ensure_running(self):
+        """
+        Arranca el hilo de recarga si corresponde y no está corriendo en este proceso.
+        
+        Los hilos no sobreviven a un fork, así que se vuelve a arrancar
+        cuando cambia el PID.
+        """
+        if not self.reload_interval or not self.source.watchable:
+            return
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='catalog-reload',
+                daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+    
+    def stop(self):
+        """Detiene el hilo de recarga."""
+        self._stop.set()
+
+
+def init_catalog(app):
+    """
+    Carga el catálogo desde CATALOG_SOURCE y lo registra en la aplicación.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    store = CatalogStore(
+        open_source(app.config.get('CATALOG_SOURCE', '')),
+        resolve_container_id(),
+        app.json.dumps,
+        reload_interval=app.config.get('CATALOG_RELOAD_INTERVAL', 5)
+    )
+    
+    def discard_stale_pages(catalog):
+        # Las páginas cacheadas se indexan por registro; las de registros
+        # reemplazados o eliminados ya no se alcanzan y se descartan aquí
+        page_cache = app.extensions.get('page_cache')
+        if page_cache is not None:
+            page_cache.retain(lambda record: catalog.by_id.get(record.id) is record)
+    
+    store.subscribe(discard_stale_pages)
+    app.extensions['catalog_store'] = store
+
+
+def get_catalog() -> Catalog:
+    """
+    Obtiene el catálogo vigente de la aplicación actual.
+    
+    Returns:
+        Catálogo precalculado
+    """
+    store = current_app.extensions['catalog_store']
+    store.ensure_running()
+    return store.catalog
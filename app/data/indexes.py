@@ -0,0 +1,175 @@
+"""
+Índices del catálogo para filtrar Pokeneas sin recorrer la lista.
+
+Se construyen una vez con cada catálogo:
+- habilidad → posiciones (ordenadas por id), con el texto normalizado.
+- ids ordenados, para rangos de id y para el cursor de paginación.
+- alturas en metros ordenadas, para rangos de altura con bisect.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Tildes y demás marcas que NFKD separa de las letras latinas
+_COMBINING_RE = re.compile('[\u0300-\u036f]')
+
+# "0.3m", "1,2 m", "30cm", "0.3"
+_ALTURA_RE = re.compile(r'^\s*(\d+(?:[.,]\d+)?)\s*(cm|m)?\s*$', re.IGNORECASE)
+
+
+def fold(text: str) -> str:
+    """
+    Normaliza un texto para comparar sin mayúsculas ni tildes.
+    
+    Args:
+        text: Texto original (ej: "Espíritu Festivo")
+    
+    Returns:
+        Texto normalizado (ej: "espiritu festivo")
+    """
+    if text.isascii():
+        return text.casefold().strip()
+    return _COMBINING_RE.sub('', unicodedata.normalize('NFKD', text)).casefold().strip()
+
+
+def parse_altura(value) -> Optional[float]:
+    """
+    Convierte una altura a metros.
+    
+    Args:
+        value: Texto como "0.3m" o "30cm", o un número (metros)
+    
+    Returns:
+        Altura en metros o None si no se reconoce el formato
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _ALTURA_RE.match(value or '')
+    if match is None:
+        return None
+    number = float(match.group(1).replace(',', '.'))
+    return number / 100 if (match.group(2) or '').lower() == 'cm' else number
+
+
+class AttributeIndex:
+    """Índices por habilidad, id y altura sobre las posiciones de un catálogo."""
+    
+    __slots__ = ('records', 'habilidades', 'habilidad_by_position', 'ids', 'id_positions',
+                 'heights', 'height_positions', 'height_by_position')
+    
+    def __init__(self, records: Sequence):
+        """
+        Construye los índices en O(n log n).
+        
+        Args:
+            records: Registros del catálogo (PokeneaRecord)
+        """
+        self.records = records
+        by_id = sorted(range(len(records)), key=lambda position: records[position].id)
+        self.ids: Tuple[int, ...] = tuple(records[position].id for position in by_id)
+        self.id_positions: Tuple[int, ...] = tuple(by_id)
+        
+        # Listas de posiciones por habilidad, en orden de id. Habilidades y
+        # alturas se repiten mucho: cada texto distinto se procesa una vez
+        folded = {text: fold(text) for text in {record.habilidad for record in records}}
+        self.habilidad_by_position = tuple(folded[record.habilidad] for record in records)
+        postings: Dict[str, List[int]] = {}
+        for position in by_id:
+            postings.setdefault(self.habilidad_by_position[position], []).append(position)
+        self.habilidades: Mapping[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = MappingProxyType({
+            key: (tuple(records[p].id for p in positions), tuple(positions))
+            for key, positions in postings.items()
+        })
+        
+        parsed = {text: parse_altura(text) for text in {record.altura for record in records}}
+        self.height_by_position = tuple(parsed[record.altura] for record in records)
+        by_height = sorted(
+            (height, position) for position, height in enumerate(self.height_by_position)
+            if height is not None
+        )
+        self.heights: Tuple[float, ...] = tuple(height for height, _ in by_height)
+        self.height_positions: Tuple[int, ...] = tuple(position for _, position in by_height)
+    
+    def query(self, habilidad: str = None, altura_min: float = None, altura_max: float = None,
+              id_min: int = None, id_max: int = None, after: int = None,
+              limit: int = 50) -> Tuple[List[int], Optional[int]]:
+        """
+        Posiciones que cumplen todos los filtros, en orden de id.
+        
+        Se recorre solo el candidato más pequeño entre los tres índices y
+        el resto de filtros se comprueba registro a registro.
+        
+        Args:
+            habilidad: Habilidad exacta (sin distinguir mayúsculas ni tildes)
+            altura_min: Altura mínima en metros (incluida)
+            altura_max: Altura máxima en metros (incluida)
+            id_min: Id mínimo (incluido)
+            id_max: Id máximo (incluido)
+            after: Cursor: último id de la página anterior
+            limit: Máximo de resultados
+        
+        Returns:
+            Tupla (posiciones, id para pedir la página siguiente o None)
+        """
+        low_id = id_min
+        if after is not None:
+            low_id = after + 1 if low_id is None else max(low_id, after + 1)
+        
+        # Candidatos en orden de id: todo el catálogo o la lista de la habilidad
+        ids, positions = self.ids, self.id_positions
+        key = None
+        if habilidad is not None:
+            key = fold(habilidad)
+            ids, positions = self.habilidades.get(key, ((), ()))
+        start = bisect_left(ids, low_id) if low_id is not None else 0
+        end = bisect_right(ids, id_max) if id_max is not None else len(ids)
+        
+        filter_height = altura_min is not None or altura_max is not None
+        if filter_height:
+            height_start = bisect_left(self.heights, altura_min) if altura_min is not None else 0
+            height_end = (bisect_right(self.heights, altura_max) if altura_max is not None
+                          else len(self.heights))
+            if height_end - height_start < end - start:
+                # El rango de altura es el candidato más pequeño: filtrar y ordenar por id
+                matches = sorted(
+                    (self.records[p].id, p) for p in self.height_positions[height_start:height_end]
+                    if self._matches(p, key, None, None, low_id, id_max)
+                )
+                page = matches[:limit + 1]
+                return self._page([p for _, p in page], limit)
+        
+        result = []
+        for index in range(start, max(start, end)):
+            position = positions[index]
+            if filter_height and not self._matches(position, None, altura_min, altura_max, None, None):
+                continue
+            result.append(position)
+            if len(result) > limit:
+                break
+        return self._page(result, limit)
+    
+    def _matches(self, position: int, key: Optional[str], altura_min: Optional[float],
+                 altura_max: Optional[float], low_id: Optional[int], id_max: Optional[int]) -> bool:
+        """Comprueba los filtros indicados sobre una posición."""
+        record = self.records[position]
+        if key is not None and self.habilidad_by_position[position] != key:
+            return False
+        if low_id is not None and record.id < low_id:
+            return False
+        if id_max is not None and record.id > id_max:
+            return False
+        height = self.height_by_position[position]
+        if altura_min is not None and (height is None or height < altura_min):
+            return False
+        if altura_max is not None and (height is None or height > altura_max):
+            return False
+        return True
+    
+    def _page(self, positions: List[int], limit: int) -> Tuple[List[int], Optional[int]]:
+        """Recorta a `limit` y calcula el cursor si sobra un resultado."""
+        if len(positions) > limit:
+            positions = positions[:limit]
+            return positions, self.records[positions[-1]].id
+        return positions, None
@@ -8,6 +8,7 @@ POKENEAS_DATA = [
         "nombre": "Arepa",
         "altura": "0.3m",
         "habilidad": "Doble Sabor",
+        "rareza": "comun",
         "imagen": "pokeneas/arepa-001.jpg",
         "frase_filosofica": "No hay problema que una buena arepa no pueda resolver. La vida es mejor cuando está rellena de queso."
     },
@@ -16,6 +17,7 @@ POKENEAS_DATA = [
         "nombre": "Bandeja",
         "altura": "1.2m",
         "habilidad": "Abundancia Infinita",
+        "rareza": "comun",
         "imagen": "pokeneas/bandeja-002.jpg",
         "frase_filosofica": "La bandeja paisa no es comida, es un estilo de vida. Quien come completo, vive completo."
     },
@@ -24,6 +26,7 @@ POKENEAS_DATA = [
         "nombre": "Parcero",
         "altura": "1.7m",
         "habilidad": "Amistad Paisa",
+        "rareza": "comun",
         "imagen": "pokeneas/parcero-003.jpg",
         "frase_filosofica": "Parcero que es parcero, nunca te deja solo. La amistad antioqueña es inquebrantable como el hierro."
     },
@@ -32,6 +35,7 @@ POKENEAS_DATA = [
         "nombre": "Guaro",
         "altura": "0.2m",
         "habilidad": "Espíritu Festivo",
+        "rareza": "raro",
         "imagen": "pokeneas/guaro-004.jpg",
         "frase_filosofica": "Con medida y alegría, el aguardiente une corazones. La fiesta paisa nunca termina."
     },
@@ -40,6 +44,7 @@ POKENEAS_DATA = [
         "nombre": "Silletero",
         "altura": "2.1m",
         "habilidad": "Carga Floral",
+        "rareza": "legendario",
         "imagen": "pokeneas/silletero-005.jpg",
         "frase_filosofica": "Como las flores en la silleta, la belleza requiere esfuerzo y dedicación. Cada pétalo cuenta una historia."
     },
@@ -48,6 +53,7 @@ POKENEAS_DATA = [
         "nombre": "Empanada",
         "altura": "0.15m",
         "habilidad": "Crujiente Defensa",
+        "rareza": "comun",
         "imagen": "pokeneas/empanada-006.jpg",
         "frase_filosofica": "Dorada por fuera, sabrosa por dentro. La perfección está en los detalles crujientes de la vida."
     },
@@ -56,6 +62,7 @@ POKENEAS_DATA = [
         "nombre": "Mondongo",
         "altura": "0.8m",
         "habilidad": "Sabiduría Ancestral",
+        "rareza": "raro",
         "imagen": "pokeneas/mondongo-007.jpg",
         "frase_filosofica": "Como el mondongo bien preparado, las mejores cosas de la vida requieren tiempo y paciencia."
     },
@@ -64,6 +71,7 @@ POKENEAS_DATA = [
         "nombre": "Mazamorra",
         "altura": "0.4m",
         "habilidad": "Dulzura Tradicional",
+        "rareza": "comun",
         "imagen": "pokeneas/mazamorra-008.jpg",
         "frase_filosofica": "La tradición es como la mazamorra: dulce, nutritiva y reconfortante. Nunca olvides tus raíces."
     },
@@ -72,6 +80,7 @@ POKENEAS_DATA = [
         "nombre": "Paisita",
         "altura": "1.6m",
         "habilidad": "Emprendimiento Nato",
+        "rareza": "comun",
         "imagen": "pokeneas/paisita-009.jpg",
         "frase_filosofica": "El paisa no nace, se hace con trabajo duro y berraquera. Caerse está permitido, quedarse no."
     },
@@ -80,6 +89,7 @@ POKENEAS_DATA = [
         "nombre": "Fríjoles",
         "altura": "0.5m",
         "habilidad": "Esencia Antioqueña",
+        "rareza": "comun",
         "imagen": "pokeneas/frijoles-010.jpg",
         "frase_filosofica": "Los fríjoles son la base de todo. En la sencillez encontramos la verdadera grandeza."
     }
@@ -0,0 +1,229 @@
+"""
+Búsqueda de texto sobre el nombre y la frase filosófica de los Pokeneas.
+
+Un índice invertido término → {id: frecuencia} con ranking BM25. Se
+construye con cada catálogo reutilizando el anterior: solo se reindexan
+los registros que cambiaron, y las listas de los demás términos se
+comparten entre ambas versiones sin copiarse.
+
+Las consultas con términos frecuentes no recorren toda su lista: cada
+lista larga se ordena por aporte al puntaje la primera vez que se usa
+(una vez por catálogo) y el algoritmo de umbral de Fagin se detiene en
+cuanto ningún Pokenea sin ver puede entrar en el top-k.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+from app.data.indexes import fold
+
+# Parámetros habituales de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Cada aparición en el nombre cuenta como varias en la frase
+NAME_BOOST = 3
+
+# Listas más cortas que esto se puntúan completas, sin ordenarlas
+RANKED_MIN_POSTING = 64
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a al con de del el en es la las lo los mas no o para pero por que se sin su sus
+un una y ya
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Separa un texto en términos sin tildes ni mayúsculas.
+    
+    Args:
+        text: Texto en español (ej: "Los fríjoles")
+    
+    Returns:
+        Términos sin palabras vacías (ej: ["frijoles"])
+    """
+    return [token for token in _TOKEN_RE.findall(fold(text)) if token not in STOPWORDS]
+
+
+def document_terms(record) -> Counter:
+    """
+    Frecuencias de los términos de un Pokenea, con el nombre reforzado.
+    
+    Args:
+        record: PokeneaRecord
+    
+    Returns:
+        Counter término → frecuencia
+    """
+    terms = Counter(tokenize(record.frase_filosofica))
+    for token in tokenize(record.nombre):
+        terms[token] += NAME_BOOST
+    return terms
+
+
+class SearchIndex:
+    """Índice invertido inmutable con ranking BM25."""
+    
+    __slots__ = ('postings', 'terms', 'lengths', 'total_length', 'norms', 'ranked')
+    
+    def __init__(self, records: Sequence, previous: 'SearchIndex' = None,
+                 previous_records: Dict[int, object] = None):
+        """
+        Construye el índice, de forma incremental si hay uno anterior.
+        
+        Args:
+            records: Registros del catálogo (PokeneaRecord)
+            previous: Índice del catálogo anterior
+            previous_records: id → registro del catálogo anterior; los
+                registros idénticos (el mismo objeto) no se reindexan
+        """
+        if previous is None or previous_records is None:
+            postings, terms, lengths, total_length = {}, {}, {}, 0
+            previous_records = {}
+        else:
+            postings = dict(previous.postings)
+            terms = dict(previous.terms)
+            lengths = dict(previous.lengths)
+            total_length = previous.total_length
+        
+        current = {record.id: record for record in records}
+        removed = [doc_id for doc_id, record in previous_records.items()
+                   if current.get(doc_id) is not record]
+        added = [record for record in records if previous_records.get(record.id) is not record]
+        # Listas ya copiadas en esta versión (las demás se comparten)
+        copied = set()
+        
+        def writable(term: str) -> Dict[int, int]:
+            if term not in copied:
+                postings[term] = dict(postings.get(term, ()))
+                copied.add(term)
+            return postings[term]
+        
+        for doc_id in removed:
+            for term in terms.pop(doc_id, ()):
+                posting = writable(term)
+                posting.pop(doc_id, None)
+                if not posting:
+                    del postings[term]
+                    copied.discard(term)
+            total_length -= lengths.pop(doc_id, 0)
+        
+        for record in added:
+            counts = document_terms(record)
+            doc_id = record.id
+            for term, frequency in counts.items():
+                posting = postings[term] if term in copied else writable(term)
+                posting[doc_id] = frequency
+            terms[doc_id] = tuple(counts)
+            lengths[doc_id] = sum(counts.values())
+            total_length += lengths[doc_id]
+        
+        self.postings: Dict[str, Dict[int, int]] = postings
+        self.terms: Dict[int, Tuple[str, ...]] = terms
+        self.lengths: Dict[int, int] = lengths
+        self.total_length = total_length
+        # Normalización por longitud de BM25, precalculada para cada Pokenea
+        average_length = total_length / len(lengths) if total_length else 1
+        self.norms: Dict[int, float] = {
+            doc_id: BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            for doc_id, length in lengths.items()
+        }
+        # Listas largas ordenadas por aporte, creadas al primer uso
+        self.ranked: Dict[str, List[Tuple[float, int]]] = {}
+    
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Busca los Pokeneas más relevantes para una consulta.
+        
+        Los términos de la consulta se combinan con OR; los que aparecen en
+        más Pokeneas pesan menos (IDF). Los k mejores se eligen con un heap.
+        
+        Args:
+            query: Texto de la consulta (ej: "arepa queso")
+            limit: Máximo de resultados
+        
+        Returns:
+            Lista de (id, puntaje) de mayor a menor puntaje
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not terms or limit < 1:
+            return []
+        
+        if all(len(self.postings[term]) < RANKED_MIN_POSTING for term in terms):
+            scores: Dict[int, float] = {}
+            for term in terms:
+                weight = self._weight(term)
+                for doc_id, frequency in self.postings[term].items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + self._impact(weight, frequency, doc_id)
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        else:
+            best = self._threshold_top_k(terms, limit)
+        return [(doc_id, round(score, 4)) for doc_id, score in best]
+    
+    def _weight(self, term: str) -> float:
+        """IDF del término multiplicado por (k1 + 1)."""
+        count = len(self.lengths)
+        frequency = len(self.postings[term])
+        return math.log(1 + (count - frequency + 0.5) / (frequency + 0.5)) * (BM25_K1 + 1)
+    
+    def _impact(self, weight: float, frequency: int, doc_id: int) -> float:
+        """Aporte de un término al puntaje BM25 de un Pokenea."""
+        return weight * frequency / (frequency + self.norms[doc_id])
+    
+    def _ranked(self, term: str) -> List[Tuple[float, int]]:
+        """Lista del término ordenada por aporte descendente (y por id en empates)."""
+        ranked = self.ranked.get(term)
+        if ranked is None:
+            weight = self._weight(term)
+            ranked = sorted(
+                (-self._impact(weight, frequency, doc_id), doc_id)
+                for doc_id, frequency in self.postings[term].items()
+            )
+            # Dos hilos pueden ordenarla a la vez; el resultado es el mismo
+            ranked = self.ranked.setdefault(term, ranked)
+        return ranked
+    
+    def _threshold_top_k(self, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        """
+        Top-k con el algoritmo de umbral (TA) sobre las listas ordenadas.
+        
+        En cada profundidad se puntúa por completo cada Pokenea nuevo; el
+        umbral es la suma de los aportes en esa profundidad, la cota máxima
+        de cualquier Pokenea aún no visto.
+        """
+        lists = [self._ranked(term) for term in terms]
+        weights = [(self._weight(term), self.postings[term]) for term in terms]
+        # Min-heap de (puntaje, -id): la raíz es el peor del top-k
+        top: List[Tuple[float, int]] = []
+        seen = set()
+        
+        for depth in range(max(len(ranked) for ranked in lists)):
+            threshold = 0.0
+            for ranked in lists:
+                if depth >= len(ranked):
+                    continue
+                negative_impact, doc_id = ranked[depth]
+                threshold -= negative_impact
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                score = sum(
+                    self._impact(weight, posting[doc_id], doc_id)
+                    for weight, posting in weights if doc_id in posting
+                )
+                entry = (score, -doc_id)
+                if len(top) < limit:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+            if len(top) == limit and top[0][0] > threshold:
+                break
+        
+        return [(-negative_id, score) for score, negative_id in sorted(top, reverse=True)]
+    
+    def __len__(self):
+        return len(self.lengths)
@@ -0,0 +1,187 @@
+"""
+Fuentes del catálogo de Pokeneas.
+
+- ModuleSource: los datos de app/data/pokeneas.py (default, sin recarga).
+- JsonFileSource: un archivo JSON con la lista de Pokeneas.
+- SqliteSource: una base SQLite con la tabla `pokeneas`.
+
+Las fuentes de archivo exponen una versión barata de calcular (mtime y
+tamaño) para que CatalogStore detecte cambios sin leer el contenido.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Hashable, Iterable, List
+
+# Columnas de la tabla y campos de cada Pokenea
+FIELDS = ('id', 'nombre', 'altura', 'habilidad', 'imagen', 'frase_filosofica', 'rareza')
+
+# Rareza asignada cuando la fuente no la indica
+DEFAULT_RAREZA = 'comun'
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pokeneas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    altura TEXT NOT NULL,
+    habilidad TEXT NOT NULL,
+    imagen TEXT NOT NULL,
+    frase_filosofica TEXT NOT NULL,
+    rareza TEXT NOT NULL DEFAULT 'comun'
+)
+"""
+
+
+class CatalogSource(ABC):
+    """
+    Interfaz de una fuente del catálogo.
+    
+    Es abstracta para que una fuente sin load falle al crearse y no en la
+    primera recarga, dentro del hilo en segundo plano.
+    """
+    
+    # Si tiene sentido consultar la versión periódicamente
+    watchable = False
+    
+    def version(self) -> Hashable:
+        """Valor que cambia cuando cambia el contenido."""
+        return None
+    
+    @abstractmethod
+    def load(self) -> Iterable[Dict]:
+        """Retorna los Pokeneas como diccionarios con FIELDS."""
+
+
+class ModuleSource(CatalogSource):
+    """Datos embebidos en app/data/pokeneas.py."""
+    
+    def load(self) -> Iterable[Dict]:
+        from app.data.pokeneas import POKENEAS_DATA
+        return POKENEAS_DATA
+    
+    def __str__(self):
+        return 'app.data.pokeneas'
+
+
+class FileSource(CatalogSource):
+    """Base de las fuentes respaldadas por un archivo."""
+    
+    watchable = True
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Ruta del archivo
+        """
+        self.path = path
+    
+    def _stat(self, path: str):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+    
+    def version(self) -> Hashable:
+        return self._stat(self.path)
+    
+    def __str__(self):
+        return self.path
+
+
+class JsonFileSource(FileSource):
+    """Lista JSON de Pokeneas; se reemplaza escribiendo un archivo nuevo y renombrándolo."""
+    
+    def load(self) -> Iterable[Dict]:
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"{self.path} debe contener una lista de Pokeneas")
+        return [_normalize(item) for item in data]
+
+
+class SqliteSource(FileSource):
+    """
+    Tabla `pokeneas` de una base SQLite.
+    
+    Se abre en solo lectura; en modo WAL las escrituras modifican el
+    archivo -wal, que también forma parte de la versión.
+    """
+    
+    def version(self) -> Hashable:
+        return self._stat(self.path), self._stat(self.path + '-wal')
+    
+    def load(self) -> Iterable[Dict]:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        import sqlite3
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM pokeneas ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+
+def _normalize(item: Dict) -> Dict:
+    """Deja solo los campos conocidos; la rareza es opcional."""
+    row = {field: item[field] for field in FIELDS if field != 'rareza'}
+    row['rareza'] = item.get('rareza') or DEFAULT_RAREZA
+    return row
+
+
+def open_source(spec: str) -> CatalogSource:
+    """
+    Crea la fuente indicada por CATALOG_SOURCE.
+    
+    Args:
+        spec: '' para el módulo, ruta .json o ruta a una base SQLite
+    
+    Returns:
+        Fuente del catálogo
+    """
+    if not spec:
+        return ModuleSource()
+    if spec.lower().endswith('.json'):
+        return JsonFileSource(spec)
+    return SqliteSource(spec)
+
+
+def write_catalog(path: str, data: Iterable[Dict]) -> int:
+    """
+    Escribe un catálogo en un archivo JSON o SQLite de forma atómica.
+    
+    Se escribe en un temporal junto al destino y se renombra, así un
+    CatalogStore que vigile el archivo nunca lee uno a medio escribir.
+    
+    Args:
+        path: Ruta destino (.json o SQLite)
+        data: Pokeneas a escribir
+    
+    Returns:
+        Número de Pokeneas escritos
+    """
+    rows: List[Dict] = [_normalize(item) for item in data]
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    if path.lower().endswith('.json'):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    else:
+        import sqlite3
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute(SQLITE_SCHEMA)
+            conn.executemany(
+                f"INSERT INTO pokeneas ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                [tuple(row[field] for field in FIELDS) for row in rows]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    os.replace(tmp_path, path)
+    return len(rows)
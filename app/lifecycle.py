@@ -0,0 +1,75 @@
+"""
+Arranque con la aplicación precargada (preload_app de gunicorn).
+
+El master crea la aplicación y hace aquí todo el trabajo que no depende
+del proceso: catálogo e índices, tablas alias y plantillas compiladas.
+Los workers heredan esa memoria por copy-on-write. Lo que no sobrevive a
+un fork (cliente boto3 y su pool de conexiones, hilos en segundo plano)
+se reconstruye en cada worker con after_fork.
+"""
+import gc
+import logging
+import time
+from typing import Dict
+from app.services.sampling import get_alias_table, parse_profiles
+from app.storage.bucket_index import get_bucket_index
+from app.storage.s3 import reset_s3_client
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(app) -> Dict[str, float]:
+    """
+    Precalcula en el master lo que comparten todos los workers.
+    
+    No arranca hilos ni abre conexiones: eso ocurre después del fork.
+    
+    Args:
+        app: Aplicación Flask
+    
+    Returns:
+        Diccionario con lo precalculado y los milisegundos empleados
+    """
+    start = time.perf_counter()
+    with app.app_context():
+        # Se lee la foto directamente: get_catalog() arrancaría el hilo de recarga
+        catalog = app.extensions['catalog_store'].catalog
+        profiles = parse_profiles(app.config.get('RARITY_PROFILES'))
+        samplers = 0
+        for name, weights in profiles.items():
+            try:
+                samplers += get_alias_table(catalog, name, weights) is not None
+            except ValueError as e:
+                logger.warning(f"Perfil de rareza {name} sin pesos válidos: {e}")
+        
+        templates = 0
+        for name in app.jinja_env.list_templates(filter_func=lambda name: name.endswith('.html')):
+            app.jinja_env.get_template(name)
+            templates += 1
+    
+    # Liberar los temporales de la carga antes de congelar el heap (gc.freeze)
+    gc.collect()
+    stats = {
+        "pokeneas": len(catalog),
+        "samplers": samplers,
+        "templates": templates,
+        "duration_ms": round((time.perf_counter() - start) * 1e3, 1)
+    }
+    logger.info(f"Aplicación precargada: {stats}")
+    return stats
+
+
+def after_fork(app):
+    """
+    Reconstruye en un worker el estado que no se puede heredar del master.
+    
+    Descarta el cliente boto3 heredado y arranca los hilos de recarga del
+    catálogo y de refresco del índice del bucket en el proceso nuevo.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    reset_s3_client(app)
+    with app.app_context():
+        app.extensions['catalog_store'].ensure_running()
+        get_bucket_index()
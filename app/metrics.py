@@ -0,0 +1,153 @@
+"""
+Métricas Prometheus de la aplicación.
+
+Con varios workers de gunicorn, cada proceso escribe sus valores en
+PROMETHEUS_MULTIPROC_DIR y /metrics los agrega al momento de la lectura
+(modo multiproceso de prometheus_client). La variable debe estar definida
+antes de importar este módulo; gunicorn.conf.py se encarga de ello.
+"""
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'pokeneas_request_duration_seconds',
+    'Latencia de las peticiones HTTP por ruta',
+    ['route', 'method']
+)
+
+REQUESTS = Counter(
+    'pokeneas_requests_total',
+    'Peticiones HTTP por ruta y código de estado',
+    ['route', 'method', 'status']
+)
+
+S3_OPERATION_LATENCY = Histogram(
+    'pokeneas_s3_operation_duration_seconds',
+    'Latencia de las operaciones de S3Client',
+    ['operation'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+S3_OPERATIONS = Counter(
+    'pokeneas_s3_operations_total',
+    'Operaciones de S3Client por resultado',
+    ['operation', 'outcome']
+)
+
+# Con varios workers se publica el peor estado entre procesos
+S3_CIRCUIT_STATE = Gauge(
+    'pokeneas_s3_circuit_state',
+    'Estado del circuit breaker de S3 (0 cerrado, 1 semiabierto, 2 abierto)',
+    multiprocess_mode='livemax'
+)
+
+CACHE_LOOKUPS = Counter(
+    'pokeneas_cache_lookups_total',
+    'Búsquedas en las cachés internas (hit/miss)',
+    ['cache', 'result']
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """
+    Registra una búsqueda en una caché.
+    
+    La tasa de aciertos se obtiene en Prometheus como
+    rate(...{result="hit"}) / rate(...).
+    
+    Args:
+        cache: Nombre de la caché (presigned_url, page, bucket_index...)
+        hit: Si la búsqueda fue un acierto
+    """
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def observe_s3_operation(operation: str, seconds: float, success: bool):
+    """
+    Registra la duración y el resultado de una operación de S3.
+    
+    Args:
+        operation: Nombre de la operación (presign, head_object, list)
+        seconds: Duración en segundos
+        success: Si la operación terminó sin error
+    """
+    S3_OPERATION_LATENCY.labels(operation).observe(seconds)
+    S3_OPERATIONS.labels(operation, 'success' if success else 'error').inc()
+
+
+def record_s3_rejection(operation: str):
+    """
+    Registra una operación de S3 rechazada por el circuito abierto.
+    
+    Args:
+        operation: Nombre de la operación
+    """
+    S3_OPERATIONS.labels(operation, 'rejected').inc()
+
+
+def set_s3_circuit_state(value: int):
+    """
+    Publica el estado del circuit breaker de S3.
+    
+    Args:
+        value: 0 cerrado, 1 semiabierto, 2 abierto
+    """
+    S3_CIRCUIT_STATE.set(value)
+
+
+@contextmanager
+def track_s3_operation(operation: str):
+    """
+    Mide una operación de S3; cualquier excepción cuenta como error.
+    
+    Args:
+        operation: Nombre de la operación (presign, head_object, list)
+    """
+    start = time.perf_counter()
+    success = False
+    try:
+        yield
+        success = True
+    finally:
+        observe_s3_operation(operation, time.perf_counter() - start, success)
+
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+
+
+def _observe_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.labels(route, request.method).observe(time.perf_counter() - start)
+        REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+    return response
+
+
+def metrics_view():
+    """Expone las métricas en formato de texto de Prometheus."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """
+    Registra la instrumentación de peticiones y la ruta /metrics.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,134 @@
+"""
+Verificación de integridad entre el catálogo y el bucket.
+
+Comprueba que cada `imagen` del catálogo exista en S3 y, con la
+estrategia de listado, qué objetos del bucket no usa el catálogo.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from app.metrics import track_s3_operation
+from app.storage.s3 import S3Client
+
+# Estrategias soportadas por verify_catalog
+STRATEGIES = ('list', 'head')
+
+
+def common_prefix(keys: List[str]) -> str:
+    """
+    Prefijo de directorio común a todas las claves.
+    
+    Args:
+        keys: Claves del catálogo
+    
+    Returns:
+        Prefijo hasta la última '/' compartida ('' si no hay)
+    """
+    prefix = os.path.commonprefix(keys) if keys else ''
+    return prefix[:prefix.rfind('/') + 1]
+
+
+def verify_by_listing(keys: List[str], s3_client: S3Client) -> Dict:
+    """
+    Compara el catálogo con un listado paginado del bucket.
+    
+    Cuesta una petición por cada 1000 objetos bajo el prefijo común, sin
+    importar el tamaño del catálogo.
+    
+    Args:
+        keys: Claves del catálogo
+        s3_client: Cliente S3
+    
+    Returns:
+        Diccionario con prefix, missing, orphaned y errors
+    """
+    prefix = common_prefix(keys)
+    bucket_keys = set()
+    for objects in s3_client.iter_object_pages(prefix=prefix):
+        bucket_keys.update(obj["Key"] for obj in objects)
+    
+    catalog_keys = set(keys)
+    return {
+        "prefix": prefix,
+        "missing": sorted(catalog_keys - bucket_keys),
+        "orphaned": sorted(bucket_keys - catalog_keys),
+        "errors": {}
+    }
+
+
+def verify_by_head(keys: List[str], s3_client: S3Client, max_workers: int) -> Dict:
+    """
+    Comprueba cada clave con head_object en un pool de hilos.
+    
+    Útil cuando el bucket es mucho mayor que el catálogo. El paralelismo
+    no debería superar S3_MAX_POOL_CONNECTIONS: botocore descarta las
+    conexiones que no caben en el pool.
+    
+    Args:
+        keys: Claves del catálogo
+        s3_client: Cliente S3
+        max_workers: Peticiones HEAD simultáneas
+    
+    Returns:
+        Diccionario con missing y errors (orphaned es None: no se lista el bucket)
+    """
+    from botocore.exceptions import ClientError
+    client = s3_client.client_for('head_object')
+    
+    def head(key: str) -> Tuple[str, Optional[str]]:
+        # Retorna (clave, None) si existe, (clave, 'missing') o (clave, error)
+        try:
+            with s3_client.guard('head_object'), track_s3_operation('head_object'):
+                client.head_object(Bucket=s3_client.bucket, Key=key)
+            return key, None
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            return key, 'missing' if code in ('404', 'NoSuchKey') else code
+        except Exception as e:
+            return key, str(e)
+    
+    missing = []
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for key, status in pool.map(head, sorted(set(keys))):
+            if status == 'missing':
+                missing.append(key)
+            elif status is not None:
+                errors[key] = status
+    return {"missing": missing, "orphaned": None, "errors": errors}
+
+
+def verify_catalog(keys: List[str], s3_client: S3Client, strategy: str = 'list',
+                   max_workers: int = 10) -> Dict:
+    """
+    Verifica que las claves del catálogo existan en el bucket.
+    
+    Args:
+        keys: Claves de las imágenes del catálogo
+        s3_client: Cliente S3
+        strategy: 'list' (un listado paginado) o 'head' (HEAD concurrentes)
+        max_workers: Paralelismo de la estrategia 'head'
+    
+    Returns:
+        Reporte con: bucket, strategy, checked, missing, orphaned, errors,
+        duration_s y ok
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia desconocida: {strategy}")
+    
+    start = time.perf_counter()
+    if strategy == 'list':
+        result = verify_by_listing(keys, s3_client)
+    else:
+        result = verify_by_head(keys, s3_client, max_workers)
+    
+    report = {
+        "bucket": s3_client.bucket,
+        "strategy": strategy,
+        "checked": len(set(keys)),
+        **result,
+        "duration_s": round(time.perf_counter() - start, 3)
+    }
+    report["ok"] = not report["missing"] and not report["errors"]
+    return report
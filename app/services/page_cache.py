@@ -0,0 +1,156 @@
+"""
+Caché de páginas HTML ya renderizadas de la vista de Pokeneas.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+from flask import current_app
+from app.data.catalog import content_etag
+from app.metrics import record_cache_lookup
+
+
+class CachedPage:
+    """Página renderizada junto con su ETag fuerte."""
+    
+    __slots__ = ('image_url', 'body', 'etag')
+    
+    def __init__(self, image_url: Optional[str], body: bytes):
+        """
+        Construye la entrada.
+        
+        Args:
+            image_url: URL de imagen usada en el render
+            body: Cuerpo HTML codificado
+        """
+        self.image_url = image_url
+        self.body = body
+        self.etag = content_etag(body)
+
+
+class RenderedPageCache:
+    """
+    Caché de la página /pokenea renderizada, por Pokenea.
+    
+    Para un worker la página solo depende del Pokenea y de la URL de su
+    imagen, así que se guarda una entrada por registro del catálogo junto
+    con la URL usada. Cuando la URL cambia (p. ej. se rota una URL
+    presignada) la entrada anterior deja de coincidir y se reemplaza en el
+    siguiente render; cuando se recarga el catálogo, los registros
+    modificados son objetos nuevos y no encuentran la página anterior.
+    
+    Con catálogos grandes se conservan solo las `max_entries` páginas
+    usadas más recientemente (LRU).
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        """
+        Inicializa la caché vacía.
+        
+        Args:
+            max_entries: Número máximo de páginas guardadas
+        """
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+    
+    def get(self, pokenea: Hashable, image_url: Optional[str]) -> Optional[CachedPage]:
+        """
+        Obtiene la página cacheada si fue renderizada con la misma URL de imagen.
+        
+        Args:
+            pokenea: Registro del Pokenea (o su id)
+            image_url: URL de imagen resuelta para esta petición
+            
+        Returns:
+            CachedPage o None
+        """
+        with self._lock:
+            entry = self._pages.get(pokenea)
+            if entry is not None:
+                self._pages.move_to_end(pokenea)
+        if entry is not None and entry.image_url == image_url:
+            self.hits += 1
+            record_cache_lookup('page', True)
+            return entry
+        self.misses += 1
+        record_cache_lookup('page', False)
+        return None
+    
+    def set(self, pokenea: Hashable, image_url: Optional[str], body: bytes) -> CachedPage:
+        """
+        Guarda una página renderizada, reemplazando la de otra URL de imagen.
+        
+        Args:
+            pokenea: Registro del Pokenea (o su id)
+            image_url: URL de imagen usada en el render
+            body: Cuerpo HTML codificado
+            
+        Returns:
+            La entrada guardada
+        """
+        page = CachedPage(image_url, body)
+        with self._lock:
+            previous = self._pages.get(pokenea)
+            if previous is not None and previous.image_url != image_url:
+                self.invalidations += 1
+            self._pages[pokenea] = page
+            self._pages.move_to_end(pokenea)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+                self.evictions += 1
+        return page
+    
+    def retain(self, keep: Callable[[Hashable], bool]):
+        """
+        Descarta las páginas cuyo registro ya no es válido.
+        
+        Args:
+            keep: Función que recibe el registro y retorna si se conserva
+        """
+        with self._lock:
+            self._pages = OrderedDict((key, page) for key, page in self._pages.items() if keep(key))
+    
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._pages = OrderedDict()
+    
+    def stats(self) -> Dict:
+        """
+        Retorna los contadores de la caché.
+        
+        Returns:
+            Diccionario con: size, max_entries, hits, misses, invalidations,
+            evictions, hit_ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._pages),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+def get_page_cache() -> Optional[RenderedPageCache]:
+    """
+    Obtiene la caché de páginas de la aplicación actual.
+    
+    Returns:
+        RenderedPageCache o None si está deshabilitada
+    """
+    if not current_app.config.get('PAGE_CACHE_ENABLED', True):
+        return None
+    page_cache = current_app.extensions.get('page_cache')
+    if page_cache is None:
+        page_cache = current_app.extensions.setdefault('page_cache', RenderedPageCache(
+            current_app.config.get('PAGE_CACHE_MAX_ENTRIES', 1024)
+        ))
+    return page_cache
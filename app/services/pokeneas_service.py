@@ -2,43 +2,98 @@
 Servicio de lógica de negocio para Pokeneas.
 """
 import random
-import socket
-from typing import Dict, Optional
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
 from flask import current_app
-from app.data.pokeneas import POKENEAS_DATA
+from app.data.catalog import Catalog, PokeneaRecord, get_catalog
+from app.services.sampling import UNIFORM_PROFILE, UnknownProfileError, get_alias_table, parse_profiles
 from app.storage.s3 import get_s3_client
 
 
 class PokeneasService:
     """Servicio para manejar la lógica de Pokeneas."""
     
-    def __init__(self):
-        """Inicializa el servicio."""
-        self.pokeneas = POKENEAS_DATA
+    def __init__(self, catalog: Catalog = None, profiles: Dict = None,
+                 default_profile: str = UNIFORM_PROFILE, rng=None):
+        """
+        Inicializa el servicio.
+        
+        Args:
+            catalog: Catálogo fijo (default: el vigente de la aplicación, que
+                puede recargarse en caliente)
+            profiles: Perfiles de selección (perfil → pesos por rareza o None)
+            default_profile: Perfil usado cuando la petición no indica uno
+            rng: Generador aleatorio (default: el módulo random)
+        """
+        self._catalog = catalog
+        self.profiles = parse_profiles(profiles)
+        self.default_profile = default_profile
+        self.rng = rng if rng is not None else random
     
-    def get_random_pokenea(self) -> Dict:
+    @property
+    def catalog(self) -> Catalog:
         """
-        Selecciona un Pokenea aleatorio del arreglo.
+        Catálogo vigente.
         
+        Cada método lo lee una sola vez para no mezclar dos versiones si
+        se publica uno nuevo a mitad de la petición.
+        """
+        return self._catalog if self._catalog is not None else get_catalog()
+    
+    @property
+    def pokeneas(self):
+        """Registros del catálogo."""
+        return self.catalog.records
+    
+    def resolve_profile(self, profile: str = None) -> Tuple[str, Optional[Dict[str, float]]]:
+        """
+        Obtiene el nombre y los pesos de un perfil de selección.
+        
+        Args:
+            profile: Nombre del perfil (default: el perfil por defecto)
+            
         Returns:
-            Diccionario con los datos del Pokenea
+            Tupla (nombre, pesos por rareza o None si es uniforme)
+            
+        Raises:
+            UnknownProfileError: Si el perfil no está configurado
         """
-        return random.choice(self.pokeneas)
+        name = profile or self.default_profile
+        if name not in self.profiles:
+            raise UnknownProfileError(name)
+        return name, self.profiles[name]
+    
+    def _random_position(self, catalog: Catalog, profile: str = None) -> Optional[int]:
+        """Posición ponderada según el perfil, o None si el perfil es uniforme."""
+        table = get_alias_table(catalog, *self.resolve_profile(profile))
+        return table.draw(self.rng) if table is not None else None
+    
+    def get_random_pokenea(self, profile: str = None) -> PokeneaRecord:
+        """
+        Selecciona un Pokenea aleatorio del catálogo.
+        
+        Args:
+            profile: Perfil de selección (default: el perfil por defecto)
+        
+        Returns:
+            Registro del Pokenea
+        """
+        catalog = self.catalog
+        position = self._random_position(catalog, profile)
+        if position is None:
+            return self.rng.choice(catalog.records)
+        return catalog.records[position]
     
     def get_container_id(self) -> str:
         """
         Obtiene el ID del contenedor actual.
         
-        En Docker, el hostname del contenedor es su ID.
+        Se resuelve una sola vez al construir el catálogo.
         
         Returns:
             ID del contenedor (hostname)
         """
-        try:
-            return socket.gethostname()
-        except Exception as e:
-            current_app.logger.error(f"Error al obtener container ID: {e}")
-            return "unknown"
+        return self.catalog.container_id
     
     def resolve_image_url(self, image_key: str) -> Optional[str]:
         """
@@ -65,45 +120,275 @@ class PokeneasService:
             Diccionario con: id, nombre, altura, habilidad, container_id
         """
         pokenea = self.get_random_pokenea()
-        container_id = self.get_container_id()
+        return pokenea.api_dict(self.get_container_id())
+    
+    def get_pokenea_api_payload(self, profile: str = None) -> bytes:
+        """
+        Obtiene el JSON ya serializado de un Pokenea aleatorio.
         
-        return {
-            "id": pokenea["id"],
-            "nombre": pokenea["nombre"],
-            "altura": pokenea["altura"],
-            "habilidad": pokenea["habilidad"],
-            "container_id": container_id
-        }
+        Mismo contenido que get_pokenea_for_api, sin serializar por petición.
+        
+        Args:
+            profile: Perfil de selección (default: el perfil por defecto)
+        
+        Returns:
+            Cuerpo JSON codificado en UTF-8
+        """
+        catalog = self.catalog
+        position = self._random_position(catalog, profile)
+        if position is None:
+            return self.rng.choice(catalog.api_payloads)
+        return catalog.api_payloads[position]
     
-    def get_pokenea_for_view(self) -> Dict:
+    def get_pokenea_by_id(self, pokenea_id: int) -> Optional[PokeneaRecord]:
+        """
+        Busca un Pokenea por su id en el índice del catálogo.
+        
+        Args:
+            pokenea_id: ID del Pokenea
+            
+        Returns:
+            Registro del Pokenea o None si no existe
+        """
+        return self.catalog.by_id.get(pokenea_id)
+    
+    def get_pokenea_api_payload_by_id(self, pokenea_id: int) -> Optional[Tuple[bytes, str]]:
+        """
+        Obtiene el JSON precalculado de un Pokenea y su ETag.
+        
+        Args:
+            pokenea_id: ID del Pokenea
+            
+        Returns:
+            Tupla (cuerpo JSON, ETag) o None si no existe
+        """
+        catalog = self.catalog
+        position = catalog.positions.get(pokenea_id)
+        if position is None:
+            return None
+        return catalog.api_payloads[position], catalog.api_etags[position]
+    
+    def sample_indices(self, count: int, replace: bool = True, seed: str = None,
+                       catalog: Catalog = None, profile: str = None) -> List[int]:
+        """
+        Elige posiciones aleatorias del catálogo.
+        
+        Args:
+            count: Número de Pokeneas a elegir
+            replace: Si es True se permiten repetidos (random.choices);
+                si es False todos son distintos (random.sample)
+            seed: Semilla opcional para obtener siempre la misma secuencia
+            catalog: Catálogo ya leído por el llamador (default: el vigente)
+            profile: Perfil de selección (default: el perfil por defecto)
+            
+        Returns:
+            Lista de posiciones en catalog.records
+            
+        Raises:
+            ValueError: Si se piden más Pokeneas sin repetición que los del
+                catálogo, o sin repetición con un perfil ponderado
+        """
+        catalog = catalog if catalog is not None else self.catalog
+        rng = random.Random(seed) if seed is not None else self.rng
+        table = get_alias_table(catalog, *self.resolve_profile(profile))
+        if table is not None:
+            if not replace:
+                raise ValueError("Los perfiles ponderados solo admiten selección con repetición")
+            return table.draw_many(count, rng)
+        positions = range(len(catalog))
+        if replace:
+            return rng.choices(positions, k=count)
+        return rng.sample(positions, count)
+    
+    def get_pokeneas_api_batch(self, count: int, replace: bool = True, seed: str = None,
+                               profile: str = None) -> bytes:
+        """
+        Obtiene varios Pokeneas aleatorios como un solo cuerpo JSON.
+        
+        Cada elemento tiene el mismo formato que get_pokenea_for_api y se
+        toma del JSON precalculado del catálogo, sin volver a serializar.
+        
+        Args:
+            count: Número de Pokeneas
+            replace: Si se permiten repetidos
+            seed: Semilla opcional para resultados reproducibles
+            profile: Perfil de selección (default: el perfil por defecto)
+            
+        Returns:
+            JSON {"count": N, "pokeneas": [...]} codificado en UTF-8
+        """
+        catalog = self.catalog
+        payloads = catalog.api_payloads
+        items = b",".join(
+            payloads[position].rstrip(b"\n")
+            for position in self.sample_indices(count, replace, seed, catalog=catalog, profile=profile)
+        )
+        return b'{"count":%d,"pokeneas":[%s]}\n' % (count, items)
+    
+    def filter_pokeneas_api(self, limit: int, after: int = None, **filters) -> bytes:
+        """
+        Obtiene los Pokeneas que cumplen los filtros, paginados por id.
+        
+        Args:
+            limit: Máximo de Pokeneas por página
+            after: Último id de la página anterior
+            **filters: habilidad, altura_min, altura_max, id_min e id_max
+                (ver AttributeIndex.query)
+            
+        Returns:
+            JSON {"count": N, "pokeneas": [...], "next_after": id o null}
+            codificado en UTF-8
+        """
+        catalog = self.catalog
+        positions, next_after = catalog.index.query(after=after, limit=limit, **filters)
+        items = b",".join(catalog.api_payloads[position].rstrip(b"\n") for position in positions)
+        return b'{"count":%d,"pokeneas":[%s],"next_after":%s}\n' % (
+            len(positions), items, b"null" if next_after is None else b"%d" % next_after
+        )
+    
+    def resolve_image_urls(self, image_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resuelve las URLs de varias imágenes con una sola llamada al cliente S3.
+        
+        Args:
+            image_keys: Claves de las imágenes en S3
+            
+        Returns:
+            Diccionario clave → URL (vacío si no se pueden resolver)
+        """
+        try:
+            return get_s3_client().get_image_urls(image_keys)
+        except Exception as e:
+            current_app.logger.error(f"Error al resolver URLs de imágenes: {e}")
+            return {}
+    
+    def export_range(self, after: int = None, start: int = None) -> Tuple[Catalog, int, int]:
+        """
+        Fija el catálogo de una exportación y su punto de inicio.
+        
+        Args:
+            after: Cursor: id del último Pokenea ya recibido
+            start: Número de Pokeneas (en orden de id) a omitir
+            
+        Returns:
+            Tupla (catálogo, primera posición en orden de id, total)
+        """
+        catalog = self.catalog
+        ids = catalog.index.ids
+        first = 0
+        if after is not None:
+            first = bisect_right(ids, after)
+        if start is not None:
+            first = max(first, start)
+        return catalog, min(first, len(ids)), len(ids)
+    
+    def iter_export(self, catalog: Catalog, first: int, dumps, batch_size: int = 500) -> Iterator[bytes]:
+        """
+        Genera el catálogo como NDJSON, un lote de líneas a la vez.
+        
+        Solo un lote de URLs y de líneas está en memoria a la vez; el
+        catálogo es la foto fijada por export_range, aunque se recargue
+        durante la descarga.
+        
+        Args:
+            catalog: Catálogo de la exportación
+            first: Primera posición en orden de id
+            dumps: Función de serialización JSON (sin saltos de línea)
+            batch_size: Pokeneas por lote de URLs
+            
+        Yields:
+            Bytes con varias líneas JSON, cada una terminada en salto de línea
+        """
+        positions = catalog.index.id_positions
+        container_id = catalog.container_id
+        for offset in range(first, len(positions), batch_size):
+            records = [catalog.records[p] for p in positions[offset:offset + batch_size]]
+            urls = self.resolve_image_urls([record.imagen for record in records])
+            yield "".join(
+                dumps({
+                    **record.to_dict(),
+                    "imagen_url": urls.get(record.imagen),
+                    "container_id": container_id
+                }) + "\n"
+                for record in records
+            ).encode('utf-8')
+    
+    def search_pokeneas_api(self, query: str, limit: int) -> bytes:
+        """
+        Busca Pokeneas por palabras del nombre y la frase filosófica.
+        
+        Args:
+            query: Texto de la consulta
+            limit: Máximo de resultados
+            
+        Returns:
+            JSON {"count": N, "pokeneas": [...]} ordenado por relevancia,
+            codificado en UTF-8
+        """
+        catalog = self.catalog
+        results = catalog.search.search(query, limit)
+        items = b",".join(
+            catalog.api_payloads[catalog.positions[doc_id]].rstrip(b"\n") for doc_id, _ in results
+        )
+        return b'{"count":%d,"pokeneas":[%s]}\n' % (len(results), items)
+    
+    def get_pokenea_for_view(self, profile: str = None) -> Dict:
         """
         Obtiene un Pokenea aleatorio formateado para la vista HTML.
         
+        Args:
+            profile: Perfil de selección (default: el perfil por defecto)
+        
         Returns:
             Diccionario con todos los campos incluyendo imagen_url y container_id
         """
-        pokenea = self.get_random_pokenea()
-        container_id = self.get_container_id()
+        pokenea = self.get_random_pokenea(profile)
         
         # Resolver URL de la imagen
-        image_url = self.resolve_image_url(pokenea["imagen"])
+        image_url = self.resolve_image_url(pokenea.imagen)
+        
+        return self.format_for_view(pokenea, image_url)
+    
+    def format_for_view(self, pokenea: PokeneaRecord, image_url: Optional[str]) -> Dict:
+        """
+        Formatea un Pokenea para la vista HTML con una URL de imagen ya resuelta.
+        
+        Args:
+            pokenea: Registro del Pokenea
+            image_url: URL de la imagen o None
+            
+        Returns:
+            Diccionario con todos los campos incluyendo imagen_url y container_id
+        """
+        container_id = self.get_container_id()
         
         return {
-            "id": pokenea["id"],
-            "nombre": pokenea["nombre"],
-            "altura": pokenea["altura"],
-            "habilidad": pokenea["habilidad"],
+            "id": pokenea.id,
+            "nombre": pokenea.nombre,
+            "altura": pokenea.altura,
+            "habilidad": pokenea.habilidad,
+            "imagen": pokenea.imagen,
             "imagen_url": image_url,
-            "frase_filosofica": pokenea["frase_filosofica"],
+            "frase_filosofica": pokenea.frase_filosofica,
+            "rareza": pokenea.rareza,
             "container_id": container_id
         }
 
 
 def get_pokeneas_service() -> PokeneasService:
     """
-    Factory function para obtener una instancia del servicio.
+    Obtiene la instancia compartida del servicio para la aplicación actual.
     
     Returns:
         Instancia de PokeneasService
     """
-    return PokeneasService()
+    service = current_app.extensions.get('pokeneas_service')
+    if service is None:
+        seed = current_app.config.get('SAMPLER_SEED')
+        service = PokeneasService(
+            profiles=current_app.config.get('RARITY_PROFILES'),
+            default_profile=current_app.config.get('RARITY_DEFAULT_PROFILE', UNIFORM_PROFILE),
+            rng=random.Random(seed) if seed else None
+        )
+        current_app.extensions['pokeneas_service'] = service
+    return service
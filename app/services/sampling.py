@@ -0,0 +1,152 @@
+"""
+Selección aleatoria ponderada en tiempo constante.
+
+Usa el método alias de Vose: una tabla de O(n) construida una sola vez
+por catálogo y perfil permite sacar cada Pokenea con un número aleatorio
+y una comparación, sin importar el tamaño del catálogo.
+"""
+import random
+from array import array
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# Perfil que conserva la selección uniforme original
+UNIFORM_PROFILE = 'uniforme'
+
+
+class UnknownProfileError(ValueError):
+    """El perfil de selección pedido no está configurado."""
+
+
+class AliasTable:
+    """Tabla alias de Vose para muestrear índices con pesos arbitrarios."""
+    
+    __slots__ = ('prob', 'alias', 'size')
+    
+    def __init__(self, weights: Sequence[float]):
+        """
+        Construye la tabla en O(n).
+        
+        Args:
+            weights: Peso no negativo de cada índice (al menos uno positivo)
+        
+        Raises:
+            ValueError: Si no hay pesos o todos son cero
+        """
+        size = len(weights)
+        total = float(sum(weights))
+        if size == 0 or total <= 0:
+            raise ValueError("Se necesita al menos un peso positivo")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("Los pesos no pueden ser negativos")
+        
+        scaled = [weight * size / total for weight in weights]
+        prob = array('d', bytes(8 * size))
+        alias = array('q', bytes(8 * size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Lo que queda tiene probabilidad 1 salvo error de redondeo
+        for i in large + small:
+            prob[i] = 1.0
+            alias[i] = i
+        
+        self.prob = prob
+        self.alias = alias
+        self.size = size
+    
+    def draw(self, rng=random) -> int:
+        """
+        Saca un índice en O(1).
+        
+        Args:
+            rng: Generador con random() (default: el módulo random)
+        
+        Returns:
+            Índice elegido
+        """
+        u = rng.random() * self.size
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+    
+    def draw_many(self, count: int, rng=random) -> List[int]:
+        """
+        Saca `count` índices con reemplazo.
+        
+        Args:
+            count: Número de índices
+            rng: Generador con random()
+        
+        Returns:
+            Lista de índices
+        """
+        prob = self.prob
+        alias = self.alias
+        size = self.size
+        rand = rng.random
+        result = []
+        for _ in range(count):
+            u = rand() * size
+            i = int(u)
+            result.append(i if u - i < prob[i] else alias[i])
+        return result
+
+
+def profile_weights(rarities: Sequence[str], weights: Mapping[str, float]) -> List[float]:
+    """
+    Pesos por Pokenea a partir de los pesos por rareza de un perfil.
+    
+    Args:
+        rarities: Rareza de cada Pokenea, en el orden del catálogo
+        weights: Peso de cada rareza (las ausentes pesan 0)
+    
+    Returns:
+        Lista de pesos
+    """
+    return [float(weights.get(rareza, 0)) for rareza in rarities]
+
+
+def get_alias_table(catalog, profile: str, weights: Optional[Mapping[str, float]]) -> Optional[AliasTable]:
+    """
+    Tabla alias de un perfil para un catálogo, construida la primera vez que se usa.
+    
+    La tabla se guarda en el propio catálogo, así que cada foto publicada
+    tiene las suyas y una recarga nunca mezcla pesos con registros.
+    
+    Args:
+        catalog: Catálogo vigente
+        profile: Nombre del perfil
+        weights: Pesos por rareza (None: selección uniforme)
+    
+    Returns:
+        AliasTable o None si el perfil es uniforme
+    """
+    if weights is None:
+        return None
+    table = catalog.samplers.get(profile)
+    if table is None:
+        table = AliasTable(profile_weights([record.rareza for record in catalog.records], weights))
+        # Dos hilos pueden construirla a la vez; el resultado es el mismo
+        table = catalog.samplers.setdefault(profile, table)
+    return table
+
+
+def parse_profiles(value) -> Dict[str, Optional[Dict[str, float]]]:
+    """
+    Normaliza RARITY_PROFILES.
+    
+    Args:
+        value: Diccionario perfil → pesos por rareza (o None para uniforme)
+    
+    Returns:
+        Perfiles con el uniforme siempre presente
+    """
+    profiles = dict(value or {})
+    profiles.setdefault(UNIFORM_PROFILE, None)
+    return profiles
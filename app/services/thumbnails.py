@@ -0,0 +1,482 @@
+"""
+Miniaturas de las imágenes del bucket.
+
+Las tarjetas de /pokenea e /imagenes ocupan ~300px, pero el navegador
+descargaba el original completo desde S3. `/thumb/<size>/<key>` descarga
+el original una vez, lo redimensiona y guarda el resultado en una caché
+en disco acotada por bytes; las plantillas ofrecen las variantes con
+`srcset` para que el cliente elija la menor que le sirva.
+"""
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import click
+from flask import current_app, url_for
+from flask.cli import AppGroup
+from app.metrics import record_cache_lookup, track_s3_operation
+from app.storage.s3 import S3Client, get_s3_client
+
+# Pillow es opcional: sin él se sirven los originales. Solo se comprueba que
+# esté instalado; se importa al generar la primera miniatura
+PILLOW_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+logger = logging.getLogger(__name__)
+
+# Extensiones para las que se ofrecen miniaturas
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+# Claves con resultado negativo (404/415) recordadas por proceso
+NEGATIVE_CACHE_SIZE = 1024
+
+
+class UnsupportedImageError(ValueError):
+    """El objeto no es una imagen que Pillow pueda decodificar."""
+
+
+def resize_variants(data: bytes, sizes: Iterable[int], quality: int = 82) -> Dict[int, bytes]:
+    """
+    Genera las miniaturas JPEG de una imagen.
+    
+    Es una función de módulo para poder ejecutarse en un pool de procesos.
+    
+    Args:
+        data: Bytes de la imagen original
+        sizes: Lados máximos en píxeles (la imagen se ajusta a un cuadrado de ese lado)
+        quality: Calidad JPEG
+    
+    Returns:
+        Diccionario tamaño → bytes JPEG
+    
+    Raises:
+        UnsupportedImageError: Si los bytes no son una imagen válida
+    """
+    from PIL import Image, ImageOps
+    try:
+        original = Image.open(io.BytesIO(data))
+        original = ImageOps.exif_transpose(original)
+        original.load()
+    except Exception as e:
+        raise UnsupportedImageError(str(e)) from e
+    
+    if original.mode in ('RGBA', 'LA', 'P'):
+        # JPEG no admite transparencia: se compone sobre fondo blanco
+        rgba = original.convert('RGBA')
+        original = Image.new('RGB', rgba.size, (255, 255, 255))
+        original.paste(rgba, mask=rgba.getchannel('A'))
+    elif original.mode != 'RGB':
+        original = original.convert('RGB')
+    
+    variants = {}
+    for size in sorted(sizes, reverse=True):
+        image = original.copy()
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+        variants[size] = buffer.getvalue()
+    return variants
+
+
+class ThumbnailCache:
+    """
+    Caché de miniaturas en disco acotada por bytes.
+    
+    Cada acierto actualiza el mtime del archivo; al superar el presupuesto
+    se borran los archivos con mtime más antiguo (LRU aproximado). Los
+    workers comparten el directorio, así que el tamaño es una estimación
+    por proceso que se recalcula al desalojar.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Inicializa la caché.
+        
+        Args:
+            directory: Directorio de la caché (se crea si no existe)
+            max_bytes: Presupuesto total en bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._scan())
+    
+    def path_for(self, size: int, key: str) -> str:
+        """Ruta del archivo de la miniatura (la clave se hashea: no hay rutas arbitrarias)."""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, str(size), digest[:2], f"{digest}.jpg")
+    
+    def get(self, size: int, key: str) -> Optional[str]:
+        """
+        Retorna la ruta de la miniatura si está en caché.
+        
+        Args:
+            size: Tamaño de la miniatura
+            key: Clave del objeto original
+        
+        Returns:
+            Ruta del archivo o None
+        """
+        path = self.path_for(size, key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+    
+    def put(self, size: int, key: str, data: bytes) -> str:
+        """
+        Guarda una miniatura de forma atómica.
+        
+        Args:
+            size: Tamaño de la miniatura
+            key: Clave del objeto original
+            data: Bytes JPEG
+        
+        Returns:
+            Ruta del archivo guardado
+        """
+        path = self.path_for(size, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+    
+    def _scan(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.jpg'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+    
+    def _evict(self):
+        # Se desaloja hasta el 90% para no recorrer el directorio en cada escritura
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._total_bytes = total
+
+
+class ThumbnailService:
+    """Genera y sirve miniaturas desde la caché en disco."""
+    
+    def __init__(self, s3_client: S3Client, cache: ThumbnailCache,
+                 sizes: Tuple[int, ...], quality: int = 82,
+                 max_source_bytes: int = 20 * 1024 * 1024, negative_ttl: float = 300):
+        """
+        Inicializa el servicio.
+        
+        Args:
+            s3_client: Cliente S3 de donde se descargan los originales
+            cache: Caché en disco
+            sizes: Tamaños permitidos
+            quality: Calidad JPEG
+            max_source_bytes: Tamaño máximo del original que se descarga
+            negative_ttl: Segundos que se recuerda un original inexistente o inválido
+        """
+        self.s3_client = s3_client
+        self.cache = cache
+        self.sizes = tuple(sorted(sizes))
+        self.quality = quality
+        self.max_source_bytes = max_source_bytes
+        self.negative_ttl = negative_ttl
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._inflight_lock = threading.Lock()
+        # clave → (instante de expiración, mensaje de UnsupportedImageError o None si no existe)
+        self._failures = OrderedDict()
+        self._failures_lock = threading.Lock()
+    
+    def _remember_failure(self, key: str, message: Optional[str]):
+        with self._failures_lock:
+            self._failures[key] = (time.monotonic() + self.negative_ttl, message)
+            self._failures.move_to_end(key)
+            while len(self._failures) > NEGATIVE_CACHE_SIZE:
+                self._failures.popitem(last=False)
+    
+    def _known_failure(self, key: str) -> Optional[Tuple[float, Optional[str]]]:
+        with self._failures_lock:
+            failure = self._failures.get(key)
+            if failure is not None and failure[0] <= time.monotonic():
+                del self._failures[key]
+                return None
+            return failure
+    
+    def download(self, key: str) -> Optional[bytes]:
+        """
+        Descarga un original comprobando extensión y tamaño antes de leerlo.
+        
+        Args:
+            key: Clave del objeto original
+        
+        Returns:
+            Bytes del original o None si no existe
+        
+        Raises:
+            UnsupportedImageError: Si la clave no es una imagen o supera max_source_bytes
+        """
+        if not key.lower().endswith(IMAGE_EXTENSIONS):
+            raise UnsupportedImageError(f"{key} no tiene extensión de imagen")
+        with track_s3_operation('get_object'):
+            response = self.s3_client.open_object(key)
+            if response is None:
+                return None
+            body = response['Body']
+            try:
+                if response.get('ContentLength', 0) > self.max_source_bytes:
+                    raise UnsupportedImageError(
+                        f"El original ocupa {response['ContentLength']} bytes "
+                        f"(máximo {self.max_source_bytes})"
+                    )
+                # Se lee un byte de más por si ContentLength no vino
+                data = body.read(self.max_source_bytes + 1)
+            finally:
+                body.close()
+        if len(data) > self.max_source_bytes:
+            raise UnsupportedImageError(f"El original supera {self.max_source_bytes} bytes")
+        return data
+    
+    def get_thumbnail(self, size: int, key: str) -> Optional[str]:
+        """
+        Obtiene la ruta de la miniatura, generándola si hace falta.
+        
+        Las peticiones concurrentes por la misma imagen esperan a una sola
+        descarga; se generan todos los tamaños de una vez. Los originales
+        inexistentes o inválidos se recuerdan `negative_ttl` segundos para
+        no volver a descargarlos en cada petición.
+        
+        Args:
+            size: Tamaño solicitado (debe estar en `sizes`)
+            key: Clave del objeto original
+        
+        Returns:
+            Ruta del archivo o None si el original no existe
+        
+        Raises:
+            UnsupportedImageError: Si el original no es una imagen (o es demasiado grande)
+        """
+        if not key.lower().endswith(IMAGE_EXTENSIONS):
+            raise UnsupportedImageError(f"{key} no tiene extensión de imagen")
+        path = self.cache.get(size, key)
+        record_cache_lookup('thumbnail', path is not None)
+        if path is not None:
+            return path
+        failure = self._known_failure(key)
+        if failure is not None:
+            if failure[1] is None:
+                return None
+            raise UnsupportedImageError(failure[1])
+        
+        with self._inflight_lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                path = self.cache.get(size, key)
+                if path is not None:
+                    return path
+                try:
+                    data = self.download(key)
+                    if data is None:
+                        self._remember_failure(key, None)
+                        return None
+                    variants = resize_variants(data, self.sizes, self.quality)
+                except UnsupportedImageError as e:
+                    self._remember_failure(key, str(e))
+                    raise
+                for variant_size, body in variants.items():
+                    stored = self.cache.put(variant_size, key, body)
+                    if variant_size == size:
+                        path = stored
+                return path
+            finally:
+                with self._inflight_lock:
+                    self._inflight.pop(key, None)
+    
+    def generate_all(self, keys: Iterable[str], workers: int = None,
+                     max_pending: int = None) -> Dict[str, int]:
+        """
+        Pregenera todos los tamaños para las claves dadas.
+        
+        Las descargas se hacen en este proceso y el redimensionado, que es
+        CPU, en un pool de procesos. Como mucho hay `max_pending` imágenes
+        enviadas al pool sin terminar: al llegar al límite se espera a que
+        acabe alguna y cada resultado se escribe en cuanto está listo, así
+        que la memoria no crece con el tamaño del bucket.
+        
+        Args:
+            keys: Claves de los originales
+            workers: Procesos del pool (default: núcleos disponibles)
+            max_pending: Imágenes en vuelo como máximo (default: 2 por proceso)
+        
+        Returns:
+            Conteo de generated, skipped, missing y failed
+        """
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        workers = workers or os.cpu_count() or 1
+        max_pending = max_pending or 2 * workers
+        report = {"generated": 0, "skipped": 0, "missing": 0, "failed": 0}
+        futures = {}
+        
+        def store(done):
+            for future in done:
+                key = futures.pop(future)
+                try:
+                    variants = future.result()
+                except Exception as e:
+                    logger.error(f"Error generando miniaturas de {key}: {e}")
+                    report["failed"] += 1
+                    continue
+                for size, body in variants.items():
+                    self.cache.put(size, key, body)
+                report["generated"] += 1
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for key in keys:
+                if all(os.path.exists(self.cache.path_for(size, key)) for size in self.sizes):
+                    report["skipped"] += 1
+                    continue
+                try:
+                    data = self.download(key)
+                except Exception as e:
+                    logger.error(f"Error descargando {key}: {e}")
+                    report["failed"] += 1
+                    continue
+                if data is None:
+                    report["missing"] += 1
+                    continue
+                futures[pool.submit(resize_variants, data, self.sizes, self.quality)] = key
+                if len(futures) >= max_pending:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    store(done)
+            
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                store(done)
+        return report
+
+
+def thumbnails_available() -> bool:
+    """Indica si las miniaturas están habilitadas y Pillow está instalado."""
+    return PILLOW_AVAILABLE and current_app.config.get('THUMBNAILS_ENABLED', True)
+
+
+def parse_sizes(value) -> Tuple[int, ...]:
+    """Convierte THUMBNAIL_SIZES ('160,320,640' o lista) en una tupla ordenada."""
+    if isinstance(value, str):
+        value = [part for part in value.split(',') if part.strip()]
+    return tuple(sorted(int(size) for size in value))
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """
+    Obtiene el servicio de miniaturas de la aplicación actual.
+    
+    Returns:
+        Instancia compartida de ThumbnailService
+    """
+    service = current_app.extensions.get('thumbnail_service')
+    if service is None:
+        config = current_app.config
+        service = current_app.extensions.setdefault('thumbnail_service', ThumbnailService(
+            get_s3_client(),
+            ThumbnailCache(
+                config.get('THUMBNAIL_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'pokeneas-thumbs'),
+                config.get('THUMBNAIL_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+            ),
+            parse_sizes(config.get('THUMBNAIL_SIZES', '160,320,640')),
+            config.get('THUMBNAIL_QUALITY', 82),
+            config.get('THUMBNAIL_MAX_SOURCE_BYTES', 20 * 1024 * 1024),
+            config.get('THUMBNAIL_NEGATIVE_TTL', 300)
+        ))
+    return service
+
+
+def thumbnail_srcset(key: Optional[str]) -> str:
+    """
+    Valor del atributo srcset con las miniaturas de una imagen.
+    
+    Los descriptores usan el lado máximo de cada tamaño como ancho.
+    
+    Args:
+        key: Clave del objeto original
+    
+    Returns:
+        srcset o cadena vacía si no hay miniaturas para esa clave
+    """
+    if not key or not key.lower().endswith(IMAGE_EXTENSIONS) or not thumbnails_available():
+        return ''
+    sizes = parse_sizes(current_app.config.get('THUMBNAIL_SIZES', '160,320,640'))
+    return ', '.join(
+        f"{url_for('thumbnails.get_thumbnail', size=size, key=key)} {size}w" for size in sizes
+    )
+
+
+# Comandos `flask thumbnails ...`
+thumbnails_cli = AppGroup('thumbnails', help='Gestión de las miniaturas.')
+
+
+@thumbnails_cli.command('generate')
+@click.option('--workers', type=int, default=None, help='Procesos de redimensionado')
+@click.option('--bucket', 'whole_bucket', is_flag=True, help='Todas las imágenes del bucket, no solo el catálogo')
+@click.option('--prefix', default='', help='Prefijo de las claves (con --bucket)')
+def generate_command(workers, whole_bucket, prefix):
+    """Pregenera todos los tamaños de miniatura."""
+    if not PILLOW_AVAILABLE:
+        raise click.ClickException("Pillow no está instalado")
+    service = get_thumbnail_service()
+    if whole_bucket:
+        keys = (
+            obj["Key"]
+            for objects in service.s3_client.iter_object_pages(prefix=prefix)
+            for obj in objects
+            if obj["Key"].lower().endswith(IMAGE_EXTENSIONS)
+        )
+    else:
+        from app.data.catalog import get_catalog
+        keys = [record.imagen for record in get_catalog().records]
+    
+    start = time.perf_counter()
+    report = service.generate_all(keys, workers=workers)
+    click.echo(
+        f"{report['generated']} generadas, {report['skipped']} ya en caché, "
+        f"{report['missing']} sin original, {report['failed']} con error "
+        f"en {time.perf_counter() - start:.1f}s"
+    )
+
+
+def init_thumbnails(app):
+    """
+    Registra la ruta de miniaturas, el helper de plantillas y el CLI.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    from app.blueprints.thumbnails import thumbnails_bp
+    app.register_blueprint(thumbnails_bp)
+    app.add_template_global(thumbnail_srcset)
+    app.cli.add_command(thumbnails_cli)
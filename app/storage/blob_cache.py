@@ -0,0 +1,237 @@
+"""
+Caché local de objetos del bucket (read-through) para /img/<key>.
+
+Los objetos se guardan direccionados por contenido: el archivo se llama
+como el SHA-256 de sus bytes, y un índice por clave apunta al blob junto
+con su tipo de contenido. Dos claves con el mismo contenido comparten
+blob. El primer fallo descarga desde S3 (una sola descarga aunque haya
+peticiones concurrentes) y los aciertos se sirven desde disco.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from flask import current_app
+from app.metrics import record_cache_lookup, track_s3_operation
+from app.storage.s3 import S3Client, get_s3_client
+
+# Tamaño de los bloques copiados de S3 a disco
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobEntry(NamedTuple):
+    """Objeto disponible en la caché."""
+    path: str
+    digest: str
+    content_type: str
+    size: int
+
+
+class BlobCache:
+    """
+    Caché de objetos en disco acotada por bytes.
+    
+    Estructura del directorio:
+        blobs/<aa>/<sha256>   contenido
+        keys/<aa>/<sha1>.json índice clave → blob, tipo de contenido y fecha
+    
+    Las entradas del índice vencen tras `ttl` segundos y se vuelven a
+    descargar, así un objeto reemplazado en S3 deja de servirse. Cada
+    acierto actualiza el mtime del blob y al superar `max_bytes` se borran
+    los blobs más antiguos.
+    """
+    
+    def __init__(self, s3_client: S3Client, directory: str, max_bytes: int, ttl: float = 3600):
+        """
+        Inicializa la caché.
+        
+        Args:
+            s3_client: Cliente S3 desde el que se llenan los fallos
+            directory: Directorio de la caché (se crea si no existe)
+            max_bytes: Presupuesto total de los blobs en bytes
+            ttl: Segundos que una entrada del índice se considera vigente
+        """
+        self.s3_client = s3_client
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._blob_dir = os.path.join(directory, 'blobs')
+        self._key_dir = os.path.join(directory, 'keys')
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._key_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._total_bytes = sum(size for _, size, _ in self._scan_blobs())
+    
+    def blob_path(self, digest: str) -> str:
+        """Ruta del blob con el digest dado."""
+        return os.path.join(self._blob_dir, digest[:2], digest)
+    
+    def lookup(self, key: str, allow_stale: bool = False) -> Optional[BlobEntry]:
+        """
+        Busca una clave en la caché sin tocar S3.
+        
+        Args:
+            key: Clave del objeto
+            allow_stale: Si es True, también retorna entradas vencidas
+        
+        Returns:
+            BlobEntry o None si no está, venció o su blob fue desalojado
+        """
+        try:
+            with open(self._index_path(key)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not allow_stale and time.time() - meta['fetched_at'] > self.ttl:
+            return None
+        path = self.blob_path(meta['digest'])
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return BlobEntry(path, meta['digest'], meta['content_type'], meta['size'])
+    
+    def get(self, key: str) -> Optional[BlobEntry]:
+        """
+        Obtiene una clave, descargándola de S3 si no está en caché.
+        
+        Las peticiones concurrentes por la misma clave comparten una sola
+        descarga (single-flight). Si S3 falla (o su circuito está abierto) y
+        hay una copia vencida de la clave, se sirve esa copia.
+        
+        Args:
+            key: Clave del objeto
+        
+        Returns:
+            BlobEntry o None si el objeto no existe en S3
+        """
+        entry = self.lookup(key)
+        record_cache_lookup('blob', entry is not None)
+        if entry is not None:
+            return entry
+        
+        with self._lock:
+            flight = self._inflight.setdefault(key, threading.Lock())
+        with flight:
+            try:
+                entry = self.lookup(key)
+                if entry is None:
+                    entry = self._fill(key)
+                return entry
+            except Exception:
+                entry = self.lookup(key, allow_stale=True)
+                if entry is None:
+                    raise
+                return entry
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+    
+    def _fill(self, key: str) -> Optional[BlobEntry]:
+        # Se copia a un temporal calculando el hash y luego se mueve a su
+        # nombre definitivo; os.replace es atómico entre workers
+        fd, tmp_path = tempfile.mkstemp(dir=self._blob_dir, suffix='.tmp')
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with track_s3_operation('get_object'):
+                response = self.s3_client.open_object(key)
+                if response is None:
+                    return None
+                with os.fdopen(fd, 'wb') as f:
+                    fd = None
+                    for chunk in response['Body'].iter_chunks(CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            
+            digest = digest.hexdigest()
+            path = self.blob_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            
+            content_type = response.get('ContentType') or 'application/octet-stream'
+            self._write_index(key, {
+                'digest': digest,
+                'content_type': content_type,
+                'size': size,
+                'fetched_at': time.time()
+            })
+            with self._lock:
+                self._total_bytes += size
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+            return BlobEntry(path, digest, content_type, size)
+        finally:
+            if fd is not None:
+                os.close(fd)
+            if tmp_path is not None:
+                os.unlink(tmp_path)
+    
+    def _index_path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self._key_dir, name[:2], f"{name}.json")
+    
+    def _write_index(self, key: str, meta: Dict):
+        path = self._index_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+    
+    def _scan_blobs(self):
+        for root, _, files in os.walk(self._blob_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+    
+    def _evict(self):
+        # Se desaloja hasta el 90% para no recorrer el directorio en cada descarga;
+        # las entradas del índice que apuntan a un blob borrado cuentan como fallo
+        entries = sorted(self._scan_blobs(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._total_bytes = total
+    
+    def stats(self) -> Dict:
+        """Retorna el tamaño estimado y el presupuesto de la caché."""
+        return {"bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+def get_blob_cache() -> BlobCache:
+    """
+    Obtiene la caché de objetos de la aplicación actual.
+    
+    Returns:
+        Instancia compartida de BlobCache
+    """
+    cache = current_app.extensions.get('blob_cache')
+    if cache is None:
+        config = current_app.config
+        cache = current_app.extensions.setdefault('blob_cache', BlobCache(
+            get_s3_client(),
+            config.get('IMAGE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'pokeneas-blobs'),
+            config.get('IMAGE_CACHE_MAX_BYTES', 1024 * 1024 * 1024),
+            config.get('IMAGE_CACHE_TTL', 3600)
+        ))
+    return cache
@@ -0,0 +1,216 @@
+"""
+Índice en memoria de las claves del bucket S3, refrescado en segundo plano.
+"""
+import bisect
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from flask import current_app
+from app.storage.s3 import S3Client, get_s3_client
+
+logger = logging.getLogger(__name__)
+
+# Protege la creación del índice compartido por aplicación
+_registry_lock = threading.Lock()
+
+
+class BucketObject(NamedTuple):
+    """Metadatos de un objeto del bucket."""
+    key: str
+    size: int
+    etag: str
+    last_modified: float
+
+
+class BucketSnapshot:
+    """
+    Foto inmutable del contenido del bucket.
+    
+    `version` es un hash del contenido (clave, tamaño y ETag de cada objeto),
+    así que es igual en todos los workers que vean el mismo bucket y sirve
+    directamente como ETag fuerte de las respuestas.
+    """
+    
+    __slots__ = ('objects', 'keys', 'version', 'built_at')
+    
+    def __init__(self, objects: Tuple[BucketObject, ...], built_at: float = None):
+        self.objects = objects
+        self.keys = tuple(obj.key for obj in objects)
+        digest = hashlib.sha1()
+        for obj in objects:
+            digest.update(f"{obj.key}\0{obj.size}\0{obj.etag}\n".encode('utf-8'))
+        self.version = digest.hexdigest()
+        self.built_at = built_at if built_at is not None else time.time()
+    
+    @property
+    def etag(self) -> str:
+        """ETag fuerte (sin comillas) derivado de la versión."""
+        return self.version
+    
+    def page(self, prefix: str = '', page_size: int = 1000,
+             start_after: str = None) -> Tuple[List[BucketObject], Optional[str]]:
+        """
+        Obtiene una página de objetos con búsqueda binaria sobre las claves.
+        
+        Args:
+            prefix: Prefijo de las claves
+            page_size: Máximo de objetos por página
+            start_after: Última clave de la página anterior
+        
+        Returns:
+            Tupla (objetos de la página, clave para continuar o None)
+        """
+        if start_after is not None and start_after >= prefix:
+            start = bisect.bisect_right(self.keys, start_after)
+        else:
+            start = bisect.bisect_left(self.keys, prefix)
+        
+        objects = []
+        index = start
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            if len(objects) == page_size:
+                return objects, objects[-1].key
+            objects.append(self.objects[index])
+            index += 1
+        return objects, None
+    
+    def iter_prefix(self, prefix: str = '') -> Iterator[BucketObject]:
+        """
+        Recorre los objetos cuyo nombre empieza por `prefix`.
+        
+        Args:
+            prefix: Prefijo de las claves
+        
+        Yields:
+            Objetos en orden lexicográfico
+        """
+        index = bisect.bisect_left(self.keys, prefix)
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            yield self.objects[index]
+            index += 1
+
+
+class BucketIndex:
+    """
+    Índice del bucket con refresco periódico (stale-while-revalidate).
+    
+    Un hilo en segundo plano reconstruye la foto cada `refresh_interval`
+    segundos y la publica con una sola asignación; los lectores solo leen
+    la referencia actual y nunca esperan a un refresco.
+    """
+    
+    def __init__(self, s3_client: S3Client, refresh_interval: float = 60, prefix: str = ''):
+        """
+        Inicializa el índice.
+        
+        Args:
+            s3_client: Cliente S3 usado para listar el bucket
+            refresh_interval: Segundos entre refrescos
+            prefix: Prefijo de las claves a indexar
+        """
+        self.s3_client = s3_client
+        self.refresh_interval = refresh_interval
+        self.prefix = prefix
+        self.snapshot: Optional[BucketSnapshot] = None
+        self.last_error: Optional[str] = None
+        
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+    
+    def refresh(self) -> BucketSnapshot:
+        """
+        Lista el bucket completo y publica una nueva foto.
+        
+        Returns:
+            La foto publicada
+        """
+        objects = []
+        for page in self.s3_client.iter_object_pages(prefix=self.prefix):
+            for obj in page:
+                last_modified = obj.get('LastModified')
+                objects.append(BucketObject(
+                    key=obj['Key'],
+                    size=obj.get('Size', 0),
+                    etag=obj.get('ETag', '').strip('"'),
+                    last_modified=last_modified.timestamp() if last_modified else 0.0
+                ))
+        objects.sort(key=lambda obj: obj.key)
+        
+        snapshot = BucketSnapshot(tuple(objects))
+        current = self.snapshot
+        if current is not None and current.version == snapshot.version:
+            # Sin cambios: se conserva la foto para no invalidar nada
+            current.built_at = snapshot.built_at
+            return current
+        self.snapshot = snapshot
+        return snapshot
+    
+    def _run(self):
+        """Bucle del hilo de refresco."""
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Se sigue sirviendo la última foto válida
+                self.last_error = str(e)
+                logger.error(f"Error al refrescar el índice del bucket: {e}")
+            self._stop.wait(self.refresh_interval)
+    
+    def ensure_running(self):
+        """
+        Arranca el hilo de refresco si no está corriendo en este proceso.
+        
+        Los hilos no sobreviven a un fork, así que se vuelve a arrancar
+        cuando cambia el PID.
+        """
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='bucket-index-refresh',
+                daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+    
+    def stop(self):
+        """Detiene el hilo de refresco."""
+        self._stop.set()
+
+
+def get_bucket_index() -> Optional[BucketIndex]:
+    """
+    Obtiene el índice del bucket de la aplicación actual.
+    
+    Returns:
+        BucketIndex con el hilo de refresco en marcha, o None si está
+        deshabilitado o no hay bucket configurado
+    """
+    if not current_app.config.get('BUCKET_INDEX_ENABLED', True):
+        return None
+    if not current_app.config.get('S3_BUCKET'):
+        return None
+    
+    index = current_app.extensions.get('bucket_index')
+    if index is None:
+        with _registry_lock:
+            index = current_app.extensions.get('bucket_index')
+            if index is None:
+                index = BucketIndex(
+                    get_s3_client(),
+                    refresh_interval=current_app.config.get('BUCKET_INDEX_REFRESH_INTERVAL', 60)
+                )
+                current_app.extensions['bucket_index'] = index
+    index.ensure_running()
+    return index
@@ -0,0 +1,149 @@
+"""
+Circuit breaker para las llamadas a S3.
+
+Cuando S3 está lento o caído, cada petición que lo toca ocupa un hilo
+hasta agotar timeouts y reintentos. Tras `failure_threshold` fallos
+seguidos el circuito se abre y las llamadas fallan al instante con
+CircuitOpenError; pasados `reset_timeout` segundos se deja pasar una
+sola llamada de prueba (semiabierto) que lo vuelve a cerrar o abrir.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Valor numérico de cada estado para la métrica Prometheus
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """La llamada se rechazó sin intentarla porque el circuito está abierto."""
+    
+    def __init__(self, operation: str, retry_after: float):
+        super().__init__(f"Circuito de S3 abierto, {operation} rechazada")
+        self.operation = operation
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de tres estados, seguro entre hilos.
+    
+    Solo se cuentan los fallos consecutivos: cualquier éxito en estado
+    cerrado reinicia el contador.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30,
+                 on_state_change: Callable[[str], None] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa el circuito cerrado.
+        
+        Args:
+            failure_threshold: Fallos consecutivos que abren el circuito (0: nunca se abre)
+            reset_timeout: Segundos abierto antes de la llamada de prueba
+            on_state_change: Función llamada con el estado nuevo en cada transición
+            clock: Reloj monótono (inyectable en tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_state_change = on_state_change
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def _transition(self, state: str):
+        # Se llama con el lock tomado
+        if state == self.state:
+            return
+        self.state = state
+        if self.on_state_change is not None:
+            self.on_state_change(state)
+    
+    def retry_after(self) -> float:
+        """Segundos que faltan para la siguiente llamada de prueba (0 si no está abierto)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+    
+    def allow(self, probe: bool = True) -> bool:
+        """
+        Decide si una llamada puede intentarse.
+        
+        En estado semiabierto solo se admite una llamada a la vez; quien
+        recibe True debe informar el resultado con record_success o
+        record_failure. Con probe=False (operaciones que no contactan S3 y
+        cuyo resultado no dice nada de su estado) solo se admite la llamada
+        con el circuito cerrado y no hay resultado que informar.
+        
+        Args:
+            probe: Si la llamada puede actuar como llamada de prueba
+        
+        Returns:
+            True si la llamada puede hacerse, False si debe fallar al instante
+        """
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if probe and self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+    
+    def record_success(self):
+        """Registra una llamada que S3 respondió; cierra el circuito si estaba a prueba."""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(CLOSED)
+    
+    def release(self):
+        """Libera la llamada de prueba sin resultado (la llamada se abandonó)."""
+        with self._lock:
+            self._probing = False
+    
+    def record_failure(self, error: Exception = None):
+        """
+        Registra una llamada fallida por indisponibilidad de S3.
+        
+        Args:
+            error: Excepción producida (se guarda su descripción)
+        """
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if error is not None:
+                self.last_error = f"{type(error).__name__}: {error}"
+            threshold_reached = self.failure_threshold > 0 and self.failures >= self.failure_threshold
+            if self.state == HALF_OPEN or threshold_reached:
+                self.opened_at = self.clock()
+                self._transition(OPEN)
+    
+    def stats(self) -> Dict:
+        """
+        Retorna el estado del circuito para monitorización.
+        
+        Returns:
+            Diccionario con: state, failures, failure_threshold, rejected,
+            retry_after y last_error
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "rejected": self.rejected,
+                "retry_after": round(self.retry_after(), 3),
+                "last_error": self.last_error
+            }
@@ -0,0 +1,126 @@
+"""
+Caché LRU con TTL para URLs presignadas de S3.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class PresignedUrlCache:
+    """
+    Caché acotada (LRU) de URLs presignadas.
+    
+    Cada entrada se guarda con la expiración de la firma y se sirve hasta
+    `safety_margin` segundos antes de que venza; a partir de ahí se considera
+    un fallo y el llamador debe firmar de nuevo. Mientras la firma no venza,
+    la entrada sigue disponible en get_stale como último valor bueno.
+    """
+    
+    def __init__(self, max_size: int = 1024, safety_margin: int = 300):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_size: Número máximo de URLs almacenadas
+            safety_margin: Segundos antes del vencimiento en que se deja de servir una URL
+        """
+        self.max_size = max_size
+        self.safety_margin = safety_margin
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _ttl(self, expiration: int) -> float:
+        """Tiempo durante el cual una URL firmada por `expiration` segundos es servible."""
+        return expiration - min(self.safety_margin, expiration / 2)
+    
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        Obtiene una URL vigente de la caché.
+        
+        Args:
+            key: Tupla (bucket, key, expiration)
+        
+        Returns:
+            URL cacheada o None si no existe o está por vencer
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            url, valid_until, expires_at = entry
+            if now >= valid_until:
+                if now >= expires_at:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return url
+    
+    def get_stale(self, key: Hashable) -> Optional[str]:
+        """
+        Obtiene una URL aunque esté dentro del margen de seguridad.
+        
+        Pensado para cuando no se puede firmar de nuevo (S3 no disponible):
+        no cuenta como acierto ni como fallo.
+        
+        Args:
+            key: Tupla (bucket, key, expiration)
+        
+        Returns:
+            URL cacheada con la firma aún vigente o None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[2]:
+            return None
+        return entry[0]
+    
+    def set(self, key: Hashable, url: str, expiration: int):
+        """
+        Guarda una URL recién firmada.
+        
+        Args:
+            key: Tupla (bucket, key, expiration)
+            url: URL presignada
+            expiration: Segundos de validez de la firma
+        """
+        ttl = self._ttl(expiration)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (url, now + ttl, now + expiration)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Vacía la caché sin reiniciar los contadores."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """
+        Retorna los contadores de la caché.
+        
+        Returns:
+            Diccionario con: size, max_size, hits, misses, evictions, hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
@@ -1,15 +1,58 @@
 """
 Cliente S3 para gestión de imágenes en Amazon S3.
+
+boto3 y botocore se importan en el primer uso del cliente, no al importar
+este módulo: una aplicación sin S3_BUCKET arranca sin cargarlos.
+
+Todas las llamadas a S3 pasan por un circuit breaker y cada operación
+tiene su propio timeout de lectura (S3_OPERATION_TIMEOUTS), de modo que
+un S3 lento no retiene los hilos de gunicorn más de lo previsto.
 """
+from contextlib import contextmanager
 import os
 import logging
-from typing import Optional
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
-from flask import current_app
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from flask import current_app, url_for
+from app.metrics import (
+    observe_s3_operation, record_cache_lookup, record_s3_rejection, set_s3_circuit_state,
+    track_s3_operation
+)
+from app.storage.circuit_breaker import CLOSED, HALF_OPEN, STATE_VALUES, CircuitBreaker, CircuitOpenError
+from app.storage.presigned_cache import PresignedUrlCache
+from app.timing import span
 
 logger = logging.getLogger(__name__)
 
+# Protege la creación del S3Client compartido por aplicación
+_registry_lock = threading.Lock()
+
+# Códigos de error con los que S3 indica sobrecarga aunque no sean 5xx
+THROTTLING_CODES = frozenset(('SlowDown', 'Throttling', 'ThrottlingException', 'RequestTimeout'))
+
+
+def is_s3_outage(error: Exception) -> bool:
+    """
+    Indica si un error revela que S3 no está disponible.
+    
+    Las respuestas 4xx (objeto inexistente, acceso denegado) demuestran que
+    S3 responde y no cuentan para el circuit breaker; los 5xx, la
+    limitación de peticiones, los timeouts y los errores de conexión sí.
+    
+    Args:
+        error: Excepción producida por la llamada
+    
+    Returns:
+        True si debe contarse como fallo del circuito
+    """
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return True
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+    code = response.get('Error', {}).get('Code', '')
+    return status >= 500 or status == 429 or code in THROTTLING_CODES
+
 
 class S3Client:
     """Cliente para interactuar con Amazon S3."""
@@ -27,26 +70,194 @@ class S3Client:
         self.use_presigned = current_app.config.get('USE_S3_PRESIGNED', False)
         self.public_base_url = current_app.config.get('S3_PUBLIC_BASE_URL', '')
         self.presigned_expiration = current_app.config.get('PRESIGNED_URL_EXPIRATION', 3600)
+        self.endpoint_url = current_app.config.get('S3_ENDPOINT_URL') or None
+        self.image_proxy = current_app.config.get('IMAGE_PROXY_ENABLED', False)
+        self.placeholder_url = current_app.config.get('S3_PLACEHOLDER_IMAGE_URL') or None
+        self.operation_timeouts = dict(current_app.config.get('S3_OPERATION_TIMEOUTS') or {})
+        
+        # Credenciales y ajustes de conexión capturados una sola vez para que
+        # el cliente boto3 pueda crearse fuera del contexto de aplicación
+        self._credentials = {
+            'aws_access_key_id': current_app.config.get('AWS_ACCESS_KEY_ID') or None,
+            'aws_secret_access_key': current_app.config.get('AWS_SECRET_ACCESS_KEY') or None,
+            'aws_session_token': current_app.config.get('AWS_SESSION_TOKEN') or None,
+        }
+        self._boto_options = dict(
+            max_pool_connections=current_app.config.get('S3_MAX_POOL_CONNECTIONS', 10),
+            connect_timeout=current_app.config.get('S3_CONNECT_TIMEOUT', 2),
+            read_timeout=current_app.config.get('S3_READ_TIMEOUT', 5),
+            retries={
+                'mode': current_app.config.get('S3_RETRY_MODE', 'standard'),
+                'max_attempts': current_app.config.get('S3_MAX_ATTEMPTS', 3),
+            },
+            # Los emuladores locales (MinIO, stubs) no resuelven subdominios por bucket
+            s3={'addressing_style': 'path'} if self.endpoint_url else None,
+        )
+        
+        self.breaker = CircuitBreaker(
+            failure_threshold=current_app.config.get('S3_CIRCUIT_FAILURE_THRESHOLD', 5),
+            reset_timeout=current_app.config.get('S3_CIRCUIT_RESET_TIMEOUT', 30),
+            on_state_change=self._on_circuit_change
+        )
+        
+        self.presigned_cache = PresignedUrlCache(
+            max_size=current_app.config.get('PRESIGNED_URL_CACHE_SIZE', 1024),
+            safety_margin=current_app.config.get('PRESIGNED_URL_CACHE_MARGIN', 300)
+        )
         
         self._client = None
+        self._client_pid = None
+        # Clientes adicionales por timeout de lectura distinto del general
+        self._timeout_clients = {}
+        self._lock = threading.Lock()
+    
+    def _create_client(self, read_timeout: float = None):
+        # Se llama con el lock tomado; boto3 se importa aquí la primera vez
+        import boto3
+        from botocore.config import Config as BotoConfig
+        
+        # botocore reescribe `retries` en el sitio: cada cliente recibe su copia
+        options = dict(self._boto_options, retries=dict(self._boto_options['retries']))
+        if read_timeout is not None:
+            # Sin reintentos: con ellos el peor caso sería S3_MAX_ATTEMPTS veces el
+            # timeout; un fallo cuenta para el circuito y el llamador usa su respaldo
+            options.update(
+                read_timeout=read_timeout,
+                connect_timeout=min(options['connect_timeout'], read_timeout),
+                retries={'mode': options['retries']['mode'], 'total_max_attempts': 1}
+            )
+        try:
+            # Intenta usar credenciales de variables de entorno o perfil
+            return boto3.client(
+                's3',
+                region_name=self.region,
+                endpoint_url=self.endpoint_url,
+                config=BotoConfig(**options),
+                **self._credentials
+            )
+        except Exception as e:
+            logger.error(f"Error al crear cliente S3: {e}")
+            raise
     
     @property
     def client(self):
-        """Lazy loading del cliente boto3."""
-        if self._client is None:
-            try:
-                # Intenta usar credenciales de variables de entorno o perfil
-                self._client = boto3.client(
-                    's3',
-                    region_name=self.region,
-                    aws_access_key_id=current_app.config.get('AWS_ACCESS_KEY_ID') or None,
-                    aws_secret_access_key=current_app.config.get('AWS_SECRET_ACCESS_KEY') or None,
-                    aws_session_token=current_app.config.get('AWS_SESSION_TOKEN') or None
-                )
-            except Exception as e:
-                logger.error(f"Error al crear cliente S3: {e}")
-                raise
-        return self._client
+        """
+        Lazy loading del cliente boto3.
+        
+        El cliente se crea una sola vez por proceso y se comparte entre hilos
+        (los clientes de botocore son thread-safe). Si el proceso cambió de PID
+        (fork de gunicorn), se descarta el cliente heredado y se crea uno nuevo.
+        """
+        client = self._client
+        if client is not None and self._client_pid == os.getpid():
+            return client
+        
+        with self._lock:
+            if self._client is None or self._client_pid != os.getpid():
+                self._timeout_clients = {}
+                self._client = self._create_client()
+                self._client_pid = os.getpid()
+            return self._client
+    
+    def client_for(self, operation: str):
+        """
+        Cliente boto3 con el timeout de lectura de una operación.
+        
+        Los timeouts de botocore se fijan al crear el cliente, así que cada
+        timeout distinto de S3_READ_TIMEOUT tiene su propio cliente (y su
+        propio pool de conexiones), que además no reintenta.
+        
+        Args:
+            operation: Nombre de la operación (head_object, get_object, list...)
+        
+        Returns:
+            Cliente boto3
+        """
+        read_timeout = self.operation_timeouts.get(operation)
+        client = self.client
+        if read_timeout is None or read_timeout == self._boto_options['read_timeout']:
+            return client
+        
+        timeout_client = self._timeout_clients.get(read_timeout)
+        if timeout_client is None:
+            with self._lock:
+                timeout_client = self._timeout_clients.get(read_timeout)
+                if timeout_client is None:
+                    timeout_client = self._create_client(read_timeout)
+                    self._timeout_clients[read_timeout] = timeout_client
+        return timeout_client
+    
+    def reset(self):
+        """
+        Descarta los clientes boto3 actuales.
+        
+        Debe llamarse después de un fork para no compartir el pool de
+        conexiones HTTP del proceso padre.
+        """
+        with self._lock:
+            self._client = None
+            self._client_pid = None
+            self._timeout_clients = {}
+    
+    @staticmethod
+    def _on_circuit_change(state: str):
+        level = logging.INFO if state == 'closed' else logging.WARNING
+        logger.log(level, f"Circuito de S3: {state}")
+        set_s3_circuit_state(STATE_VALUES[state])
+    
+    def check_circuit(self, operation: str, key: str):
+        """
+        Rechaza una operación local (la firma de URLs) si el circuito no está cerrado.
+        
+        Firmar no contacta S3, así que su resultado no cuenta para el
+        circuito. En estado semiabierto, si nadie más está probando S3, se
+        hace un HEAD del objeto como llamada de prueba: sin ella el circuito
+        no se cerraría nunca cuando el único tráfico es firmar URLs.
+        
+        Args:
+            operation: Nombre de la operación (para métricas y errores)
+            key: Clave del objeto (se usa en el HEAD de prueba)
+        
+        Raises:
+            CircuitOpenError: Si el circuito sigue abierto o semiabierto
+        """
+        if self.breaker.allow(probe=False):
+            return
+        if self.breaker.state == HALF_OPEN:
+            self.check_object_exists(key)
+            if self.breaker.state == CLOSED:
+                return
+        record_s3_rejection(operation)
+        raise CircuitOpenError(operation, self.breaker.retry_after())
+    
+    @contextmanager
+    def guard(self, operation: str):
+        """
+        Ejecuta una llamada a S3 a través del circuit breaker.
+        
+        Args:
+            operation: Nombre de la operación (para métricas y errores)
+        
+        Raises:
+            CircuitOpenError: Si el circuito está abierto; la llamada no se intenta
+        """
+        if not self.breaker.allow():
+            record_s3_rejection(operation)
+            raise CircuitOpenError(operation, self.breaker.retry_after())
+        try:
+            yield
+        except Exception as e:
+            if is_s3_outage(e):
+                self.breaker.record_failure(e)
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            # La llamada se abandonó (GeneratorExit...): no hay resultado que contar
+            self.breaker.release()
+            raise
+        else:
+            self.breaker.record_success()
     
     def get_public_url(self, key: str) -> str:
         """
@@ -69,55 +280,130 @@ class S3Client:
         """
         Genera una URL presignada para un objeto S3.
         
+        Las URLs se reutilizan desde `presigned_cache` hasta poco antes de
+        que venzan, evitando firmar (SigV4) en cada petición. Si no se puede
+        firmar (circuito abierto o error) se retorna la última URL cacheada
+        cuya firma siga vigente o, en su defecto, S3_PLACEHOLDER_IMAGE_URL.
+        
         Args:
             key: Clave del objeto en S3
             expiration: Tiempo de expiración en segundos (default: config)
             
         Returns:
-            URL presignada o None si hay error
+            URL presignada, la de respaldo o None si no hay ninguna
         """
         if expiration is None:
             expiration = self.presigned_expiration
         
+        cache_key = (self.bucket, key, expiration)
+        url = self.presigned_cache.get(cache_key)
+        record_cache_lookup('presigned_url', url is not None)
+        if url is not None:
+            return url
+        
+        from botocore.exceptions import ClientError, NoCredentialsError
         try:
-            url = self.client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket,
-                    'Key': key
-                },
-                ExpiresIn=expiration
-            )
+            self.check_circuit('presign', key)
+            with track_s3_operation('presign'), span('presign'):
+                url = self.client.generate_presigned_url(
+                    'get_object',
+                    Params={
+                        'Bucket': self.bucket,
+                        'Key': key
+                    },
+                    ExpiresIn=expiration
+                )
+            self.presigned_cache.set(cache_key, url, expiration)
             return url
+        except CircuitOpenError:
+            pass
         except NoCredentialsError:
             logger.error("No se encontraron credenciales de AWS")
-            return None
         except ClientError as e:
             logger.error(f"Error al generar URL presignada: {e}")
-            return None
         except Exception as e:
             logger.error(f"Error inesperado al generar URL presignada: {e}")
-            return None
+        return self.fallback_url(cache_key)
+    
+    def fallback_url(self, cache_key) -> Optional[str]:
+        """
+        URL a servir cuando no se puede firmar una nueva.
+        
+        Args:
+            cache_key: Tupla (bucket, key, expiration) de presigned_cache
+        
+        Returns:
+            Última URL con la firma vigente, S3_PLACEHOLDER_IMAGE_URL o None
+        """
+        return self.presigned_cache.get_stale(cache_key) or self.placeholder_url
     
     def get_image_url(self, key: str) -> Optional[str]:
         """
         Obtiene la URL de una imagen según la configuración.
         
+        Con IMAGE_PROXY_ENABLED la imagen se sirve desde la caché local
+        (/img/<key>) en lugar de directamente desde S3.
+        
         Args:
             key: Clave de la imagen en S3
             
         Returns:
-            URL de la imagen (pública o presignada) o None
+            URL de la imagen (local, pública o presignada) o None
         """
         if not self.bucket:
             logger.warning("S3_BUCKET no está configurado")
             return None
         
+        if self.image_proxy:
+            return url_for('images.get_image', key=key)
         if self.use_presigned:
             return self.get_presigned_url(key)
         else:
             return self.get_public_url(key)
     
+    def get_image_urls(self, keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resuelve las URLs de varias imágenes de una vez.
+        
+        Pensado para recorridos masivos (exportación): las URLs presignadas
+        se toman de `presigned_cache` si ya están, pero las nuevas no se
+        guardan en ella para no desalojar las de las páginas más visitadas.
+        
+        Args:
+            keys: Claves de las imágenes
+            
+        Returns:
+            Diccionario clave → URL (None si no se pudo resolver)
+        """
+        if not self.bucket:
+            return dict.fromkeys(keys)
+        if self.image_proxy:
+            return {key: url_for('images.get_image', key=key) for key in keys}
+        if not self.use_presigned:
+            return {key: self.get_public_url(key) for key in keys}
+        
+        urls = {}
+        expiration = self.presigned_expiration
+        with track_s3_operation('presign'), span('presign'):
+            for key in keys:
+                cache_key = (self.bucket, key, expiration)
+                url = self.presigned_cache.get(cache_key)
+                if url is None:
+                    try:
+                        self.check_circuit('presign', key)
+                        url = self.client.generate_presigned_url(
+                            'get_object',
+                            Params={'Bucket': self.bucket, 'Key': key},
+                            ExpiresIn=expiration
+                        )
+                    except CircuitOpenError:
+                        url = self.fallback_url(cache_key)
+                    except Exception as e:
+                        logger.error(f"Error al generar URL presignada de {key}: {e}")
+                        url = self.fallback_url(cache_key)
+                urls[key] = url
+        return urls
+    
     def check_object_exists(self, key: str) -> bool:
         """
         Verifica si un objeto existe en S3.
@@ -126,11 +412,15 @@ class S3Client:
             key: Clave del objeto
             
         Returns:
-            True si existe, False en caso contrario
+            True si existe, False en caso contrario (o si no se pudo verificar)
         """
+        from botocore.exceptions import ClientError
         try:
-            self.client.head_object(Bucket=self.bucket, Key=key)
+            with self.guard('head_object'), track_s3_operation('head_object'):
+                self.client_for('head_object').head_object(Bucket=self.bucket, Key=key)
             return True
+        except CircuitOpenError:
+            return False
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
                 return False
@@ -139,13 +429,147 @@ class S3Client:
         except Exception as e:
             logger.error(f"Error inesperado al verificar objeto: {e}")
             return False
+    
+    def get_object(self, key: str) -> Optional[bytes]:
+        """
+        Descarga el contenido de un objeto.
+        
+        Args:
+            key: Clave del objeto
+            
+        Returns:
+            Bytes del objeto o None si no existe
+            
+        Raises:
+            ClientError: Ante errores de S3 distintos de un objeto inexistente
+            CircuitOpenError: Si el circuito de S3 está abierto
+        """
+        with track_s3_operation('get_object'):
+            response = self.open_object(key)
+            return response['Body'].read() if response is not None else None
+    
+    def open_object(self, key: str) -> Optional[Dict]:
+        """
+        Inicia la descarga de un objeto sin leer el cuerpo.
+        
+        Args:
+            key: Clave del objeto
+            
+        Returns:
+            Respuesta de get_object (Body en streaming, ContentType, ETag...)
+            o None si no existe
+            
+        Raises:
+            ClientError: Ante errores de S3 distintos de un objeto inexistente
+            CircuitOpenError: Si el circuito de S3 está abierto
+        """
+        from botocore.exceptions import ClientError
+        try:
+            with self.guard('get_object'):
+                return self.client_for('get_object').get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return None
+            raise
+    
+    def list_objects_page(self, prefix: str = '', page_size: int = 1000,
+                          continuation_token: str = None, start_after: str = None) -> Dict:
+        """
+        Lista una página de objetos del bucket.
+        
+        Args:
+            prefix: Prefijo de las claves a listar
+            page_size: Máximo de objetos por página (S3 admite hasta 1000)
+            continuation_token: Token retornado por la página anterior
+            start_after: Clave a partir de la cual listar (excluida)
+            
+        Returns:
+            Diccionario con: objects (lista de objetos S3) y next_token
+            (None si no hay más páginas)
+        
+        Raises:
+            CircuitOpenError: Si el circuito de S3 está abierto
+        """
+        params = {'Bucket': self.bucket, 'Prefix': prefix, 'MaxKeys': page_size}
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+        elif start_after:
+            params['StartAfter'] = start_after
+        
+        with self.guard('list'), track_s3_operation('list'):
+            response = self.client_for('list').list_objects_v2(**params)
+        next_token = response.get('NextContinuationToken') if response.get('IsTruncated') else None
+        return {
+            "objects": response.get('Contents', []),
+            "next_token": next_token
+        }
+    
+    def iter_object_pages(self, prefix: str = '', page_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Recorre todo el bucket página a página usando el paginador de boto3.
+        
+        Solo se mantiene una página en memoria a la vez, por lo que sirve
+        para buckets de cualquier tamaño.
+        
+        Args:
+            prefix: Prefijo de las claves a listar
+            page_size: Objetos solicitados por página
+            
+        Yields:
+            Lista de objetos S3 de cada página
+        
+        Raises:
+            CircuitOpenError: Si el circuito de S3 está abierto
+        """
+        paginator = self.client_for('list').get_paginator('list_objects_v2')
+        pages = iter(paginator.paginate(
+            Bucket=self.bucket,
+            Prefix=prefix,
+            PaginationConfig={'PageSize': page_size}
+        ))
+        while True:
+            # Cada página es una llamada list_objects_v2 independiente
+            start = time.perf_counter()
+            with self.guard('list'):
+                try:
+                    page = next(pages, None)
+                except Exception:
+                    observe_s3_operation('list', time.perf_counter() - start, False)
+                    raise
+            if page is None:
+                return
+            observe_s3_operation('list', time.perf_counter() - start, True)
+            yield page.get('Contents', [])
 
 
 def get_s3_client() -> S3Client:
     """
-    Factory function para obtener una instancia del cliente S3.
+    Obtiene el cliente S3 compartido de la aplicación actual.
+    
+    Se crea en el primer uso y se reutiliza en todas las peticiones del
+    proceso, conservando el pool de conexiones de boto3.
     
     Returns:
-        Instancia de S3Client
+        Instancia compartida de S3Client
+    """
+    s3_client = current_app.extensions.get('s3_client')
+    if s3_client is None:
+        with _registry_lock:
+            s3_client = current_app.extensions.get('s3_client')
+            if s3_client is None:
+                s3_client = S3Client()
+                current_app.extensions['s3_client'] = s3_client
+    return s3_client
+
+
+def reset_s3_client(app=None):
+    """
+    Reinicia el cliente boto3 compartido (por ejemplo en el post_fork de gunicorn).
+    
+    Args:
+        app: Aplicación Flask (default: current_app)
     """
-    return S3Client()
+    app = app or current_app
+    s3_client = app.extensions.get('s3_client')
+    if s3_client is not None:
+        s3_client.reset()
@@ -0,0 +1,68 @@
+"""
+Instrumentación ligera del camino caliente con la cabecera Server-Timing.
+"""
+import json
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+
+
+@contextmanager
+def span(name: str):
+    """
+    Mide una etapa de la petición actual.
+    
+    Fuera de una petición, o con SERVER_TIMING_ENABLED desactivado, no
+    hace nada más que ceder el control.
+    
+    Args:
+        name: Nombre de la etapa (service, storage, cache, render...)
+    """
+    spans = g.get('_timing_spans') if has_request_context() else None
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - start))
+
+
+def _start_request():
+    g._timing_spans = []
+    g._timing_start = time.perf_counter()
+
+
+def _emit_timing(response):
+    spans = g.pop('_timing_spans', None)
+    if spans is None:
+        return response
+    total = time.perf_counter() - g.pop('_timing_start')
+    
+    # Server-Timing usa milisegundos
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in spans]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    response.headers['Server-Timing'] = ', '.join(entries)
+    
+    if current_app.config.get('SERVER_TIMING_LOG', False):
+        current_app.logger.info(json.dumps({
+            "event": "request_timing",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 3),
+            "spans": {name: round(seconds * 1000, 3) for name, seconds in spans}
+        }))
+    return response
+
+
+def init_timing(app):
+    """
+    Registra los hooks que abren y emiten los tiempos de cada petición.
+    
+    Args:
+        app: Aplicación Flask
+    """
+    app.before_request(_start_request)
+    app.after_request(_emit_timing)
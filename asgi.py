@@ -0,0 +1,42 @@
+"""
+ASGI entry point para producción.
+
+Ejecuta la aplicación Flask sobre un servidor ASGI (uvicorn). El bucle de
+eventos mantiene las conexiones abiertas y la app WSGI, incluidas las
+llamadas a S3, corre en un pool de ASGI_THREADS hilos por worker, fuera
+del bucle.
+
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker --workers 2
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+"""
+import os
+from a2wsgi import WSGIMiddleware
+from app import create_app
+
+
+def create_asgi_app(config_name=None):
+    """
+    Crea la aplicación ASGI envolviendo la aplicación Flask.
+    
+    Args:
+        config_name: Nombre de la configuración a usar (development, production, testing)
+    
+    Returns:
+        Aplicación ASGI
+    """
+    flask_app = create_app(config_name)
+    asgi_app = WSGIMiddleware(flask_app, workers=flask_app.config.get('ASGI_THREADS', 64))
+    # Acceso a la app Flask (CLI, hooks de arranque, tests)
+    asgi_app.flask_app = flask_app
+    return asgi_app
+
+
+# Crear aplicación
+app = create_asgi_app()
+
+if __name__ == '__main__':
+    # Para desarrollo local
+    import uvicorn
+    
+    port = int(os.getenv('PORT', 8000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
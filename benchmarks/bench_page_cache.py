@@ -0,0 +1,100 @@
+"""
+Benchmark del costo de render de /pokenea con y sin caché de páginas.
+
+Uso:
+    python -m benchmarks.bench_page_cache --requests 5000 --rps 200
+"""
+import argparse
+import json
+import time
+from flask import render_template
+from app import create_app
+from app.services.page_cache import RenderedPageCache
+from app.services.pokeneas_service import get_pokeneas_service
+
+
+def measure(page_cache_enabled: bool, requests: int) -> float:
+    """
+    Mide el tiempo medio por petición de /pokenea con el cliente de pruebas.
+    
+    Args:
+        page_cache_enabled: Si se usa la caché de páginas
+        requests: Número de peticiones a medir
+    
+    Returns:
+        Microsegundos por petición
+    """
+    app = create_app('testing')
+    app.config['PAGE_CACHE_ENABLED'] = page_cache_enabled
+    # Como en producción: sin comprobar cambios de plantillas en cada render
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    client = app.test_client()
+    
+    # Calentar: compilar plantillas y llenar la caché
+    for _ in range(100):
+        client.get('/pokenea')
+    
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/pokenea')
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1e6
+
+
+def measure_render_only(requests: int) -> dict:
+    """
+    Aísla el costo de Jinja frente a una búsqueda en la caché.
+    
+    Args:
+        requests: Número de iteraciones
+    
+    Returns:
+        Diccionario con microsegundos por render y por búsqueda
+    """
+    app = create_app('testing')
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    with app.test_request_context('/pokenea'):
+        service = get_pokeneas_service()
+        pokenea = service.catalog.records[0]
+        pokenea_data = service.format_for_view(pokenea, 'https://example.com/a.jpg')
+        render_template('pokenea.html', pokenea=pokenea_data)
+        
+        start = time.perf_counter()
+        for _ in range(requests):
+            body = render_template('pokenea.html', pokenea=pokenea_data).encode('utf-8')
+        render_us = (time.perf_counter() - start) / requests * 1e6
+        
+        page_cache = RenderedPageCache()
+        page_cache.set(pokenea, 'https://example.com/a.jpg', body)
+        start = time.perf_counter()
+        for _ in range(requests):
+            page_cache.get(pokenea, 'https://example.com/a.jpg')
+        lookup_us = (time.perf_counter() - start) / requests * 1e6
+    
+    return {"render_us": round(render_us, 2), "cache_lookup_us": round(lookup_us, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000, help='Peticiones por escenario')
+    parser.add_argument('--rps', type=float, default=200, help='Tasa de peticiones por worker a proyectar')
+    args = parser.parse_args()
+    
+    uncached_us = measure(False, args.requests)
+    cached_us = measure(True, args.requests)
+    saved_us = uncached_us - cached_us
+    
+    print(json.dumps({
+        **measure_render_only(args.requests),
+        "requests": args.requests,
+        "uncached_us_per_request": round(uncached_us, 1),
+        "cached_us_per_request": round(cached_us, 1),
+        "speedup": round(uncached_us / cached_us, 2),
+        # Fracción de un núcleo que se deja de gastar en render a la tasa indicada
+        "cpu_saved_at_rps": round(saved_us * args.rps / 1e6, 4),
+        "rps": args.rps
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
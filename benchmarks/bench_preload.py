@@ -0,0 +1,159 @@
+"""
+Benchmark de arranque de gunicorn con y sin preload_app.
+
+Arranca gunicorn con gunicorn.conf.py en ambos modos y reporta en JSON:
+- time_to_ready_s: segundos hasta la primera respuesta de /health.
+- worker_ready_ms: tiempo de cada worker desde el fork hasta estar listo
+  (lo registra el hook post_worker_init).
+- Memoria de cada worker tras unas peticiones: RSS, PSS (RSS repartiendo
+  las páginas compartidas) y USS (solo las privadas), de /proc (Linux).
+
+Uso:
+    python -m benchmarks.bench_preload --workers 4 --catalog-size 20000
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks.load import ROOT_DIR, free_port, wait_ready
+
+READY_RE = re.compile(r'Worker (\d+) listo en ([\d.]+) ms')
+
+
+def write_synthetic_catalog(path: str, size: int):
+    """Escribe un catálogo JSON de `size` Pokeneas."""
+    from app.data.pokeneas import POKENEAS_DATA
+    from app.data.sources import write_catalog
+    write_catalog(path, [
+        {**POKENEAS_DATA[i % len(POKENEAS_DATA)], "id": i + 1,
+         "nombre": f"{POKENEAS_DATA[i % len(POKENEAS_DATA)]['nombre']} {i + 1}"}
+        for i in range(size)
+    ])
+
+
+def children(pid: int) -> List[int]:
+    """PIDs de los procesos hijos directos (los workers)."""
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """RSS, PSS y USS de un proceso en KiB."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        "rss_kb": values.get('Rss', 0),
+        "pss_kb": values.get('Pss', 0),
+        "uss_kb": values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+
+def exercise(port: int, requests: int):
+    """Peticiones representativas para que los workers toquen su memoria."""
+    for i in range(requests):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        path = ('/pokenea', '/api/pokenea', '/api/pokeneas/search?q=vida', '/api/pokeneas?count=20')[i % 4]
+        conn.request('GET', path)
+        conn.getresponse().read()
+        conn.close()
+
+
+def measure(preload: bool, workers: int, catalog: str, requests: int) -> Dict:
+    """
+    Arranca gunicorn en un modo y toma las medidas.
+    
+    Args:
+        preload: Valor de GUNICORN_PRELOAD
+        workers: Número de workers
+        catalog: Ruta del catálogo JSON ('' para el módulo)
+        requests: Peticiones antes de medir la memoria
+    
+    Returns:
+        Diccionario con tiempos y memoria por worker
+    """
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='pokeneas-preload-')
+    os.makedirs(os.path.join(workdir, 'logs'), exist_ok=True)
+    log_path = os.path.join(workdir, 'gunicorn.log')
+    env = dict(
+        os.environ,
+        FLASK_ENV='production',
+        GUNICORN_PRELOAD='true' if preload else 'false',
+        CATALOG_SOURCE=catalog,
+        PYTHONPATH=ROOT_DIR
+    )
+    command = [
+        sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT_DIR, 'gunicorn.conf.py'),
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--error-logfile', log_path,
+        'wsgi:app'
+    ]
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=devnull, stderr=devnull)
+    try:
+        wait_ready(port, timeout=120)
+        ready_s = time.perf_counter() - start
+        # Esperar a que todos los workers hayan registrado su arranque
+        deadline = time.monotonic() + 60
+        ready_ms = []
+        while time.monotonic() < deadline:
+            with open(log_path) as f:
+                ready_ms = [float(ms) for _, ms in READY_RE.findall(f.read())]
+            if len(ready_ms) >= workers:
+                break
+            time.sleep(0.1)
+        exercise(port, requests)
+        worker_memory = [memory_kb(pid) for pid in children(process.pid)]
+        master_memory = memory_kb(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    
+    def total(field):
+        return sum(memory[field] for memory in worker_memory)
+    
+    return {
+        "preload": preload,
+        "time_to_ready_s": round(ready_s, 3),
+        "worker_ready_ms": sorted(ready_ms),
+        "master": master_memory,
+        "workers_rss_kb": total('rss_kb'),
+        "workers_pss_kb": total('pss_kb'),
+        "workers_uss_kb": total('uss_kb'),
+        "workers": worker_memory
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--catalog-size', type=int, default=20000,
+                        help='Pokeneas del catálogo sintético (0: el del módulo)')
+    parser.add_argument('--requests', type=int, default=200, help='Peticiones antes de medir memoria')
+    args = parser.parse_args()
+    
+    catalog = ''
+    if args.catalog_size:
+        catalog = os.path.join(tempfile.mkdtemp(prefix='pokeneas-catalog-'), 'catalogo.json')
+        write_synthetic_catalog(catalog, args.catalog_size)
+    
+    results = [measure(preload, args.workers, catalog, args.requests) for preload in (False, True)]
+    print(json.dumps({
+        "workers": args.workers,
+        "catalog_size": args.catalog_size,
+        "results": results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark de la selección ponderada: tabla alias frente a random.choices.
+
+Mide el costo por sorteo con catálogos de distinto tamaño. La tabla alias
+debe mantenerse plana; random.choices con cum_weights hace una búsqueda
+binaria (O(log n)) y sin cum_weights recalcula los acumulados (O(n)).
+
+Uso:
+    python -m benchmarks.bench_sampling --sizes 1000,100000,1000000 --draws 200000
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+from app.services.sampling import AliasTable
+
+RARITY_WEIGHTS = {'comun': 70, 'raro': 25, 'legendario': 5}
+
+
+def make_weights(size: int, rng: random.Random) -> list:
+    """Pesos de un catálogo sintético con la mezcla de rarezas habitual."""
+    rarities = rng.choices(list(RARITY_WEIGHTS), weights=(90, 9, 1), k=size)
+    return [RARITY_WEIGHTS[rareza] for rareza in rarities]
+
+
+def measure(size: int, draws: int) -> dict:
+    """
+    Mide construcción y sorteos para un tamaño de catálogo.
+    
+    Args:
+        size: Número de Pokeneas
+        draws: Sorteos a medir
+    
+    Returns:
+        Diccionario con milisegundos de construcción y nanosegundos por sorteo
+    """
+    rng = random.Random(42)
+    weights = make_weights(size, rng)
+    
+    start = time.perf_counter()
+    table = AliasTable(weights)
+    build_ms = (time.perf_counter() - start) * 1e3
+    
+    start = time.perf_counter()
+    for _ in range(draws):
+        table.draw(rng)
+    alias_ns = (time.perf_counter() - start) / draws * 1e9
+    
+    start = time.perf_counter()
+    table.draw_many(draws, rng)
+    alias_many_ns = (time.perf_counter() - start) / draws * 1e9
+    
+    population = range(size)
+    cum_weights = list(itertools.accumulate(weights))
+    start = time.perf_counter()
+    for _ in range(draws):
+        rng.choices(population, cum_weights=cum_weights)
+    bisect_ns = (time.perf_counter() - start) / draws * 1e9
+    
+    return {
+        "size": size,
+        "build_ms": round(build_ms, 1),
+        "alias_draw_ns": round(alias_ns, 1),
+        "alias_draw_many_ns": round(alias_many_ns, 1),
+        "choices_cum_weights_ns": round(bisect_ns, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                        help='Tamaños de catálogo separados por comas')
+    parser.add_argument('--draws', type=int, default=200000, help='Sorteos por tamaño')
+    args = parser.parse_args()
+    
+    results = [measure(int(size), args.draws) for size in args.sizes.split(',')]
+    smallest, largest = results[0], results[-1]
+    print(json.dumps({
+        "draws": args.draws,
+        "results": results,
+        # Cercano a 1 si el costo por sorteo no depende del tamaño
+        "alias_growth": round(largest["alias_draw_ns"] / smallest["alias_draw_ns"], 2),
+        "choices_growth": round(largest["choices_cum_weights_ns"] / smallest["choices_cum_weights_ns"], 2)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
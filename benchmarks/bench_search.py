@@ -0,0 +1,82 @@
+"""
+Benchmark del índice de búsqueda de texto.
+
+Mide la construcción completa, la reconstrucción incremental tras cambiar
+unos pocos Pokeneas y la latencia de consultas con términos raros y
+frecuentes sobre un catálogo sintético.
+
+Uso:
+    python -m benchmarks.bench_search --size 100000 --queries 2000
+"""
+import argparse
+import json
+import random
+import time
+from app.data.catalog import PokeneaRecord
+from app.data.search import SearchIndex
+
+# Vocabulario con frecuencias muy desiguales (ley de Zipf aproximada)
+VOCABULARY = [f"palabra{i}" for i in range(5000)]
+ZIPF_WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def make_records(size: int, rng: random.Random) -> list:
+    """Catálogo sintético con frases de 8 a 20 palabras."""
+    return [
+        PokeneaRecord(
+            id=pokenea_id,
+            nombre=f"Pokenea {pokenea_id}",
+            altura="1m",
+            habilidad="Ninguna",
+            imagen=f"pokeneas/{pokenea_id}.jpg",
+            frase_filosofica=" ".join(rng.choices(VOCABULARY, weights=ZIPF_WEIGHTS, k=rng.randint(8, 20)))
+        )
+        for pokenea_id in range(1, size + 1)
+    ]
+
+
+def time_queries(index: SearchIndex, words: list, queries: int, rng: random.Random) -> float:
+    """Microsegundos medios por consulta de dos palabras tomadas de `words`."""
+    start = time.perf_counter()
+    for _ in range(queries):
+        index.search(" ".join(rng.sample(words, 2)), 10)
+    return (time.perf_counter() - start) / queries * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100000, help='Pokeneas del catálogo')
+    parser.add_argument('--queries', type=int, default=2000, help='Consultas por escenario')
+    parser.add_argument('--changed', type=int, default=10, help='Pokeneas modificados en la recarga')
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    records = make_records(args.size, rng)
+    
+    start = time.perf_counter()
+    index = SearchIndex(records)
+    build_ms = (time.perf_counter() - start) * 1e3
+    
+    updated = list(records)
+    for position in rng.sample(range(args.size), args.changed):
+        old = updated[position]
+        updated[position] = PokeneaRecord(**{**old.to_dict(), "frase_filosofica": "frase nueva"})
+    start = time.perf_counter()
+    SearchIndex(updated, index, {record.id: record for record in records})
+    incremental_ms = (time.perf_counter() - start) * 1e3
+    
+    print(json.dumps({
+        "size": args.size,
+        "terms": len(index.postings),
+        "build_ms": round(build_ms, 1),
+        "incremental_ms": round(incremental_ms, 1),
+        "changed": args.changed,
+        # Términos poco frecuentes: listas cortas
+        "rare_query_us": round(time_queries(index, VOCABULARY[-1000:], args.queries, rng), 1),
+        # Los términos más frecuentes recorren una fracción grande del catálogo
+        "common_query_us": round(time_queries(index, VOCABULARY[:20], args.queries // 10 or 1, rng), 1)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Benchmark de carga HTTP contra la aplicación real.
+
+Arranca un emulador S3 local y la aplicación bajo el servidor indicado,
+lanza peticiones concurrentes a cada endpoint y reporta RPS y latencias
+p50/p95/p99 en JSON.
+
+Uso:
+    python -m benchmarks.load --server gunicorn --concurrency 32 --duration 10
+    python -m benchmarks.load --server uvicorn --output asgi.json
+    python -m benchmarks.load --baseline main.json --threshold 0.10
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_ENDPOINTS = ['/api/pokenea', '/pokenea', '/imagenes', '/health']
+
+# El servidor arranca en un directorio temporal, así que gunicorn no
+# encontraría por sí solo la configuración del repositorio
+GUNICORN_CONFIG = os.path.join(ROOT_DIR, 'gunicorn.conf.py')
+
+# Comandos de arranque de cada modo de servicio soportado
+SERVER_COMMANDS = {
+    'gunicorn': [
+        sys.executable, '-m', 'gunicorn', '-c', GUNICORN_CONFIG, '--bind', '127.0.0.1:{port}',
+        '--workers', '{workers}', '--threads', '{threads}', 'wsgi:app'
+    ],
+    'uvicorn': [
+        sys.executable, '-m', 'gunicorn', '-c', GUNICORN_CONFIG, '--bind', '127.0.0.1:{port}',
+        '--workers', '{workers}', '-k', 'uvicorn.workers.UvicornWorker', 'asgi:app'
+    ],
+}
+
+
+def free_port() -> int:
+    """Retorna un puerto TCP libre en localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, path: str = '/health', timeout: float = 30) -> float:
+    """
+    Espera a que el servidor responda.
+    
+    Returns:
+        Segundos hasta la primera respuesta 200
+    """
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', path)
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"El servidor en el puerto {port} no respondió en {timeout}s")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_endpoint(port: int, path: str, concurrency: int, duration: float) -> Dict:
+    """
+    Ejecuta carga sobre un endpoint con conexiones keep-alive.
+    
+    Args:
+        port: Puerto del servidor
+        path: Ruta a solicitar
+        concurrency: Clientes concurrentes
+        duration: Segundos de carga
+    
+    Returns:
+        Diccionario con requests, errors, rps y latencias en ms
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    
+    def worker():
+        local = []
+        local_errors = 0
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+    
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2)
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara contra una ejecución anterior.
+    
+    Args:
+        results: Resultados actuales
+        baseline: Resultados de referencia
+        threshold: Fracción tolerada (0.10 = 10%)
+    
+    Returns:
+        Lista de regresiones detectadas (vacía si no hay)
+    """
+    regressions = []
+    for path, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(path)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{path}: rps {previous['rps']} -> {current['rps']}")
+        for key in ("p95_ms", "p99_ms"):
+            if current[key] > previous[key] * (1 + threshold):
+                regressions.append(f"{path}: {key} {previous[key]} -> {current[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=sorted(SERVER_COMMANDS), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5, help='Segundos de carga por endpoint')
+    parser.add_argument('--endpoints', nargs='+', default=DEFAULT_ENDPOINTS)
+    parser.add_argument('--bucket-objects', type=int, default=0, help='Objetos extra en el emulador S3')
+    parser.add_argument('--s3-delay', type=float, default=0.0, help='Latencia añadida por el emulador S3 (s)')
+    parser.add_argument('--s3-error-status', type=int, default=None, help='Estado HTTP de los errores inyectados en S3')
+    parser.add_argument('--s3-error-rate', type=float, default=1.0, help='Fracción de peticiones S3 con error')
+    parser.add_argument('--presigned', action='store_true', help='Usar URLs presignadas')
+    parser.add_argument('--env', action='append', default=[], metavar='CLAVE=VALOR',
+                        help='Variables de entorno extra para la aplicación')
+    parser.add_argument('--output', help='Archivo donde guardar el JSON')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Regresión tolerada (fracción)')
+    args = parser.parse_args()
+    
+    s3_port = free_port()
+    app_port = free_port()
+    processes = []
+    
+    try:
+        stub_command = [
+            sys.executable, '-m', 'tests.s3_stub', '--port', str(s3_port),
+            '--objects', str(args.bucket_objects), '--delay', str(args.s3_delay)
+        ]
+        if args.s3_error_status:
+            stub_command += ['--error-status', str(args.s3_error_status), '--error-rate', str(args.s3_error_rate)]
+        processes.append(subprocess.Popen(stub_command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL))
+        
+        env = dict(
+            os.environ,
+            FLASK_ENV='production',
+            S3_BUCKET='test-bucket',
+            S3_ENDPOINT_URL=f"http://127.0.0.1:{s3_port}",
+            AWS_ACCESS_KEY_ID='test',
+            AWS_SECRET_ACCESS_KEY='test',
+            USE_S3_PRESIGNED='true' if args.presigned else 'false',
+            PYTHONPATH=ROOT_DIR
+        )
+        for item in args.env:
+            key, _, value = item.partition('=')
+            env[key] = value
+        
+        # ProductionConfig escribe en logs/ relativo al directorio de trabajo
+        workdir = tempfile.mkdtemp(prefix='pokeneas-bench-')
+        os.makedirs(os.path.join(workdir, 'logs'), exist_ok=True)
+        command = [
+            part.format(port=app_port, workers=args.workers, threads=args.threads)
+            for part in SERVER_COMMANDS[args.server]
+        ]
+        processes.append(subprocess.Popen(
+            command, cwd=workdir, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+        
+        ready_seconds = wait_ready(app_port)
+        
+        results = {
+            "server": args.server,
+            "workers": args.workers,
+            "threads": args.threads if args.server == 'gunicorn' else None,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "time_to_ready_s": round(ready_seconds, 3),
+            "endpoints": {}
+        }
+        for path in args.endpoints:
+            # Calentar cachés e importaciones perezosas antes de medir
+            run_endpoint(app_port, path, min(args.concurrency, 4), 0.5)
+            results["endpoints"][path] = run_endpoint(app_port, path, args.concurrency, args.duration)
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        results["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+    
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
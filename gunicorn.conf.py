@@ -0,0 +1,65 @@
+"""
+Configuración de gunicorn.
+
+gunicorn carga este archivo automáticamente desde el directorio de trabajo;
+los argumentos de la línea de comandos (Dockerfile) tienen prioridad.
+"""
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+# Las métricas de todos los workers se agregan desde este directorio.
+# Debe definirse antes de que la aplicación importe prometheus_client.
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'pokeneas-metrics')
+)
+
+# Cargar la aplicación una sola vez en el master y compartirla con los
+# workers (copy-on-write). GUNICORN_PRELOAD=false la carga en cada worker.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def _flask_app(server):
+    """Aplicación Flask cargada por el master (wsgi:app o asgi:app)."""
+    app = server.app.wsgi()
+    return getattr(app, 'flask_app', app)
+
+
+def on_starting(server):
+    """Limpia las métricas de ejecuciones anteriores."""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    """Precalcula lo compartido y congela el heap antes del primer fork."""
+    if not server.cfg.preload_app:
+        return
+    from app.lifecycle import warm_up
+    warm_up(_flask_app(server))
+    # Los objetos congelados no los recorre el GC de los workers, así que
+    # sus páginas de memoria siguen compartidas con el master
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Reconstruye en el worker el cliente S3 y los hilos en segundo plano."""
+    worker.forked_at = time.monotonic()
+    if server.cfg.preload_app:
+        from app.lifecycle import after_fork
+        after_fork(_flask_app(server))
+
+
+def post_worker_init(worker):
+    """Registra el tiempo desde el fork hasta que el worker puede atender."""
+    elapsed_ms = (time.monotonic() - worker.forked_at) * 1e3
+    worker.log.info(f"Worker {worker.pid} listo en {elapsed_ms:.1f} ms")
+
+
+def child_exit(server, worker):
+    """Descarta los valores en vivo de un worker que terminó."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,6 +3,7 @@ Configuración de pytest.
 """
 import pytest
 from app import create_app
+from tests.s3_stub import S3Stub
 
 
 @pytest.fixture
@@ -22,3 +23,28 @@ def client(app):
 def runner(app):
     """Fixture del CLI runner."""
     return app.test_cli_runner()
+
+
+@pytest.fixture
+def s3_stub():
+    """Fixture de un emulador S3 local con el bucket de testing."""
+    with S3Stub(bucket='test-bucket') as stub:
+        yield stub
+
+
+@pytest.fixture
+def s3_app(app, s3_stub, tmp_path, request):
+    """
+    Fixture de la aplicación apuntando al emulador S3, con las cachés en tmp_path.
+    
+    La configuración propia de un test se pasa parametrizando este fixture
+    de forma indirecta con un diccionario que se aplica encima.
+    """
+    app.config.update(
+        IMAGE_CACHE_DIR=str(tmp_path / 'blobs'),
+        THUMBNAIL_CACHE_DIR=str(tmp_path / 'thumbs'),
+        **s3_stub.app_config
+    )
+    app.config.update(getattr(request, 'param', {}))
+    return app
+
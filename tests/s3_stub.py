@@ -0,0 +1,234 @@
+"""
+Servidor S3 mínimo en memoria para tests y benchmarks.
+
+Implementa lo que usa la aplicación con direccionamiento por ruta
+(http://host:port/<bucket>/<key>): ListObjectsV2, HeadObject, GetObject y
+PutObject. Permite inyectar fallos para simular un S3 degradado: latencia
+por petición (`delay`) y respuestas de error (`error_status`) en una
+fracción de las peticiones (`error_rate`).
+"""
+import base64
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+# Código de error S3 de cada estado HTTP inyectable
+ERROR_CODES = {500: 'InternalError', 503: 'SlowDown', 403: 'AccessDenied'}
+
+
+class S3Stub:
+    """Emulador de S3 que corre en un hilo del proceso actual."""
+    
+    def __init__(self, bucket: str = 'test-bucket', host: str = '127.0.0.1', port: int = 0):
+        """
+        Inicializa el emulador.
+        
+        Args:
+            bucket: Nombre del único bucket servido
+            host: Interfaz de escucha
+            port: Puerto (0 para uno libre)
+        """
+        self.bucket = bucket
+        self.objects = {}
+        self.delay = 0.0
+        self.error_status = None
+        self.error_rate = 1.0
+        self.requests = 0
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def endpoint_url(self) -> str:
+        """URL base para S3_ENDPOINT_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def app_config(self) -> dict:
+        """Configuración de la aplicación para usar este emulador."""
+        return {
+            'S3_ENDPOINT_URL': self.endpoint_url,
+            'AWS_ACCESS_KEY_ID': 'test',
+            'AWS_SECRET_ACCESS_KEY': 'test'
+        }
+    
+    def put(self, key: str, body: bytes = b'', content_type: str = 'image/jpeg'):
+        """Guarda un objeto en el bucket."""
+        with self._lock:
+            self.objects[key] = {
+                'body': body,
+                'etag': hashlib.md5(body).hexdigest(),
+                'content_type': content_type,
+                'last_modified': time.time()
+            }
+    
+    def start(self) -> 'S3Stub':
+        """Arranca el servidor en segundo plano."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Detiene el servidor."""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _list_objects_v2(self, query) -> bytes:
+        prefix = query.get('prefix', [''])[0]
+        max_keys = int(query.get('max-keys', ['1000'])[0])
+        token = query.get('continuation-token', [None])[0]
+        start_after = query.get('start-after', [''])[0]
+        if token:
+            start_after = base64.urlsafe_b64decode(token).decode('utf-8')
+        
+        with self._lock:
+            keys = sorted(k for k in self.objects if k.startswith(prefix) and k > start_after)
+            page = keys[:max_keys]
+            contents = ''.join(
+                '<Contents>'
+                f'<Key>{escape(key)}</Key>'
+                f'<LastModified>{time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(self.objects[key]["last_modified"]))}</LastModified>'
+                f'<ETag>&quot;{self.objects[key]["etag"]}&quot;</ETag>'
+                f'<Size>{len(self.objects[key]["body"])}</Size>'
+                '<StorageClass>STANDARD</StorageClass>'
+                '</Contents>'
+                for key in page
+            )
+        truncated = len(keys) > max_keys
+        next_token = ''
+        if truncated:
+            token = base64.urlsafe_b64encode(page[-1].encode('utf-8')).decode('ascii')
+            next_token = f'<NextContinuationToken>{token}</NextContinuationToken>'
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f'<Name>{escape(self.bucket)}</Name><Prefix>{escape(prefix)}</Prefix>'
+            f'<KeyCount>{len(page)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>'
+            f'<IsTruncated>{"true" if truncated else "false"}</IsTruncated>'
+            f'{next_token}{contents}</ListBucketResult>'
+        ).encode('utf-8')
+    
+    def _make_handler(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _parse(self):
+                with stub._lock:
+                    stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                url = urlparse(self.path)
+                parts = unquote(url.path).lstrip('/').split('/', 1)
+                bucket = parts[0]
+                key = parts[1] if len(parts) > 1 else ''
+                return bucket, key, parse_qs(url.query)
+            
+            def _reply(self, status, body=b'', headers=None, send_body=True):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+            
+            def _inject_error(self, send_body=True) -> bool:
+                # Responde con el error configurado en la fracción error_rate de peticiones
+                with stub._lock:
+                    failing = stub.error_status is not None and stub._rng.random() < stub.error_rate
+                if failing:
+                    code = ERROR_CODES.get(stub.error_status, 'InternalError')
+                    self._reply(stub.error_status, f'<Error><Code>{code}</Code></Error>'.encode('utf-8'),
+                                {'Content-Type': 'application/xml'}, send_body=send_body)
+                return failing
+            
+            def _object(self, send_body):
+                bucket, key, query = self._parse()
+                if self._inject_error(send_body):
+                    return
+                if bucket != stub.bucket:
+                    return self._reply(404, b'<Error><Code>NoSuchBucket</Code></Error>', send_body=send_body)
+                if not key:
+                    return self._reply(200, stub._list_objects_v2(query), {'Content-Type': 'application/xml'},
+                                       send_body=send_body)
+                obj = stub.objects.get(key)
+                if obj is None:
+                    return self._reply(404, b'<Error><Code>NoSuchKey</Code></Error>', send_body=send_body)
+                self.send_response(200)
+                self.send_header('Content-Type', obj['content_type'])
+                self.send_header('Content-Length', str(len(obj['body'])))
+                self.send_header('ETag', f'"{obj["etag"]}"')
+                self.send_header('Last-Modified', formatdate(obj['last_modified'], usegmt=True))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(obj['body'])
+            
+            def do_GET(self):
+                self._object(send_body=True)
+            
+            def do_HEAD(self):
+                self._object(send_body=False)
+            
+            def do_PUT(self):
+                bucket, key, _ = self._parse()
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self._inject_error():
+                    return
+                stub.put(key, body, self.headers.get('Content-Type', 'application/octet-stream'))
+                self._reply(200, headers={'ETag': f'"{stub.objects[key]["etag"]}"'})
+        
+        return Handler
+
+
+def main():
+    """Arranca el emulador como proceso independiente (benchmarks, pruebas manuales)."""
+    import argparse
+    from app.data.pokeneas import POKENEAS_DATA
+    
+    parser = argparse.ArgumentParser(description='Emulador S3 local')
+    parser.add_argument('--bucket', default='test-bucket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--objects', type=int, default=0, help='Objetos de relleno además del catálogo')
+    parser.add_argument('--delay', type=float, default=0.0, help='Latencia añadida por petición (s)')
+    parser.add_argument('--error-status', type=int, default=None, help='Estado HTTP de los errores inyectados')
+    parser.add_argument('--error-rate', type=float, default=1.0, help='Fracción de peticiones con error')
+    args = parser.parse_args()
+    
+    stub = S3Stub(bucket=args.bucket, host=args.host, port=args.port)
+    stub.delay = args.delay
+    stub.error_status = args.error_status
+    stub.error_rate = args.error_rate
+    for pokenea in POKENEAS_DATA:
+        stub.put(pokenea['imagen'], b'\xff\xd8\xff' + pokenea['nombre'].encode('utf-8'))
+    for index in range(args.objects):
+        stub.put(f"extra/{index:08d}.jpg", b'\xff\xd8\xff')
+    
+    print(f"S3 stub en {stub.endpoint_url}/{args.bucket}", flush=True)
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
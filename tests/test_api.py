@@ -2,6 +2,8 @@
 Tests para los endpoints de la API.
 """
 import json
+from unittest.mock import MagicMock, patch
+from app.services.page_cache import RenderedPageCache
 
 
 class TestPokeneaAPI:
@@ -103,6 +105,102 @@ class TestPokeneaView:
         assert '<img' in html or 'placeholder' in html.lower() or 'no disponible' in html.lower()
 
 
+class TestPokeneaPageCache:
+    """Tests para la caché de páginas renderizadas."""
+    
+    def test_repeated_pokenea_is_rendered_once(self, app, client):
+        """Verifica que el mismo Pokenea se renderiza una sola vez."""
+        with patch('app.blueprints.pokeneas.render_template', return_value='<html></html>') as mock_render, \
+                patch('app.services.pokeneas_service.random.choice', side_effect=lambda seq: seq[0]):
+            first = client.get('/pokenea')
+            second = client.get('/')
+        
+        assert first.data == second.data
+        assert mock_render.call_count == 1
+        assert app.extensions['page_cache'].stats()['hits'] == 1
+    
+    def test_rotated_image_url_invalidates_page(self, app, client):
+        """Verifica que una nueva URL de imagen produce un nuevo render."""
+        with patch('app.services.pokeneas_service.random.choice', side_effect=lambda seq: seq[0]), \
+                patch('app.services.pokeneas_service.PokeneasService.resolve_image_url',
+                      side_effect=['https://img/a?sig=1', 'https://img/a?sig=2']):
+            first = client.get('/pokenea').data.decode('utf-8')
+            second = client.get('/pokenea').data.decode('utf-8')
+        
+        assert 'sig=1' in first
+        assert 'sig=2' in second
+        assert app.extensions['page_cache'].stats()['invalidations'] == 1
+    
+    def test_cache_bounded_by_max_entries(self):
+        """Verifica que al superar max_entries se descarta la página usada hace más tiempo."""
+        page_cache = RenderedPageCache(max_entries=2)
+        page_cache.set(1, None, b'uno')
+        page_cache.set(2, None, b'dos')
+        page_cache.get(1, None)
+        page_cache.set(3, None, b'tres')
+        
+        assert page_cache.get(1, None) is not None
+        assert page_cache.get(2, None) is None
+        assert page_cache.get(3, None) is not None
+        assert page_cache.stats()['size'] == 2
+        assert page_cache.stats()['evictions'] == 1
+
+
+class TestPokeneaById:
+    """Tests para /api/pokenea/<id> y /pokenea/<id>"""
+    
+    def test_api_by_id_returns_that_pokenea(self, client):
+        """Verifica que se retorna el Pokenea pedido con ETag y Cache-Control."""
+        response = client.get('/api/pokenea/3')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['id'] == 3
+        assert data['nombre'] == 'Parcero'
+        assert response.headers['ETag']
+        assert 'max-age' in response.headers['Cache-Control']
+    
+    def test_api_by_id_not_modified(self, client):
+        """Verifica que If-None-Match con el ETag actual responde 304."""
+        etag = client.get('/api/pokenea/3').headers['ETag']
+        
+        response = client.get('/api/pokenea/3', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+    
+    def test_api_by_id_not_found(self, client):
+        """Verifica que un id inexistente responde 404."""
+        response = client.get('/api/pokenea/999')
+        
+        assert response.status_code == 404
+        assert json.loads(response.data)['error'] == 'Pokenea no encontrado'
+    
+    def test_view_by_id_etag_and_304(self, client):
+        """Verifica la vista por id con ETag y 304."""
+        first = client.get('/pokenea/1')
+        assert first.status_code == 200
+        assert 'Arepa' in first.data.decode('utf-8')
+        
+        second = client.get('/pokenea/1', headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 304
+    
+    def test_view_by_id_etag_changes_with_image_url(self, client):
+        """Verifica que el ETag cambia cuando rota la URL de la imagen."""
+        with patch('app.services.pokeneas_service.PokeneasService.resolve_image_url',
+                   side_effect=['https://img/a?sig=1', 'https://img/a?sig=2']):
+            first = client.get('/pokenea/1')
+            second = client.get('/pokenea/1', headers={'If-None-Match': first.headers['ETag']})
+        
+        assert second.status_code == 200
+        assert second.headers['ETag'] != first.headers['ETag']
+    
+    def test_view_by_id_not_found(self, client):
+        """Verifica que un id inexistente responde 404."""
+        assert client.get('/pokenea/999').status_code == 404
+
+
 class TestHealthEndpoint:
     """Tests para el endpoint de health check."""
     
@@ -135,3 +233,133 @@ class TestIndexRoute:
         """Verifica que la ruta raíz retorna HTML."""
         response = client.get('/')
         assert 'text/html' in response.content_type
+
+
+class TestImagenesView:
+    """Tests para la galería /imagenes"""
+    
+    @patch('app.blueprints.pokeneas.get_s3_client')
+    def test_imagenes_paginated_page(self, mock_get_s3_client, client):
+        """Verifica que se muestra una página y el enlace a la siguiente."""
+        mock_s3 = MagicMock()
+        mock_s3.list_objects_page.return_value = {
+            "objects": [{"Key": "pokeneas/arepa-001.jpg"}],
+            "next_token": "token-2"
+        }
+        mock_get_s3_client.return_value = mock_s3
+        
+        response = client.get('/imagenes?prefix=pokeneas/&page_size=1')
+        html = response.data.decode('utf-8')
+        
+        assert response.status_code == 200
+        assert 'https://test-bucket.s3.amazonaws.com/pokeneas/arepa-001.jpg' in html
+        assert 'continuation_token=token-2' in html
+        mock_s3.list_objects_page.assert_called_once_with(
+            prefix='pokeneas/', page_size=1, continuation_token=None, start_after=None
+        )
+    
+    @patch('app.blueprints.pokeneas.get_s3_client')
+    def test_imagenes_page_size_is_capped(self, mock_get_s3_client, client):
+        """Verifica que page_size no supera el máximo de S3."""
+        mock_s3 = MagicMock()
+        mock_s3.list_objects_page.return_value = {"objects": [], "next_token": None}
+        mock_get_s3_client.return_value = mock_s3
+        
+        client.get('/imagenes?page_size=50000')
+        
+        assert mock_s3.list_objects_page.call_args.kwargs['page_size'] == 1000
+    
+    @patch('app.blueprints.pokeneas.get_s3_client')
+    def test_imagenes_streams_all_pages(self, mock_get_s3_client, client):
+        """Verifica que el modo completo recorre todas las páginas."""
+        mock_s3 = MagicMock()
+        mock_s3.iter_object_pages.return_value = iter([
+            [{"Key": "a.jpg"}, {"Key": "b.jpg"}],
+            [{"Key": "c.jpg"}]
+        ])
+        mock_get_s3_client.return_value = mock_s3
+        
+        response = client.get('/imagenes?all=true')
+        html = response.data.decode('utf-8')
+        
+        assert response.status_code == 200
+        mock_s3.list_objects_page.assert_not_called()
+        for key in ('a.jpg', 'b.jpg', 'c.jpg'):
+            assert f'https://test-bucket.s3.amazonaws.com/{key}' in html
+    
+    @patch('app.blueprints.pokeneas.get_s3_client')
+    @patch('app.blueprints.pokeneas.get_bucket_index')
+    def test_imagenes_served_from_index_snapshot(self, mock_get_index, mock_get_s3_client, client):
+        """Verifica que con el índice caliente no se consulta S3."""
+        from app.storage.bucket_index import BucketObject, BucketSnapshot
+        
+        snapshot = BucketSnapshot(tuple(
+            BucketObject(key, 10, 'etag', 0.0) for key in ('a.jpg', 'b.jpg', 'c.jpg')
+        ))
+        mock_get_index.return_value = MagicMock(snapshot=snapshot)
+        
+        first = client.get('/imagenes?page_size=2')
+        html = first.data.decode('utf-8')
+        assert first.status_code == 200
+        assert 'a.jpg' in html and 'b.jpg' in html and 'c.jpg' not in html
+        mock_get_s3_client.assert_not_called()
+        
+        # El enlace de la página siguiente continúa desde el índice
+        next_url = html.split('href="')[1].split('"')[0].replace('&amp;', '&')
+        second = client.get(next_url)
+        assert 'c.jpg' in second.data.decode('utf-8')
+        assert second.headers['ETag'] != first.headers['ETag']
+        mock_get_s3_client.assert_not_called()
+    
+    @patch('app.blueprints.pokeneas.get_bucket_index')
+    def test_imagenes_not_modified(self, mock_get_index, client):
+        """Verifica que se responde 304 si el ETag coincide con la página de la foto actual."""
+        from app.storage.bucket_index import BucketObject, BucketSnapshot
+        
+        snapshot = BucketSnapshot((BucketObject('a.jpg', 10, 'etag', 0.0),))
+        mock_get_index.return_value = MagicMock(snapshot=snapshot)
+        etag = client.get('/imagenes').headers['ETag']
+        
+        response = client.get('/imagenes', headers={'If-None-Match': etag})
+        other_page = client.get('/imagenes?page_size=5', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert other_page.status_code == 200
+
+
+class TestPokeneasBatchAPI:
+    """Tests para el endpoint /api/pokeneas"""
+    
+    def test_batch_returns_count_items(self, client):
+        """Verifica que se retornan N Pokeneas con el formato de /api/pokenea."""
+        response = client.get('/api/pokeneas?count=25')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert response.content_type == 'application/json'
+        assert data['count'] == 25
+        assert len(data['pokeneas']) == 25
+        for pokenea in data['pokeneas']:
+            assert set(pokenea) == {'id', 'nombre', 'altura', 'habilidad', 'container_id'}
+    
+    def test_batch_without_replacement_is_unique(self, client):
+        """Verifica que replace=false no repite Pokeneas."""
+        response = client.get('/api/pokeneas?count=10&replace=false')
+        ids = [pokenea['id'] for pokenea in json.loads(response.data)['pokeneas']]
+        
+        assert sorted(ids) == list(range(1, 11))
+    
+    def test_batch_with_seed_is_reproducible(self, client):
+        """Verifica que la misma semilla produce la misma secuencia."""
+        first = client.get('/api/pokeneas?count=50&seed=carga-1')
+        second = client.get('/api/pokeneas?count=50&seed=carga-1')
+        
+        assert first.data == second.data
+    
+    def test_batch_count_limits(self, client):
+        """Verifica que se rechazan valores de count fuera de rango."""
+        assert client.get('/api/pokeneas?count=0').status_code == 400
+        assert client.get('/api/pokeneas?count=abc').status_code == 400
+        assert client.get('/api/pokeneas?count=1001').status_code == 400
+        assert client.get('/api/pokeneas?count=11&replace=false').status_code == 400
@@ -0,0 +1,82 @@
+"""
+Tests para el modo de servicio ASGI.
+"""
+import asyncio
+import json
+import time
+import pytest
+from asgi import create_asgi_app
+
+
+async def asgi_get(app, path, query_string=b''):
+    """Ejecuta un GET contra una aplicación ASGI y retorna (status, body)."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string,
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+    
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    
+    async def send(message):
+        messages.append(message)
+    
+    await app(scope, receive, send)
+    status = messages[0]['status']
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return status, body
+
+
+@pytest.fixture
+def asgi_app(s3_stub):
+    """Fixture de la aplicación ASGI apuntando al emulador S3 local."""
+    app = create_asgi_app('testing')
+    app.flask_app.config.update(s3_stub.app_config)
+    return app
+
+
+class TestASGIApp:
+    """Tests para asgi.py"""
+    
+    def test_api_pokenea_over_asgi(self, asgi_app):
+        """Verifica que /api/pokenea responde a través del adaptador ASGI."""
+        status, body = asyncio.run(asgi_get(asgi_app, '/api/pokenea'))
+        
+        assert status == 200
+        assert 1 <= json.loads(body)['id'] <= 10
+    
+    def test_imagenes_lists_local_s3(self, asgi_app, s3_stub):
+        """Verifica que /imagenes lista el bucket del emulador."""
+        s3_stub.put('pokeneas/arepa-001.jpg', b'jpg')
+        
+        status, body = asyncio.run(asgi_get(asgi_app, '/imagenes'))
+        
+        assert status == 200
+        assert b'pokeneas/arepa-001.jpg' in body
+    
+    def test_slow_s3_calls_do_not_serialize_requests(self, asgi_app, s3_stub):
+        """Verifica que las llamadas lentas a S3 corren en paralelo fuera del bucle."""
+        s3_stub.put('pokeneas/arepa-001.jpg', b'jpg')
+        s3_stub.delay = 0.2
+        
+        async def run_concurrently():
+            return await asyncio.gather(*(asgi_get(asgi_app, '/imagenes') for _ in range(16)))
+        
+        start = time.perf_counter()
+        results = asyncio.run(run_concurrently())
+        elapsed = time.perf_counter() - start
+        
+        assert all(status == 200 for status, _ in results)
+        # En serie serían al menos 16 * 0.2s
+        assert elapsed < 1.6
@@ -0,0 +1,91 @@
+"""
+Tests para los assets estáticos con huella de contenido.
+"""
+import gzip
+import re
+from app.assets import AssetManifest, precompress_folder
+
+
+class TestFingerprintedAssets:
+    """Tests para las URLs con huella y su caché inmutable."""
+    
+    def test_template_links_fingerprinted_css(self, client):
+        """Verifica que base.html enlaza la hoja de estilos con huella."""
+        response = client.get('/pokenea')
+        
+        assert re.search(rb'href="/static/assets/css/base\.[0-9a-f]{12}\.css"', response.data)
+    
+    def test_fingerprinted_asset_is_immutable(self, app, client):
+        """Verifica que la URL con huella se sirve con caché de un año."""
+        hashed = app.extensions['asset_manifest'].fingerprinted['css/base.css']
+        
+        response = client.get(f'/static/assets/{hashed}')
+        
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert response.mimetype == 'text/css'
+    
+    def test_stale_fingerprint_not_found(self, client):
+        """Verifica que una huella desconocida responde 404."""
+        response = client.get('/static/assets/css/base.000000000000.css')
+        
+        assert response.status_code == 404
+    
+    def test_precompressed_sibling_served(self, app, client, tmp_path):
+        """Verifica que se sirve el hermano .gz cuando el cliente acepta gzip."""
+        (tmp_path / 'app.css').write_bytes(b'body { color: red; }\n' * 100)
+        precompress_folder(str(tmp_path))
+        manifest = AssetManifest(str(tmp_path))
+        app.extensions['asset_manifest'] = manifest
+        
+        response = client.get(
+            f"/static/assets/{manifest.fingerprinted['app.css']}",
+            headers={'Accept-Encoding': 'gzip'}
+        )
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype == 'text/css'
+        assert gzip.decompress(response.data) == (tmp_path / 'app.css').read_bytes()
+    
+    def test_stale_precompressed_sibling_ignored(self, app, client, tmp_path):
+        """Verifica que un .gz de un contenido anterior no se sirve con la huella nueva."""
+        asset = tmp_path / 'app.css'
+        asset.write_bytes(b'body { color: red; }\n' * 100)
+        precompress_folder(str(tmp_path))
+        asset.write_bytes(b'body { color: blue; }\n' * 100)
+        manifest = AssetManifest(str(tmp_path))
+        app.extensions['asset_manifest'] = manifest
+        
+        response = client.get(
+            f"/static/assets/{manifest.fingerprinted['app.css']}",
+            headers={'Accept-Encoding': 'gzip'}
+        )
+        
+        # El original se comprime al vuelo: el cuerpo es el contenido nuevo
+        assert gzip.decompress(response.data) == asset.read_bytes()
+        
+        precompress_folder(str(tmp_path))
+        assert sorted(path.name for path in tmp_path.glob('*.gz')) == [manifest.fingerprinted['app.css'] + '.gz']
+
+
+class TestAssetManifest:
+    """Tests para el cálculo de huellas."""
+    
+    def test_hash_follows_content(self, tmp_path):
+        """Verifica que la huella cambia con el contenido y omite los .gz/.br."""
+        asset = tmp_path / 'site.css'
+        asset.write_bytes(b'a {}')
+        (tmp_path / 'site.css.gz').write_bytes(b'')
+        first = AssetManifest(str(tmp_path)).fingerprinted
+        
+        asset.write_bytes(b'b {}')
+        second = AssetManifest(str(tmp_path)).fingerprinted
+        
+        assert list(first) == ['site.css']
+        assert first['site.css'] != second['site.css']
+    
+    def test_cli_manifest(self, app, runner):
+        """Verifica que `flask assets manifest` lista las huellas."""
+        result = runner.invoke(args=['assets', 'manifest'])
+        
+        assert 'css/base.css -> css/base.' in result.output
@@ -0,0 +1,144 @@
+"""
+Tests para el catálogo precalculado de Pokeneas.
+"""
+import json
+import time
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.data.pokeneas import POKENEAS_DATA
+from app.data.sources import FileSource, open_source, write_catalog
+
+
+class TestCatalog:
+    """Tests para el catálogo inmutable."""
+    
+    def test_catalog_built_at_app_creation(self, app):
+        """Verifica que el catálogo se registra al crear la aplicación."""
+        catalog = app.extensions['catalog_store'].catalog
+        
+        assert len(catalog) == len(POKENEAS_DATA)
+        assert catalog.by_id[1].nombre == 'Arepa'
+    
+    def test_records_are_immutable(self, app):
+        """Verifica que los registros no se pueden modificar."""
+        record = app.extensions['catalog_store'].catalog.by_id[1]
+        
+        with pytest.raises(AttributeError):
+            record.nombre = 'Otro'
+        with pytest.raises(TypeError):
+            app.extensions['catalog_store'].catalog.by_id[99] = record
+    
+    def test_api_payloads_match_api_dict(self, app):
+        """Verifica que el JSON precalculado equivale al payload de la API."""
+        catalog = app.extensions['catalog_store'].catalog
+        
+        for record, payload in zip(catalog.records, catalog.api_payloads):
+            assert json.loads(payload) == record.api_dict(catalog.container_id)
+    
+    def test_api_returns_precomputed_payload(self, app, client):
+        """Verifica que /api/pokenea sirve uno de los payloads precalculados."""
+        catalog = app.extensions['catalog_store'].catalog
+        
+        response = client.get('/api/pokenea')
+        
+        assert response.data in catalog.api_payloads
+
+
+@pytest.fixture
+def sqlite_app(tmp_path):
+    """Aplicación con el catálogo en una base SQLite y sin hilo de recarga."""
+    path = str(tmp_path / 'catalogo.db')
+    write_catalog(path, POKENEAS_DATA)
+    with patch.multiple(TestingConfig, CATALOG_SOURCE=path, CATALOG_RELOAD_INTERVAL=0):
+        app = create_app('testing')
+    app.config['CATALOG_PATH'] = path
+    return app
+
+
+class TestCatalogSources:
+    """Tests para las fuentes de archivo y la recarga en caliente."""
+    
+    @pytest.mark.parametrize('name', ['catalogo.json', 'catalogo.db'])
+    def test_file_sources_roundtrip(self, tmp_path, name):
+        """Verifica que JSON y SQLite devuelven los mismos datos que el módulo."""
+        path = str(tmp_path / name)
+        write_catalog(path, POKENEAS_DATA)
+        
+        assert list(open_source(path).load()) == POKENEAS_DATA
+    
+    def test_source_without_load_fails_on_creation(self, tmp_path):
+        """Verifica que una fuente sin load no se puede instanciar."""
+        class IncompleteSource(FileSource):
+            pass
+        
+        with pytest.raises(TypeError):
+            IncompleteSource(str(tmp_path / 'catalogo.csv'))
+    
+    def test_reload_swaps_snapshot(self, sqlite_app):
+        """Verifica que un cambio en la base publica un catálogo nuevo."""
+        store = sqlite_app.extensions['catalog_store']
+        before = store.catalog
+        data = [dict(item) for item in POKENEAS_DATA]
+        data[0]['nombre'] = 'Arepa de Choclo'
+        write_catalog(sqlite_app.config['CATALOG_PATH'], data)
+        
+        assert store.reload() is True
+        after = store.catalog
+        response = sqlite_app.test_client().get('/api/pokenea/1')
+        
+        assert after is not before
+        assert before.by_id[1].nombre == 'Arepa'
+        assert response.get_json()['nombre'] == 'Arepa de Choclo'
+        # Los registros sin cambios se reutilizan
+        assert after.by_id[2] is before.by_id[2]
+        assert after.api_payloads[1] is before.api_payloads[1]
+    
+    def test_unchanged_source_not_reloaded(self, sqlite_app):
+        """Verifica que sin cambios en el archivo no se reconstruye el catálogo."""
+        store = sqlite_app.extensions['catalog_store']
+        
+        assert store.reload() is False
+    
+    def test_invalid_source_keeps_previous(self, sqlite_app, tmp_path):
+        """Verifica que un archivo inválido conserva el catálogo anterior."""
+        store = sqlite_app.extensions['catalog_store']
+        before = store.catalog
+        duplicated = POKENEAS_DATA + [dict(POKENEAS_DATA[0])]
+        store.source = open_source(str(tmp_path / 'roto.json'))
+        write_catalog(str(tmp_path / 'roto.json'), duplicated)
+        
+        with pytest.raises(ValueError):
+            store.reload()
+        
+        assert store.catalog is before
+    
+    def test_stale_pages_discarded(self, sqlite_app):
+        """Verifica que la recarga descarta solo las páginas de registros modificados."""
+        client = sqlite_app.test_client()
+        client.get('/pokenea/1')
+        client.get('/pokenea/2')
+        data = [dict(item) for item in POKENEAS_DATA]
+        data[0]['frase_filosofica'] = 'Frase nueva'
+        write_catalog(sqlite_app.config['CATALOG_PATH'], data)
+        
+        sqlite_app.extensions['catalog_store'].reload()
+        
+        assert sqlite_app.extensions['page_cache'].stats()['size'] == 1
+        assert 'Frase nueva' in client.get('/pokenea/1').data.decode('utf-8')
+    
+    def test_watcher_thread_reloads(self, sqlite_app):
+        """Verifica que el hilo de recarga detecta el cambio por sí solo."""
+        store = sqlite_app.extensions['catalog_store']
+        store.reload_interval = 0.05
+        store.ensure_running()
+        data = [dict(item) for item in POKENEAS_DATA[:3]]
+        write_catalog(sqlite_app.config['CATALOG_PATH'], data)
+        
+        deadline = time.monotonic() + 5
+        while len(store.catalog) != 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        store.stop()
+        
+        assert len(store.catalog) == 3
@@ -0,0 +1,340 @@
+"""
+Tests para el circuit breaker y los timeouts de las operaciones de S3.
+"""
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+from app.storage.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.storage.s3 import get_s3_client, is_s3_outage
+
+KEY = 'pokeneas/arepa-001.jpg'
+
+
+class FakeClock:
+    """Reloj monótono controlado por el test."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def stub_app(s3_app, s3_stub):
+    """Aplicación contra el emulador S3 con timeouts cortos y sin reintentos."""
+    s3_app.config.update(
+        # En botocore max_attempts cuenta los reintentos: 0 es un solo intento
+        S3_MAX_ATTEMPTS=0,
+        S3_OPERATION_TIMEOUTS={'head_object': 0.2, 'get_object': 0.2, 'list': 0.2},
+        S3_CIRCUIT_FAILURE_THRESHOLD=3,
+        S3_CIRCUIT_RESET_TIMEOUT=30
+    )
+    s3_stub.put(KEY, b'\xff\xd8\xff' + b'0123456789' * 10)
+    return s3_app
+
+
+def open_circuit(s3_client):
+    """Abre el circuito registrando fallos hasta el umbral."""
+    for _ in range(s3_client.breaker.failure_threshold):
+        s3_client.breaker.record_failure(TimeoutError('timeout'))
+    assert s3_client.breaker.state == OPEN
+
+
+class TestCircuitBreaker:
+    """Tests para CircuitBreaker."""
+    
+    def test_opens_after_consecutive_failures(self):
+        """Verifica que solo los fallos seguidos abren el circuito."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+        
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+        assert breaker.stats()['rejected'] == 1
+    
+    def test_half_open_admits_a_single_probe(self):
+        """Verifica que tras reset_timeout pasa una sola llamada de prueba."""
+        clock = FakeClock()
+        states = []
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, on_state_change=states.append, clock=clock)
+        breaker.record_failure()
+        
+        clock.now = 5
+        assert breaker.allow() is False
+        assert breaker.retry_after() == 5
+        
+        clock.now = 10
+        assert breaker.allow() is True
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is False
+        
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert states == [OPEN, HALF_OPEN, CLOSED]
+    
+    def test_failed_probe_reopens(self):
+        """Verifica que un fallo de la llamada de prueba vuelve a abrir el circuito."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        
+        assert breaker.allow() is True
+        breaker.record_failure()
+        
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == 10
+    
+    def test_non_probe_calls_never_take_the_probe(self):
+        """Verifica que allow(probe=False) solo pasa con el circuito cerrado y deja libre la prueba."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        assert breaker.allow(probe=False) is True
+        breaker.record_failure()
+        
+        assert breaker.allow(probe=False) is False
+        clock.now = 10
+        assert breaker.allow(probe=False) is False
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is True
+    
+    def test_outage_classification(self):
+        """Verifica que los 4xx no cuentan como caída de S3 y los 5xx y timeouts sí."""
+        def client_error(status, code):
+            return ClientError(
+                {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}, 'HeadObject'
+            )
+        
+        assert is_s3_outage(client_error(404, '404')) is False
+        assert is_s3_outage(client_error(403, 'AccessDenied')) is False
+        assert is_s3_outage(client_error(503, 'SlowDown')) is True
+        assert is_s3_outage(client_error(400, 'RequestTimeout')) is True
+        assert is_s3_outage(ReadTimeoutError(endpoint_url='http://s3')) is True
+
+
+class TestS3CircuitBreaker:
+    """Tests del circuit breaker de S3Client contra el emulador S3."""
+    
+    def test_slow_s3_times_out_then_fails_fast(self, stub_app, s3_stub):
+        """Verifica el timeout por operación y el rechazo inmediato con el circuito abierto."""
+        s3_stub.delay = 1.0
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            s3_client.client_for('head_object')
+            
+            for _ in range(3):
+                start = time.perf_counter()
+                assert s3_client.check_object_exists(KEY) is False
+                assert time.perf_counter() - start < 0.5
+            
+            assert s3_client.breaker.state == OPEN
+            requests = s3_stub.requests
+            start = time.perf_counter()
+            assert s3_client.check_object_exists(KEY) is False
+            
+            assert time.perf_counter() - start < 0.05
+            assert s3_stub.requests == requests
+    
+    def test_operation_clients_do_not_retry(self, app):
+        """Verifica que las operaciones con timeout propio usan un cliente sin reintentos."""
+        with app.app_context():
+            s3_client = get_s3_client()
+            default = s3_client.client
+            head = s3_client.client_for('head_object')
+            
+            assert s3_client.client_for('presign') is default
+            assert head.meta.config.read_timeout == 1
+            assert head.meta.config.retries['total_max_attempts'] == 1
+            assert default.meta.config.retries['total_max_attempts'] == 4
+    
+    def test_missing_objects_do_not_open_circuit(self, stub_app):
+        """Verifica que los 404 no abren el circuito."""
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            
+            for _ in range(5):
+                assert s3_client.check_object_exists('no/existe.jpg') is False
+            
+            assert s3_client.breaker.state == CLOSED
+    
+    def test_server_errors_open_circuit(self, stub_app, s3_stub):
+        """Verifica que las respuestas 503 abren el circuito y list lo propaga."""
+        s3_stub.error_status = 503
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            
+            for _ in range(3):
+                with pytest.raises(ClientError):
+                    s3_client.list_objects_page()
+            
+            with pytest.raises(CircuitOpenError):
+                s3_client.list_objects_page()
+    
+    def test_probe_closes_circuit_when_s3_recovers(self, stub_app, s3_stub):
+        """Verifica que la llamada de prueba cierra el circuito si S3 responde."""
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            open_circuit(s3_client)
+            s3_client.breaker.opened_at -= 30
+            
+            assert s3_client.check_object_exists(KEY) is True
+            assert s3_client.breaker.state == CLOSED
+    
+    def test_presign_does_not_reset_failures(self, stub_app, s3_stub):
+        """Verifica que firmar URLs entre fallos de S3 no impide abrir el circuito."""
+        stub_app.config['USE_S3_PRESIGNED'] = True
+        s3_stub.error_status = 503
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            
+            for _ in range(3):
+                s3_client.presigned_cache.clear()
+                assert s3_client.get_presigned_url(KEY).startswith(s3_stub.endpoint_url)
+                assert s3_client.check_object_exists(KEY) is False
+            
+            assert s3_client.breaker.state == OPEN
+    
+    def test_presign_only_traffic_recovers(self, stub_app, s3_stub):
+        """Verifica que firmando URLs el HEAD de prueba cierra el circuito cuando S3 se recupera."""
+        stub_app.config.update(USE_S3_PRESIGNED=True, S3_PLACEHOLDER_IMAGE_URL='/static/placeholder.jpg')
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            open_circuit(s3_client)
+            assert s3_client.get_presigned_url(KEY) == '/static/placeholder.jpg'
+            
+            s3_client.breaker.opened_at -= 30
+            requests = s3_stub.requests
+            
+            assert s3_client.get_presigned_url(KEY).startswith(s3_stub.endpoint_url)
+            assert s3_client.breaker.state == CLOSED
+            assert s3_stub.requests == requests + 1
+    
+    def test_presign_probe_reopens_while_s3_is_down(self, stub_app, s3_stub):
+        """Verifica que si el HEAD de prueba falla el circuito vuelve a abrirse."""
+        stub_app.config.update(USE_S3_PRESIGNED=True, S3_PLACEHOLDER_IMAGE_URL='/static/placeholder.jpg')
+        s3_stub.error_status = 503
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            open_circuit(s3_client)
+            s3_client.breaker.opened_at -= 30
+            
+            assert s3_client.get_presigned_url(KEY) == '/static/placeholder.jpg'
+            assert s3_client.breaker.state == OPEN
+    
+    def test_presign_waits_for_a_probe_in_progress(self, stub_app, s3_stub):
+        """Verifica que la firma no cierra el circuito mientras otra llamada tiene la prueba."""
+        stub_app.config.update(USE_S3_PRESIGNED=True, S3_PLACEHOLDER_IMAGE_URL='/static/placeholder.jpg')
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            open_circuit(s3_client)
+            s3_client.breaker.opened_at -= 30
+            assert s3_client.breaker.allow() is True
+            requests = s3_stub.requests
+            
+            assert s3_client.get_presigned_url(KEY) == '/static/placeholder.jpg'
+            assert s3_client.breaker.state == HALF_OPEN
+            assert s3_client.breaker.failures == 3
+            assert s3_stub.requests == requests
+    
+    def test_tail_latency_bounded_during_brownout(self, stub_app, s3_stub):
+        """Verifica que con S3 colgado ninguna llamada concurrente supera el timeout."""
+        s3_stub.delay = 2.0
+        latencies = []
+        
+        def worker():
+            with stub_app.app_context():
+                for _ in range(4):
+                    start = time.perf_counter()
+                    get_s3_client().check_object_exists(KEY)
+                    latencies.append(time.perf_counter() - start)
+        
+        with stub_app.app_context():
+            get_s3_client().client_for('head_object')
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(latencies) == 32
+        # Sin circuito ni timeout propio cada llamada esperaría los 2 s del emulador
+        assert max(latencies) < 1.0
+        assert time.perf_counter() - start < 1.5
+        assert sorted(latencies)[len(latencies) // 2] < 0.05
+
+
+class TestFallbacks:
+    """Tests de las respuestas de respaldo con el circuito abierto."""
+    
+    def test_presigned_url_falls_back_to_last_known_good(self, stub_app):
+        """Verifica que se reutiliza la última URL firmada mientras su firma siga vigente."""
+        stub_app.config['USE_S3_PRESIGNED'] = True
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            url = s3_client.get_presigned_url(KEY)
+            open_circuit(s3_client)
+            
+            # Dentro del margen de seguridad: get() ya no la sirve, pero la firma vale
+            later = time.monotonic() + s3_client.presigned_expiration - 10
+            with patch('app.storage.presigned_cache.time.monotonic', return_value=later):
+                assert s3_client.get_presigned_url(KEY) == url
+    
+    def test_placeholder_without_previous_url(self, stub_app):
+        """Verifica que sin URL anterior se sirve S3_PLACEHOLDER_IMAGE_URL."""
+        stub_app.config.update(USE_S3_PRESIGNED=True, S3_PLACEHOLDER_IMAGE_URL='/static/placeholder.jpg')
+        with stub_app.app_context():
+            s3_client = get_s3_client()
+            open_circuit(s3_client)
+            
+            assert s3_client.get_presigned_url(KEY) == '/static/placeholder.jpg'
+    
+    def test_image_proxy_serves_stale_copy(self, stub_app):
+        """Verifica que /img sirve la copia vencida y responde 503 si no hay ninguna."""
+        stub_app.config.update(IMAGE_PROXY_ENABLED=True, IMAGE_CACHE_TTL=0)
+        client = stub_app.test_client()
+        first = client.get(f'/img/{KEY}')
+        with stub_app.app_context():
+            open_circuit(get_s3_client())
+        
+        stale = client.get(f'/img/{KEY}')
+        missing = client.get('/img/pokeneas/otra.jpg')
+        
+        assert stale.status_code == 200
+        assert stale.data == first.data
+        assert missing.status_code == 503
+        assert int(missing.headers['Retry-After']) > 0
+    
+    def test_imagenes_unavailable(self, stub_app):
+        """Verifica el 503 de /imagenes sin índice del bucket y con el circuito abierto."""
+        with stub_app.app_context():
+            open_circuit(get_s3_client())
+        
+        response = stub_app.test_client().get('/imagenes')
+        
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+    
+    def test_health_reports_circuit_state(self, stub_app):
+        """Verifica que /health y /metrics exponen el estado del circuito."""
+        client = stub_app.test_client()
+        assert 's3_circuit' not in client.get('/health').get_json()
+        
+        with stub_app.app_context():
+            open_circuit(get_s3_client())
+        data = client.get('/health').get_json()
+        
+        assert data['status'] == 'healthy'
+        assert data['s3_circuit']['state'] == OPEN
+        assert data['s3_circuit']['last_error'] == 'TimeoutError: timeout'
+        assert b'pokeneas_s3_circuit_state 2.0' in client.get('/metrics').data
@@ -0,0 +1,116 @@
+"""
+Tests para la compresión de respuestas.
+"""
+import gzip
+import zlib
+from unittest.mock import MagicMock, patch
+import pytest
+from app import create_app
+from app import compression
+from app.compression import VariantCache, compress_stream
+from app.config import TestingConfig
+
+
+class TestResponseCompression:
+    """Tests para la negociación gzip/brotli."""
+    
+    def test_gzip_view(self, client):
+        """Verifica que /pokenea se comprime con gzip si el cliente lo acepta."""
+        response = client.get('/pokenea', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert b'<html' in gzip.decompress(response.data).lower()
+    
+    @pytest.mark.skipif(compression.brotli is None, reason="brotli no instalado")
+    def test_brotli_preferred(self, client):
+        """Verifica que brotli se prefiere cuando ambos se aceptan."""
+        response = client.get('/pokenea/1', headers={'Accept-Encoding': 'gzip, br'})
+        
+        assert response.headers['Content-Encoding'] == 'br'
+        assert compression.brotli.decompress(response.data).startswith(b'<!DOCTYPE')
+    
+    def test_identity_without_accept_encoding(self, client):
+        """Verifica que sin Accept-Encoding el cuerpo va sin comprimir."""
+        response = client.get('/pokenea/1')
+        
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+    
+    def test_small_bodies_not_compressed(self, client):
+        """Verifica que los cuerpos bajo COMPRESSION_MIN_SIZE no se comprimen."""
+        response = client.get('/api/pokenea/1', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_compressed_etag_is_weak_and_revalidates(self, client):
+        """Verifica que la variante lleva ETag débil y responde 304 con él."""
+        first = client.get('/pokenea/1', headers={'Accept-Encoding': 'gzip'})
+        etag = first.headers['ETag']
+        
+        second = client.get('/pokenea/1', headers={
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': etag
+        })
+        
+        assert etag.startswith('W/')
+        assert second.status_code == 304
+        assert second.headers['ETag'] == etag
+    
+    def test_variant_reused(self, app, client):
+        """Verifica que la variante se comprime una sola vez por worker."""
+        client.get('/pokenea/1', headers={'Accept-Encoding': 'gzip'})
+        cache = app.extensions['compression_variants']
+        for key in cache._variants:
+            cache._variants[key] = b'cached'
+        
+        response = client.get('/pokenea/1', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.data == b'cached'
+    
+    def test_imagenes_pages_have_distinct_variants(self, client):
+        """Verifica que dos páginas de /imagenes no comparten la variante gzip."""
+        from app.storage.bucket_index import BucketObject, BucketSnapshot
+        
+        snapshot = BucketSnapshot(tuple(
+            BucketObject(f"pokeneas/{index:03d}.jpg", 10, 'etag', 0.0) for index in range(60)
+        ))
+        with patch('app.blueprints.pokeneas.get_bucket_index', return_value=MagicMock(snapshot=snapshot)):
+            small = client.get('/imagenes?page_size=5', headers={'Accept-Encoding': 'gzip'})
+            large = client.get('/imagenes?page_size=40', headers={'Accept-Encoding': 'gzip'})
+            plain = client.get('/imagenes?page_size=40')
+        
+        assert small.headers['Content-Encoding'] == 'gzip'
+        assert small.headers['ETag'] != large.headers['ETag']
+        assert gzip.decompress(small.data) != gzip.decompress(large.data)
+        assert gzip.decompress(large.data) == plain.data
+    
+    def test_disabled(self, app, client):
+        """Verifica que COMPRESSION_ENABLED=False no registra la compresión."""
+        with patch.object(TestingConfig, 'COMPRESSION_ENABLED', False):
+            plain_app = create_app('testing')
+        
+        response = plain_app.test_client().get('/pokenea', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in response.headers
+
+
+class TestCompressionHelpers:
+    """Tests para los compresores y la caché de variantes."""
+    
+    def test_stream_roundtrip(self):
+        """Verifica que el flujo gzip por fragmentos se descomprime completo."""
+        chunks = [b'<li>%d</li>' % i for i in range(100)]
+        
+        data = b''.join(compress_stream(iter(chunks), 'gzip', 5))
+        
+        assert zlib.decompress(data, 31) == b''.join(chunks)
+    
+    def test_variant_cache_bounded(self, app):
+        """Verifica que la caché de variantes respeta max_size."""
+        cache = VariantCache(max_size=2)
+        with app.app_context():
+            for key in ('a', 'b', 'c'):
+                cache.get_or_compress(key, 'gzip', b'x' * 1000)
+        
+        assert list(cache._variants) == [('b', 'gzip'), ('c', 'gzip')]
@@ -0,0 +1,81 @@
+"""
+Tests para la exportación NDJSON del catálogo.
+"""
+import json
+from unittest.mock import MagicMock, patch
+from app.data.pokeneas import POKENEAS_DATA
+
+
+def parse_lines(response):
+    """Convierte un cuerpo NDJSON en una lista de diccionarios."""
+    return [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+
+class TestExport:
+    """Tests para /api/pokeneas/export."""
+    
+    def test_exports_every_pokenea_in_id_order(self, client):
+        """Verifica que cada Pokenea aparece una vez, con imagen_url."""
+        response = client.get('/api/pokeneas/export')
+        lines = parse_lines(response)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.headers['Accept-Ranges'] == 'items'
+        assert [line['id'] for line in lines] == sorted(item['id'] for item in POKENEAS_DATA)
+        assert lines[0]['imagen_url'].endswith(lines[0]['imagen'])
+        assert lines[0]['frase_filosofica'] == POKENEAS_DATA[0]['frase_filosofica']
+    
+    def test_resume_with_cursor(self, client):
+        """Verifica que after continúa después del último id recibido."""
+        lines = parse_lines(client.get('/api/pokeneas/export?after=7'))
+        
+        assert [line['id'] for line in lines] == [8, 9, 10]
+    
+    def test_resume_with_range(self, client):
+        """Verifica la reanudación con Range: items=n-."""
+        response = client.get('/api/pokeneas/export', headers={'Range': 'items=8-'})
+        
+        assert response.status_code == 206
+        assert response.headers['Content-Range'] == f'items 8-9/{len(POKENEAS_DATA)}'
+        assert [line['id'] for line in parse_lines(response)] == [9, 10]
+    
+    def test_invalid_range(self, client):
+        """Verifica el 416 para rangos fuera del catálogo o de otra unidad."""
+        for value in ('items=99-', 'bytes=0-'):
+            response = client.get('/api/pokeneas/export', headers={'Range': value})
+            
+            assert response.status_code == 416
+            assert response.headers['Content-Range'] == f'items */{len(POKENEAS_DATA)}'
+    
+    def test_urls_resolved_in_batches(self, app, client):
+        """Verifica que las URLs se piden por lotes mientras se transmite."""
+        app.config['EXPORT_BATCH_SIZE'] = 4
+        with patch('app.services.pokeneas_service.PokeneasService.resolve_image_urls',
+                   side_effect=lambda keys: dict.fromkeys(keys, 'https://img')) as mock_resolve:
+            response = client.get('/api/pokeneas/export')
+            chunks = response.response
+            first = next(iter(chunks))
+            
+            assert mock_resolve.call_count == 1
+            assert first.count(b'\n') == 4
+            b''.join(chunks)
+        
+        assert [len(call.args[0]) for call in mock_resolve.call_args_list] == [4, 4, 2]
+    
+    @patch('boto3.client')
+    def test_batch_presign_does_not_fill_cache(self, mock_boto_client, app):
+        """Verifica que la exportación no desaloja la caché de URLs presignadas."""
+        with app.test_request_context():
+            app.config['USE_S3_PRESIGNED'] = True
+            mock_s3 = MagicMock()
+            mock_s3.generate_presigned_url.side_effect = lambda *args, **kwargs: 'https://signed'
+            mock_boto_client.return_value = mock_s3
+            
+            from app.storage.s3 import S3Client
+            
+            s3_client = S3Client()
+            urls = s3_client.get_image_urls(['a.jpg', 'b.jpg'])
+            
+            assert urls == {'a.jpg': 'https://signed', 'b.jpg': 'https://signed'}
+            assert s3_client.presigned_cache.stats()['size'] == 0
@@ -0,0 +1,141 @@
+"""
+Tests para los índices del catálogo y el modo filtro de /api/pokeneas.
+"""
+import random
+import pytest
+from app.data.catalog import PokeneaRecord
+from app.data.indexes import AttributeIndex, fold, parse_altura
+
+
+def make_records(count, seed=0):
+    """Registros sintéticos con habilidades y alturas repetidas, en orden aleatorio."""
+    rng = random.Random(seed)
+    ids = list(range(1, count + 1))
+    rng.shuffle(ids)
+    return tuple(
+        PokeneaRecord(
+            id=pokenea_id,
+            nombre=f"Pokenea {pokenea_id}",
+            altura=f"{rng.randint(1, 30) / 10}m",
+            habilidad=rng.choice(['Doble Sabor', 'Espíritu Festivo', 'Carga Floral']),
+            imagen=f"pokeneas/{pokenea_id}.jpg",
+            frase_filosofica="Frase"
+        )
+        for pokenea_id in ids
+    )
+
+
+def brute_force(records, habilidad=None, altura_min=None, altura_max=None, id_min=None, id_max=None):
+    """Ids que cumplen los filtros recorriendo todo el catálogo."""
+    result = []
+    for record in records:
+        height = parse_altura(record.altura)
+        if habilidad is not None and fold(record.habilidad) != fold(habilidad):
+            continue
+        if altura_min is not None and height < altura_min:
+            continue
+        if altura_max is not None and height > altura_max:
+            continue
+        if id_min is not None and record.id < id_min:
+            continue
+        if id_max is not None and record.id > id_max:
+            continue
+        result.append(record.id)
+    return sorted(result)
+
+
+def paginate(index, limit, **filters):
+    """Recorre todas las páginas de una consulta siguiendo el cursor."""
+    ids = []
+    after = None
+    while True:
+        positions, after = index.query(after=after, limit=limit, **filters)
+        ids.extend(index.records[position].id for position in positions)
+        if after is None:
+            return ids
+
+
+class TestAttributeIndex:
+    """Tests para AttributeIndex."""
+    
+    @pytest.mark.parametrize('value, expected', [
+        ('0.3m', 0.3), ('1,2 m', 1.2), ('30cm', 0.3), ('2', 2.0), (1.5, 1.5), ('alto', None)
+    ])
+    def test_parse_altura(self, value, expected):
+        """Verifica la conversión de alturas a metros."""
+        assert parse_altura(value) == expected
+    
+    def test_fold_ignores_accents_and_case(self):
+        """Verifica la normalización sin tildes ni mayúsculas."""
+        assert fold('Espíritu FESTIVO') == 'espiritu festivo'
+    
+    @pytest.mark.parametrize('filters', [
+        {'habilidad': 'espiritu festivo'},
+        {'altura_min': 0.5, 'altura_max': 0.9},
+        {'altura_min': 2.5},
+        {'id_min': 100, 'id_max': 250},
+        {'habilidad': 'Carga Floral', 'altura_max': 1.0, 'id_min': 50},
+        {'habilidad': 'Inexistente'},
+    ])
+    def test_query_matches_brute_force(self, filters):
+        """Verifica que las consultas paginadas coinciden con un recorrido completo."""
+        records = make_records(500)
+        index = AttributeIndex(records)
+        
+        assert paginate(index, 7, **filters) == brute_force(records, **filters)
+    
+    def test_cursor_marks_last_id(self):
+        """Verifica que next_after es el último id devuelto y se omite al final."""
+        records = make_records(20)
+        index = AttributeIndex(records)
+        
+        positions, after = index.query(limit=5)
+        
+        assert [records[p].id for p in positions] == [1, 2, 3, 4, 5]
+        assert after == 5
+        assert index.query(after=15, limit=5)[1] is None
+
+
+class TestFilterApi:
+    """Tests para /api/pokeneas con filtros."""
+    
+    def test_filter_by_habilidad(self, client):
+        """Verifica el filtro por habilidad sin tildes."""
+        data = client.get('/api/pokeneas?habilidad=espiritu festivo').get_json()
+        
+        assert data['count'] == 1
+        assert data['pokeneas'][0]['habilidad'] == 'Espíritu Festivo'
+        assert data['next_after'] is None
+    
+    def test_filter_by_height_paginated(self, client):
+        """Verifica el rango de altura y la página siguiente con after."""
+        first = client.get('/api/pokeneas?altura_min=1m&limit=2').get_json()
+        second = client.get(f"/api/pokeneas?altura_min=1m&limit=2&after={first['next_after']}").get_json()
+        
+        ids = [p['id'] for p in first['pokeneas'] + second['pokeneas']]
+        assert ids == sorted(ids)
+        assert first['next_after'] == first['pokeneas'][-1]['id']
+        assert all(parse_altura(p['altura']) >= 1 for p in first['pokeneas'] + second['pokeneas'])
+    
+    @pytest.mark.parametrize('query', ['altura_min=alto', 'id_min=x', 'habilidad=a&limit=0'])
+    def test_invalid_filters(self, client, query):
+        """Verifica el 400 para filtros inválidos."""
+        response = client.get(f'/api/pokeneas?{query}')
+        
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Parámetro de filtro inválido'
+    
+    @pytest.mark.parametrize('query', ['count=3&limit=2', 'count=3&after=5', 'habilidad=a&seed=1'])
+    def test_batch_params_with_filters_rejected(self, client, query):
+        """Verifica el 400 al mezclar parámetros del modo aleatorio con filtros."""
+        response = client.get(f'/api/pokeneas?{query}')
+        
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Parámetros incompatibles'
+    
+    def test_batch_mode_unchanged(self, client):
+        """Verifica que sin filtros se mantiene el modo aleatorio."""
+        data = client.get('/api/pokeneas?count=3').get_json()
+        
+        assert data['count'] == 3
+        assert 'next_after' not in data
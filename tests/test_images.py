@@ -0,0 +1,134 @@
+"""
+Tests para /img/<key> y la caché local de objetos.
+"""
+import threading
+import pytest
+from app.storage.blob_cache import BlobCache
+from app.storage.s3 import get_s3_client
+
+
+@pytest.fixture
+def proxy_app(s3_app, s3_stub):
+    """Aplicación con IMAGE_PROXY_ENABLED apuntando al emulador S3."""
+    s3_app.config['IMAGE_PROXY_ENABLED'] = True
+    s3_stub.put('pokeneas/arepa-001.jpg', b'\xff\xd8\xff' + b'0123456789' * 100)
+    return s3_app
+
+
+class TestImageProxy:
+    """Tests para el servicio de imágenes desde disco."""
+    
+    def test_image_url_points_to_proxy(self, proxy_app):
+        """Verifica que get_image_url retorna la ruta local."""
+        with proxy_app.test_request_context():
+            assert get_s3_client().get_image_url('pokeneas/arepa-001.jpg') == '/img/pokeneas/arepa-001.jpg'
+    
+    def test_miss_then_hit(self, proxy_app, s3_stub):
+        """Verifica que solo el primer acceso descarga de S3."""
+        client = proxy_app.test_client()
+        
+        first = client.get('/img/pokeneas/arepa-001.jpg')
+        requests_after_first = s3_stub.requests
+        second = client.get('/img/pokeneas/arepa-001.jpg')
+        
+        assert first.status_code == 200
+        assert first.mimetype == 'image/jpeg'
+        assert second.data == first.data
+        assert s3_stub.requests == requests_after_first
+        assert first.headers['Cache-Control'] == 'public, max-age=86400'
+    
+    def test_range_and_etag(self, proxy_app):
+        """Verifica Range (206) y If-None-Match (304)."""
+        client = proxy_app.test_client()
+        etag = client.get('/img/pokeneas/arepa-001.jpg').headers['ETag']
+        
+        partial = client.get('/img/pokeneas/arepa-001.jpg', headers={'Range': 'bytes=3-12'})
+        not_modified = client.get('/img/pokeneas/arepa-001.jpg', headers={'If-None-Match': etag})
+        
+        assert partial.status_code == 206
+        assert partial.data == b'0123456789'
+        assert not_modified.status_code == 304
+    
+    def test_missing_object(self, proxy_app):
+        """Verifica que un objeto inexistente responde 404."""
+        response = proxy_app.test_client().get('/img/no/existe.jpg')
+        
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Imagen no encontrada'
+    
+    def test_disabled_proxy_serves_nothing(self, proxy_app, s3_stub):
+        """Verifica que sin IMAGE_PROXY_ENABLED /img responde 404 sin tocar S3."""
+        proxy_app.config['IMAGE_PROXY_ENABLED'] = False
+        requests_before = s3_stub.requests
+        
+        response = proxy_app.test_client().get('/img/pokeneas/arepa-001.jpg')
+        
+        assert response.status_code == 404
+        assert s3_stub.requests == requests_before
+    
+    def test_non_image_keys_rejected(self, proxy_app, s3_stub):
+        """Verifica que solo se sirven claves con extensión de imagen."""
+        s3_stub.put('private/secret.txt', b'top secret')
+        requests_before = s3_stub.requests
+        
+        response = proxy_app.test_client().get('/img/private/secret.txt')
+        
+        assert response.status_code == 404
+        assert b'top secret' not in response.data
+        assert s3_stub.requests == requests_before
+    
+    def test_accel_redirect(self, proxy_app):
+        """Verifica que con IMAGE_ACCEL_REDIRECT_PREFIX el envío se delega a nginx."""
+        proxy_app.config['IMAGE_ACCEL_REDIRECT_PREFIX'] = '/_blobs'
+        
+        response = proxy_app.test_client().get('/img/pokeneas/arepa-001.jpg')
+        
+        assert response.headers['X-Accel-Redirect'].startswith('/_blobs/blobs/')
+        assert response.data == b''
+    
+    def test_concurrent_misses_share_download(self, proxy_app, s3_stub):
+        """Verifica el single-flight: varias peticiones, una sola descarga."""
+        s3_stub.delay = 0.2
+        with proxy_app.app_context():
+            get_s3_client().client  # crear el cliente fuera de la medición
+        requests_before = s3_stub.requests
+        statuses = []
+        
+        def fetch():
+            statuses.append(proxy_app.test_client().get('/img/pokeneas/arepa-001.jpg').status_code)
+        
+        threads = [threading.Thread(target=fetch) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert statuses == [200] * 5
+        assert s3_stub.requests - requests_before == 1
+
+
+class TestBlobCache:
+    """Tests para el presupuesto y la deduplicación de la caché."""
+    
+    def test_evicts_over_budget(self, proxy_app, s3_stub, tmp_path):
+        """Verifica que superar max_bytes desaloja los blobs más antiguos."""
+        for name in 'abc':
+            s3_stub.put(f'{name}.jpg', name.encode() * 1000)
+        with proxy_app.app_context():
+            cache = BlobCache(get_s3_client(), str(tmp_path / 'small'), max_bytes=2500)
+            first = cache.get('a.jpg')
+            cache.get('b.jpg')
+            cache.get('c.jpg')
+            
+            assert cache.lookup('a.jpg') is None
+            assert cache.lookup('c.jpg') is not None
+            assert cache.stats()['bytes'] <= 2500
+            assert first.size == 1000
+    
+    def test_same_content_shares_blob(self, proxy_app, s3_stub, tmp_path):
+        """Verifica que dos claves con el mismo contenido comparten blob."""
+        s3_stub.put('copia.jpg', s3_stub.objects['pokeneas/arepa-001.jpg']['body'])
+        with proxy_app.app_context():
+            cache = BlobCache(get_s3_client(), str(tmp_path / 'dedup'), max_bytes=10 ** 6)
+            
+            assert cache.get('copia.jpg').path == cache.get('pokeneas/arepa-001.jpg').path
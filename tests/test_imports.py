@@ -0,0 +1,89 @@
+"""
+Tests del coste de importación de la aplicación.
+
+Se mide `create_app` en un proceso nuevo con `python -X importtime`,
+que escribe en stderr una línea por módulo importado con su tiempo
+propio en microsegundos.
+"""
+import os
+import re
+import subprocess
+import sys
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Presupuesto de arranque sin S3 (incluye los módulos del propio intérprete)
+MODULE_BUDGET = 420
+IMPORT_TIME_BUDGET_MS = 1000
+
+# Dependencias que solo se cargan en el primer uso
+LAZY_MODULES = ('boto3', 'botocore', 'PIL', 'sqlite3')
+
+IMPORT_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)$')
+
+
+def measure_create_app(**env) -> dict:
+    """
+    Ejecuta create_app en un subproceso con -X importtime.
+    
+    Args:
+        **env: Variables de entorno adicionales
+    
+    Returns:
+        Diccionario con modules (nombres importados) y time_ms (suma de los
+        tiempos propios)
+    """
+    code = "from app import create_app; create_app('development')"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT_DIR,
+        env=dict(os.environ, PYTHONPATH=ROOT_DIR, **env),
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    
+    modules = []
+    self_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE_RE.match(line)
+        if match:
+            self_us += int(match.group(1))
+            modules.append(match.group(2))
+    return {"modules": modules, "time_ms": self_us / 1e3}
+
+
+@pytest.fixture(scope='module')
+def without_bucket():
+    """Medición del arranque con S3_BUCKET vacío."""
+    return measure_create_app(S3_BUCKET='', CATALOG_VERIFY_ON_STARTUP='off')
+
+
+class TestImportBudget:
+    """Tests del presupuesto de importación de create_app."""
+    
+    def test_no_boto3_without_bucket(self, without_bucket):
+        """Verifica que sin S3_BUCKET no se importan boto3 ni las otras dependencias diferidas."""
+        imported = {name.split('.')[0] for name in without_bucket["modules"]}
+        
+        assert imported.isdisjoint(LAZY_MODULES)
+    
+    def test_module_count_budget(self, without_bucket):
+        """Verifica que create_app no supera el número de módulos presupuestado."""
+        assert len(without_bucket["modules"]) <= MODULE_BUDGET
+    
+    def test_import_time_budget(self, without_bucket):
+        """Verifica que create_app no supera el tiempo de importación presupuestado."""
+        assert without_bucket["time_ms"] <= IMPORT_TIME_BUDGET_MS
+    
+    def test_boto3_loaded_on_first_use(self, app):
+        """Verifica que el cliente boto3 se crea (e importa) al pedirlo."""
+        with app.app_context():
+            from app.storage.s3 import S3Client
+            
+            s3_client = S3Client()
+            
+            assert s3_client._client is None
+            assert s3_client.client.meta.service_model.service_name == 's3'
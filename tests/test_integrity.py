@@ -0,0 +1,82 @@
+"""
+Tests para `flask pokeneas verify` y la verificación al arrancar.
+"""
+import json
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.data.pokeneas import POKENEAS_DATA
+from app.data.sources import write_catalog
+from app.services.integrity import common_prefix, verify_catalog
+from app.storage.s3 import get_s3_client
+
+
+@pytest.fixture
+def verify_app(s3_app, s3_stub):
+    """Aplicación apuntando a un bucket con todo el catálogo menos una imagen."""
+    for pokenea in POKENEAS_DATA[1:]:
+        s3_stub.put(pokenea['imagen'], b'jpg')
+    s3_stub.put(common_prefix([p['imagen'] for p in POKENEAS_DATA]) + 'huerfana.jpg', b'jpg')
+    return s3_app
+
+
+class TestVerifyCatalog:
+    """Tests para las estrategias de verificación."""
+    
+    @pytest.mark.parametrize('strategy', ['list', 'head'])
+    def test_detects_missing(self, verify_app, strategy):
+        """Verifica que ambas estrategias encuentran la imagen faltante."""
+        keys = [p['imagen'] for p in POKENEAS_DATA]
+        with verify_app.app_context():
+            report = verify_catalog(keys, get_s3_client(), strategy=strategy, max_workers=4)
+        
+        assert report['missing'] == [POKENEAS_DATA[0]['imagen']]
+        assert report['checked'] == len(set(keys))
+        assert report['ok'] is False
+    
+    def test_listing_reports_orphans(self, verify_app):
+        """Verifica que el listado reporta los objetos que no usa el catálogo."""
+        keys = [p['imagen'] for p in POKENEAS_DATA]
+        with verify_app.app_context():
+            report = verify_catalog(keys, get_s3_client(), strategy='list')
+        
+        assert [key.rsplit('/', 1)[-1] for key in report['orphaned']] == ['huerfana.jpg']
+    
+    def test_common_prefix(self):
+        """Verifica que el prefijo se corta en el último directorio compartido."""
+        assert common_prefix(['img/a/1.jpg', 'img/a/2.jpg', 'img/b.jpg']) == 'img/'
+        assert common_prefix(['a.jpg', 'b.jpg']) == ''
+
+
+class TestVerifyCommand:
+    """Tests para el comando CLI."""
+    
+    def test_json_report_and_exit_code(self, verify_app, tmp_path):
+        """Verifica el reporte JSON y el código de salida ante faltantes."""
+        output = tmp_path / 'report.json'
+        
+        result = verify_app.test_cli_runner().invoke(
+            args=['pokeneas', 'verify', '--strategy', 'head', '--output', str(output)]
+        )
+        
+        report = json.loads(output.read_text())
+        assert result.exit_code == 1
+        assert report['strategy'] == 'head'
+        assert report['missing'] == [POKENEAS_DATA[0]['imagen']]
+    
+    def test_startup_strict_fails(self, s3_stub):
+        """Verifica que CATALOG_VERIFY_ON_STARTUP=strict impide arrancar con faltantes."""
+        with patch.multiple(TestingConfig, CATALOG_VERIFY_ON_STARTUP='strict', **s3_stub.app_config):
+            with pytest.raises(RuntimeError):
+                create_app('testing')
+    
+    def test_startup_check_starts_no_threads(self, s3_stub, tmp_path):
+        """Verifica que la verificación al arrancar no arranca el hilo de recarga en el master."""
+        path = str(tmp_path / 'catalogo.json')
+        write_catalog(path, POKENEAS_DATA)
+        with patch.multiple(TestingConfig, CATALOG_VERIFY_ON_STARTUP='warn',
+                            CATALOG_SOURCE=path, CATALOG_RELOAD_INTERVAL=60, **s3_stub.app_config):
+            app = create_app('testing')
+        
+        assert app.extensions['catalog_store']._thread is None
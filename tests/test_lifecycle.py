@@ -0,0 +1,49 @@
+"""
+Tests para el arranque con la aplicación precargada.
+"""
+from unittest.mock import patch
+from app import create_app
+from app.config import TestingConfig
+from app.data.pokeneas import POKENEAS_DATA
+from app.data.sources import write_catalog
+from app.lifecycle import after_fork, warm_up
+
+
+class TestLifecycle:
+    """Tests para warm_up y after_fork."""
+    
+    def test_warm_up_precomputes_shared_state(self, app):
+        """Verifica que se compilan las plantillas y se construyen las tablas alias."""
+        stats = warm_up(app)
+        catalog = app.extensions['catalog_store'].catalog
+        
+        assert stats['pokeneas'] == len(POKENEAS_DATA)
+        assert stats['templates'] >= 3
+        assert 'rareza' in catalog.samplers
+        assert len(app.jinja_env.cache) >= stats['templates']
+    
+    def test_warm_up_starts_no_threads(self, tmp_path):
+        """Verifica que el master no arranca el hilo de recarga."""
+        path = str(tmp_path / 'catalogo.json')
+        write_catalog(path, POKENEAS_DATA)
+        with patch.multiple(TestingConfig, CATALOG_SOURCE=path, CATALOG_RELOAD_INTERVAL=60):
+            app = create_app('testing')
+        store = app.extensions['catalog_store']
+        
+        warm_up(app)
+        assert store._thread is None
+        
+        after_fork(app)
+        assert store._thread.is_alive()
+        store.stop()
+    
+    def test_after_fork_resets_s3_client(self, app):
+        """Verifica que el worker no reutiliza el cliente boto3 del master."""
+        with app.app_context():
+            from app.storage.s3 import get_s3_client
+            s3_client = get_s3_client()
+            s3_client._client = object()
+        
+        after_fork(app)
+        
+        assert s3_client._client is None
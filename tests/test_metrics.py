@@ -0,0 +1,89 @@
+"""
+Tests para el endpoint /metrics.
+"""
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+from prometheus_client import REGISTRY
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def sample(name, **labels):
+    """Valor actual de una métrica del registro por defecto."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsEndpoint:
+    """Tests para /metrics"""
+    
+    def test_metrics_returns_prometheus_text(self, client):
+        """Verifica que /metrics usa el formato de texto de Prometheus."""
+        response = client.get('/metrics')
+        
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        assert b'pokeneas_request_duration_seconds' in response.data
+    
+    def test_requests_are_counted_per_route(self, client):
+        """Verifica que cada petición se cuenta con su ruta y estado."""
+        labels = {'route': '/api/pokenea', 'method': 'GET', 'status': '200'}
+        before = sample('pokeneas_requests_total', **labels)
+        
+        client.get('/api/pokenea')
+        client.get('/api/pokenea')
+        
+        assert sample('pokeneas_requests_total', **labels) == before + 2
+        assert sample('pokeneas_request_duration_seconds_count',
+                      route='/api/pokenea', method='GET') >= 2
+    
+    @patch('boto3.client')
+    def test_presign_operations_and_cache_hits(self, mock_boto_client, app):
+        """Verifica que se miden las firmas y los aciertos de la caché de URLs."""
+        mock_s3 = MagicMock()
+        mock_s3.generate_presigned_url.return_value = 'https://presigned.example.com'
+        mock_boto_client.return_value = mock_s3
+        
+        presign_before = sample('pokeneas_s3_operations_total', operation='presign', outcome='success')
+        hits_before = sample('pokeneas_cache_lookups_total', cache='presigned_url', result='hit')
+        
+        with app.app_context():
+            from app.storage.s3 import S3Client
+            
+            s3_client = S3Client()
+            s3_client.get_presigned_url('pokeneas/test.jpg')
+            s3_client.get_presigned_url('pokeneas/test.jpg')
+        
+        assert sample('pokeneas_s3_operations_total', operation='presign', outcome='success') == presign_before + 1
+        assert sample('pokeneas_cache_lookups_total', cache='presigned_url', result='hit') == hits_before + 1
+
+
+class TestMultiprocessMetrics:
+    """Tests para la agregación de métricas entre workers."""
+    
+    def test_metrics_add_up_across_processes(self, tmp_path):
+        """Verifica que /metrics suma las peticiones de todos los procesos."""
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), PYTHONPATH=ROOT_DIR)
+        worker = (
+            "from app import create_app\n"
+            "client = create_app('testing').test_client()\n"
+            "for _ in range(3): client.get('/health')\n"
+        )
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', worker], env=env, cwd=ROOT_DIR, check=True)
+        
+        scrape = (
+            "from app import create_app\n"
+            "print(create_app('testing').test_client().get('/metrics').data.decode())\n"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', scrape], env=env, cwd=ROOT_DIR,
+            check=True, capture_output=True, text=True
+        ).stdout
+        
+        line = next(
+            line for line in output.splitlines()
+            if line.startswith('pokeneas_requests_total{') and 'route="/health"' in line
+        )
+        assert float(line.rsplit(' ', 1)[1]) == 6.0
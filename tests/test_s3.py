@@ -9,7 +9,7 @@ from botocore.exceptions import ClientError, NoCredentialsError
 class TestS3Client:
     """Tests para el cliente S3."""
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_public_url_with_bucket_and_region(self, mock_boto_client, app):
         """Verifica que se construye correctamente la URL pública."""
         with app.app_context():
@@ -26,7 +26,7 @@ class TestS3Client:
             expected_url = 'https://test-bucket.s3.us-east-1.amazonaws.com/pokeneas/test.jpg'
             assert url == expected_url
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_public_url_with_custom_base(self, mock_boto_client, app):
         """Verifica que se usa la URL base personalizada si está configurada."""
         with app.app_context():
@@ -42,7 +42,7 @@ class TestS3Client:
             expected_url = 'https://cdn.example.com/pokeneas/test.jpg'
             assert url == expected_url
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_presigned_url_success(self, mock_boto_client, app):
         """Verifica que se genera correctamente una URL presignada."""
         with app.app_context():
@@ -62,7 +62,7 @@ class TestS3Client:
             assert url == 'https://presigned-url.example.com'
             mock_s3.generate_presigned_url.assert_called_once()
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_presigned_url_no_credentials(self, mock_boto_client, app):
         """Verifica manejo de error cuando no hay credenciales."""
         with app.app_context():
@@ -81,7 +81,7 @@ class TestS3Client:
             
             assert url is None
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_presigned_url_client_error(self, mock_boto_client, app):
         """Verifica manejo de ClientError."""
         with app.app_context():
@@ -101,7 +101,7 @@ class TestS3Client:
             
             assert url is None
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_image_url_public_mode(self, mock_boto_client, app):
         """Verifica que get_image_url usa modo público cuando está configurado."""
         with app.app_context():
@@ -118,7 +118,7 @@ class TestS3Client:
             assert url is not None
             assert 'test-bucket.s3.us-west-2.amazonaws.com' in url
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_image_url_presigned_mode(self, mock_boto_client, app):
         """Verifica que get_image_url usa modo presignado cuando está configurado."""
         with app.app_context():
@@ -137,7 +137,7 @@ class TestS3Client:
             
             assert url == 'https://presigned.example.com'
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_get_image_url_no_bucket_configured(self, mock_boto_client, app):
         """Verifica que retorna None cuando no hay bucket configurado."""
         with app.app_context():
@@ -151,10 +151,188 @@ class TestS3Client:
             assert url is None
 
 
+class TestSharedS3Client:
+    """Tests para el cliente S3 compartido por proceso."""
+    
+    def test_get_s3_client_returns_same_instance(self, app):
+        """Verifica que get_s3_client reutiliza la misma instancia."""
+        with app.app_context():
+            from app.storage.s3 import get_s3_client
+            
+            assert get_s3_client() is get_s3_client()
+    
+    @patch('boto3.client')
+    def test_boto3_client_created_once(self, mock_boto_client, app):
+        """Verifica que el cliente boto3 se crea una sola vez."""
+        with app.app_context():
+            from app.storage.s3 import get_s3_client
+            
+            s3_client = get_s3_client()
+            first = s3_client.client
+            second = get_s3_client().client
+            
+            assert first is second
+            mock_boto_client.assert_called_once()
+    
+    @patch('boto3.client')
+    def test_boto3_client_uses_pool_config(self, mock_boto_client, app):
+        """Verifica que el pool y los timeouts se toman de la configuración."""
+        with app.app_context():
+            app.config['S3_MAX_POOL_CONNECTIONS'] = 25
+            app.config['S3_CONNECT_TIMEOUT'] = 1.5
+            
+            from app.storage.s3 import S3Client
+            
+            S3Client().client
+            
+            boto_config = mock_boto_client.call_args.kwargs['config']
+            assert boto_config.max_pool_connections == 25
+            assert boto_config.connect_timeout == 1.5
+    
+    @patch('boto3.client')
+    def test_reset_s3_client_recreates_boto3_client(self, mock_boto_client, app):
+        """Verifica que reset_s3_client descarta el cliente boto3 heredado."""
+        with app.app_context():
+            from app.storage.s3 import get_s3_client, reset_s3_client
+            
+            get_s3_client().client
+            reset_s3_client()
+            get_s3_client().client
+            
+            assert mock_boto_client.call_count == 2
+
+
+class TestPresignedUrlCache:
+    """Tests para la caché de URLs presignadas."""
+    
+    @patch('boto3.client')
+    def test_presigned_url_is_cached(self, mock_boto_client, app):
+        """Verifica que una segunda petición no vuelve a firmar."""
+        with app.app_context():
+            app.config['USE_S3_PRESIGNED'] = True
+            
+            mock_s3 = MagicMock()
+            mock_s3.generate_presigned_url.return_value = 'https://presigned.example.com'
+            mock_boto_client.return_value = mock_s3
+            
+            from app.storage.s3 import S3Client
+            
+            s3_client = S3Client()
+            first = s3_client.get_presigned_url('pokeneas/test.jpg')
+            second = s3_client.get_presigned_url('pokeneas/test.jpg')
+            
+            assert first == second
+            mock_s3.generate_presigned_url.assert_called_once()
+            stats = s3_client.presigned_cache.stats()
+            assert stats['hits'] == 1
+            assert stats['misses'] == 1
+    
+    @patch('boto3.client')
+    def test_failed_presign_is_not_cached(self, mock_boto_client, app):
+        """Verifica que los errores de firma no se guardan en caché."""
+        with app.app_context():
+            mock_s3 = MagicMock()
+            mock_s3.generate_presigned_url.side_effect = [
+                NoCredentialsError(), 'https://presigned.example.com'
+            ]
+            mock_boto_client.return_value = mock_s3
+            
+            from app.storage.s3 import S3Client
+            
+            s3_client = S3Client()
+            assert s3_client.get_presigned_url('pokeneas/test.jpg') is None
+            assert s3_client.get_presigned_url('pokeneas/test.jpg') == 'https://presigned.example.com'
+    
+    def test_entry_expires_before_signature(self):
+        """Verifica que la entrada deja de servirse antes del margen de seguridad."""
+        from app.storage.presigned_cache import PresignedUrlCache
+        
+        cache = PresignedUrlCache(max_size=10, safety_margin=300)
+        key = ('bucket', 'a.jpg', 3600)
+        with patch('app.storage.presigned_cache.time.monotonic', return_value=1000.0):
+            cache.set(key, 'https://a', 3600)
+        with patch('app.storage.presigned_cache.time.monotonic', return_value=1000.0 + 3299):
+            assert cache.get(key) == 'https://a'
+        with patch('app.storage.presigned_cache.time.monotonic', return_value=1000.0 + 3300):
+            assert cache.get(key) is None
+    
+    def test_lru_eviction(self):
+        """Verifica que se desaloja la entrada menos usada."""
+        from app.storage.presigned_cache import PresignedUrlCache
+        
+        cache = PresignedUrlCache(max_size=2, safety_margin=0)
+        cache.set('a', 'https://a', 60)
+        cache.set('b', 'https://b', 60)
+        cache.get('a')
+        cache.set('c', 'https://c', 60)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == 'https://a'
+        assert cache.stats()['evictions'] == 1
+
+
+class TestBucketIndex:
+    """Tests para el índice en memoria del bucket."""
+    
+    def _make_index(self, keys):
+        from app.storage.bucket_index import BucketIndex
+        
+        mock_s3 = MagicMock()
+        mock_s3.iter_object_pages.return_value = [
+            [{'Key': key, 'Size': 1, 'ETag': '"abc"'} for key in keys]
+        ]
+        return BucketIndex(mock_s3, refresh_interval=60)
+    
+    def test_refresh_publishes_sorted_snapshot(self):
+        """Verifica que el refresco publica una foto ordenada por clave."""
+        index = self._make_index(['b.jpg', 'a.jpg'])
+        snapshot = index.refresh()
+        
+        assert index.snapshot is snapshot
+        assert snapshot.keys == ('a.jpg', 'b.jpg')
+        assert snapshot.objects[0].etag == 'abc'
+    
+    def test_unchanged_bucket_keeps_version(self):
+        """Verifica que el ETag no cambia si el bucket no cambió."""
+        index = self._make_index(['a.jpg'])
+        first = index.refresh()
+        index.s3_client.iter_object_pages.return_value = [[{'Key': 'a.jpg', 'Size': 1, 'ETag': '"abc"'}]]
+        second = index.refresh()
+        
+        assert first is second
+    
+    def test_snapshot_page_with_prefix(self):
+        """Verifica la paginación por prefijo sobre la foto."""
+        from app.storage.bucket_index import BucketObject, BucketSnapshot
+        
+        keys = ['a/1.jpg', 'b/1.jpg', 'b/2.jpg', 'b/3.jpg', 'c/1.jpg']
+        snapshot = BucketSnapshot(tuple(BucketObject(k, 1, '', 0.0) for k in keys))
+        
+        objects, last_key = snapshot.page(prefix='b/', page_size=2)
+        assert [obj.key for obj in objects] == ['b/1.jpg', 'b/2.jpg']
+        assert last_key == 'b/2.jpg'
+        
+        objects, last_key = snapshot.page(prefix='b/', page_size=2, start_after=last_key)
+        assert [obj.key for obj in objects] == ['b/3.jpg']
+        assert last_key is None
+    
+    def test_refresh_error_keeps_last_snapshot(self):
+        """Verifica que un error de S3 no descarta la foto anterior."""
+        index = self._make_index(['a.jpg'])
+        snapshot = index.refresh()
+        index.s3_client.iter_object_pages.side_effect = Exception('S3 caído')
+        
+        with patch.object(index._stop, 'wait', side_effect=lambda timeout: index._stop.set()):
+            index._run()
+        
+        assert index.snapshot is snapshot
+        assert index.last_error == 'S3 caído'
+
+
 class TestS3Service:
     """Tests de integración para el servicio de Pokeneas con S3."""
     
-    @patch('app.storage.s3.boto3.client')
+    @patch('boto3.client')
     def test_pokeneas_service_resolves_image_url(self, mock_boto_client, app):
         """Verifica que el servicio de Pokeneas resuelve URLs de imágenes."""
         with app.app_context():
@@ -0,0 +1,111 @@
+"""
+Tests para la selección aleatoria ponderada por rareza.
+"""
+import json
+import random
+from collections import Counter
+import pytest
+from app.services.pokeneas_service import PokeneasService
+from app.services.sampling import AliasTable, UnknownProfileError
+
+
+class TestAliasTable:
+    """Tests para la tabla alias de Vose."""
+    
+    def test_distribution_matches_weights(self):
+        """Verifica que las frecuencias siguen los pesos."""
+        table = AliasTable([1, 2, 7])
+        counts = Counter(table.draw_many(100000, random.Random(1)))
+        
+        assert counts[0] / 100000 == pytest.approx(0.1, abs=0.01)
+        assert counts[1] / 100000 == pytest.approx(0.2, abs=0.01)
+        assert counts[2] / 100000 == pytest.approx(0.7, abs=0.01)
+    
+    def test_zero_weight_never_drawn(self):
+        """Verifica que un índice con peso 0 nunca sale."""
+        table = AliasTable([0, 1, 1])
+        
+        assert 0 not in table.draw_many(10000, random.Random(2))
+    
+    def test_seeded_draws_are_reproducible(self):
+        """Verifica que la misma semilla produce la misma secuencia."""
+        table = AliasTable([5, 3, 1, 1])
+        
+        assert table.draw_many(50, random.Random('x')) == table.draw_many(50, random.Random('x'))
+    
+    @pytest.mark.parametrize('weights', [[], [0, 0], [1, -1]])
+    def test_invalid_weights(self, weights):
+        """Verifica que se rechazan pesos vacíos, nulos o negativos."""
+        with pytest.raises(ValueError):
+            AliasTable(weights)
+
+
+class TestWeightedSelection:
+    """Tests para los perfiles de rareza en el servicio y la API."""
+    
+    def test_table_built_once_per_catalog(self, app):
+        """Verifica que la tabla de un perfil se construye una vez por catálogo."""
+        catalog = app.extensions['catalog_store'].catalog
+        service = PokeneasService(catalog, profiles=app.config['RARITY_PROFILES'])
+        
+        service.get_random_pokenea('rareza')
+        table = catalog.samplers['rareza']
+        service.get_random_pokenea('rareza')
+        
+        assert catalog.samplers['rareza'] is table
+    
+    def test_profile_weights_by_rarity(self, app):
+        """Verifica que solo salen las rarezas con peso en el perfil."""
+        catalog = app.extensions['catalog_store'].catalog
+        service = PokeneasService(catalog, profiles={'legendarios': {'legendario': 1}})
+        
+        drawn = {service.get_random_pokenea('legendarios').rareza for _ in range(50)}
+        
+        assert drawn == {'legendario'}
+    
+    def test_seeded_service_is_reproducible(self, app):
+        """Verifica que un generador con semilla repite la secuencia."""
+        catalog = app.extensions['catalog_store'].catalog
+        profiles = app.config['RARITY_PROFILES']
+        first = PokeneasService(catalog, profiles=profiles, rng=random.Random(7))
+        second = PokeneasService(catalog, profiles=profiles, rng=random.Random(7))
+        
+        assert [first.get_random_pokenea('rareza').id for _ in range(20)] == \
+            [second.get_random_pokenea('rareza').id for _ in range(20)]
+    
+    def test_api_with_profile(self, client):
+        """Verifica que /api/pokenea acepta un perfil configurado."""
+        response = client.get('/api/pokenea?profile=rareza')
+        
+        assert response.status_code == 200
+        assert 'nombre' in response.get_json()
+    
+    def test_unknown_profile(self, client):
+        """Verifica el 400 para un perfil no configurado."""
+        response = client.get('/api/pokenea?profile=nada')
+        
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Perfil desconocido'
+        assert client.get('/pokenea?profile=nada').status_code == 400
+    
+    def test_batch_with_profile_is_reproducible(self, client):
+        """Verifica que el lote ponderado con semilla es determinista."""
+        url = '/api/pokeneas?count=20&profile=rareza&seed=abc'
+        first = json.loads(client.get(url).data)
+        second = json.loads(client.get(url).data)
+        
+        assert first['count'] == 20
+        assert first == second
+    
+    def test_batch_weighted_without_replacement(self, client):
+        """Verifica que un perfil ponderado sin repetición es un 400."""
+        response = client.get('/api/pokeneas?count=2&profile=rareza&replace=false')
+        
+        assert response.status_code == 400
+    
+    def test_resolve_profile_unknown(self, app):
+        """Verifica que resolve_profile lanza UnknownProfileError."""
+        service = PokeneasService(app.extensions['catalog_store'].catalog)
+        
+        with pytest.raises(UnknownProfileError):
+            service.resolve_profile('rareza')
@@ -0,0 +1,130 @@
+"""
+Tests para la búsqueda de texto sobre nombre y frase filosófica.
+"""
+import heapq
+import json
+import random
+import pytest
+from app.data.catalog import PokeneaRecord, build_catalog
+from app.data.pokeneas import POKENEAS_DATA
+from app.data.search import RANKED_MIN_POSTING, SearchIndex, tokenize
+
+WORDS = ['arepa', 'queso', 'cafe', 'montaña', 'rio', 'sol', 'abuela', 'fiesta']
+
+
+def make_records(count, seed=0):
+    """Registros sintéticos con frases de palabras repetidas."""
+    rng = random.Random(seed)
+    return [
+        PokeneaRecord(
+            id=pokenea_id,
+            nombre=f"Pokenea {pokenea_id}",
+            altura="1m",
+            habilidad="Ninguna",
+            imagen=f"pokeneas/{pokenea_id}.jpg",
+            frase_filosofica=" ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+        )
+        for pokenea_id in range(1, count + 1)
+    ]
+
+
+def brute_force(index, query, limit):
+    """Top-k puntuando todas las listas completas."""
+    scores = {}
+    for term in set(tokenize(query)):
+        if term not in index.postings:
+            continue
+        weight = index._weight(term)
+        for doc_id, frequency in index.postings[term].items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + index._impact(weight, frequency, doc_id)
+    best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+    return [(doc_id, round(score, 4)) for doc_id, score in best]
+
+
+class TestSearchIndex:
+    """Tests para SearchIndex."""
+    
+    def test_tokenize_folds_accents_and_drops_stopwords(self):
+        """Verifica la normalización de términos en español."""
+        assert tokenize('Los Fríjoles de la MONTAÑA') == ['frijoles', 'montana']
+    
+    def test_name_ranks_above_phrase(self):
+        """Verifica que una coincidencia en el nombre pesa más que en la frase."""
+        records = [
+            PokeneaRecord(1, 'Sol', '1m', 'x', 'a.jpg', 'El cielo azul'),
+            PokeneaRecord(2, 'Luna', '1m', 'x', 'b.jpg', 'Sin sol no hay sombra'),
+            PokeneaRecord(3, 'Rio', '1m', 'x', 'c.jpg', 'Agua que corre'),
+        ]
+        
+        assert [doc_id for doc_id, _ in SearchIndex(records).search('sol')] == [1, 2]
+    
+    @pytest.mark.parametrize('query', ['arepa', 'arepa queso', 'cafe montaña sol', 'abuela fiesta rio'])
+    def test_threshold_matches_brute_force(self, query):
+        """Verifica que el top-k con umbral es igual al de puntuar todo."""
+        index = SearchIndex(make_records(RANKED_MIN_POSTING * 20))
+        
+        assert index.search(query, 10) == brute_force(index, query, 10)
+    
+    def test_incremental_equals_full_build(self):
+        """Verifica que la reconstrucción incremental equivale a una completa."""
+        records = make_records(300)
+        previous = SearchIndex(records)
+        updated = records[:250] + [
+            PokeneaRecord(**{**record.to_dict(), 'frase_filosofica': 'queso nuevo'})
+            for record in records[250:280]
+        ] + make_records(320)[300:]
+        
+        incremental = SearchIndex(updated, previous, {record.id: record for record in records})
+        full = SearchIndex(updated)
+        
+        assert incremental.postings == full.postings
+        assert incremental.lengths == full.lengths
+        assert incremental.search('queso nuevo', 20) == full.search('queso nuevo', 20)
+        # El índice anterior no cambia
+        assert previous.search('nuevo') == []
+    
+    def test_reload_reuses_unchanged_postings(self, app):
+        """Verifica que una recarga solo copia las listas de los términos afectados."""
+        catalog = app.extensions['catalog_store'].catalog
+        data = [dict(item) for item in POKENEAS_DATA]
+        data[0]['frase_filosofica'] = 'Arepa con quesito'
+        
+        updated = build_catalog(data, catalog.container_id, json.dumps, catalog)
+        
+        assert updated.search.search('quesito')[0][0] == 1
+        assert catalog.search.search('quesito') == []
+        # 'bandeja' solo aparece en un Pokenea que no cambió
+        assert updated.search.postings['bandeja'] is catalog.search.postings['bandeja']
+        assert updated.search.postings['vida'] is not catalog.search.postings['vida']
+
+
+class TestSearchApi:
+    """Tests para /api/pokeneas/search."""
+    
+    def test_search_by_accented_word(self, client):
+        """Verifica que la búsqueda ignora tildes."""
+        data = client.get('/api/pokeneas/search?q=frijoles').get_json()
+        
+        assert data['count'] == 1
+        assert data['pokeneas'][0]['nombre'] == 'Fríjoles'
+    
+    def test_limit(self, client):
+        """Verifica que limit recorta los resultados."""
+        data = client.get('/api/pokeneas/search?q=vida&limit=2').get_json()
+        
+        assert data['count'] == 2
+    
+    def test_missing_query(self, client):
+        """Verifica el 400 sin q."""
+        response = client.get('/api/pokeneas/search')
+        
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Parámetro q requerido'
+    
+    @pytest.mark.parametrize('limit', ['abc', '', '2.5', '0'])
+    def test_invalid_limit(self, client, limit):
+        """Verifica el 400 con un limit que no es un entero válido."""
+        response = client.get(f'/api/pokeneas/search?q=vida&limit={limit}')
+        
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Parámetro limit inválido'
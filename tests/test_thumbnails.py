@@ -0,0 +1,165 @@
+"""
+Tests para las miniaturas.
+"""
+import io
+import os
+import time
+import pytest
+from app.services.thumbnails import ThumbnailCache, get_thumbnail_service, resize_variants
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def make_jpeg(width: int = 800, height: int = 600) -> bytes:
+    """Genera un JPEG de prueba."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class TestThumbnailEndpoint:
+    """Tests para /thumb/<size>/<key>"""
+    
+    def test_resizes_and_caches(self, s3_app, s3_stub):
+        """Verifica que la miniatura se genera una vez y luego sale del disco."""
+        s3_stub.put('pokeneas/arepa-001.jpg', make_jpeg())
+        client = s3_app.test_client()
+        
+        first = client.get('/thumb/320/pokeneas/arepa-001.jpg')
+        requests_after_first = s3_stub.requests
+        second = client.get('/thumb/160/pokeneas/arepa-001.jpg')
+        
+        assert first.status_code == 200
+        assert first.mimetype == 'image/jpeg'
+        assert Image.open(io.BytesIO(first.data)).size == (320, 240)
+        assert Image.open(io.BytesIO(second.data)).size == (160, 120)
+        assert s3_stub.requests == requests_after_first
+        assert first.headers['Cache-Control'] == 'public, max-age=86400'
+    
+    def test_unknown_size(self, s3_app):
+        """Verifica que un tamaño no configurado responde 404."""
+        response = s3_app.test_client().get('/thumb/123/pokeneas/arepa-001.jpg')
+        
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Tamaño no soportado'
+    
+    def test_missing_original(self, s3_app):
+        """Verifica que un objeto inexistente responde 404."""
+        response = s3_app.test_client().get('/thumb/160/no/existe.jpg')
+        
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Imagen no encontrada'
+    
+    def test_not_an_image(self, s3_app, s3_stub):
+        """Verifica que un original que no es imagen responde 415."""
+        s3_stub.put('roto.jpg', b'no es un jpeg')
+        
+        response = s3_app.test_client().get('/thumb/160/roto.jpg')
+        
+        assert response.status_code == 415
+    
+    def test_non_image_key_rejected_without_download(self, s3_app, s3_stub):
+        """Verifica que una clave sin extensión de imagen responde 415 sin tocar S3."""
+        s3_stub.put('private/secret.txt', b'top secret')
+        requests_before = s3_stub.requests
+        
+        response = s3_app.test_client().get('/thumb/160/private/secret.txt')
+        
+        assert response.status_code == 415
+        assert s3_stub.requests == requests_before
+    
+    @pytest.mark.parametrize('s3_app', [{'THUMBNAIL_MAX_SOURCE_BYTES': 1000}], indirect=True)
+    def test_oversized_original_rejected(self, s3_app, s3_stub):
+        """Verifica que un original mayor que THUMBNAIL_MAX_SOURCE_BYTES responde 415."""
+        s3_stub.put('pokeneas/enorme.jpg', make_jpeg(1600, 1200))
+        
+        response = s3_app.test_client().get('/thumb/160/pokeneas/enorme.jpg')
+        
+        assert response.status_code == 415
+        assert 'máximo 1000' in response.get_json()['message']
+    
+    def test_failures_are_remembered(self, s3_app, s3_stub):
+        """Verifica que los 404 y 415 se recuerdan y no vuelven a descargar el original."""
+        s3_stub.put('roto.jpg', b'no es un jpeg')
+        client = s3_app.test_client()
+        client.get('/thumb/160/roto.jpg')
+        client.get('/thumb/160/no/existe.jpg')
+        requests_before = s3_stub.requests
+        
+        broken = client.get('/thumb/320/roto.jpg')
+        missing = client.get('/thumb/320/no/existe.jpg')
+        
+        assert broken.status_code == 415
+        assert missing.status_code == 404
+        assert s3_stub.requests == requests_before
+    
+    def test_view_emits_srcset(self, client):
+        """Verifica que /pokenea/<id> ofrece las miniaturas con srcset."""
+        html = client.get('/pokenea/1').data.decode('utf-8')
+        
+        assert 'srcset="/thumb/160/' in html
+        assert ' 640w"' in html
+    
+    def test_cli_generates_catalog(self, s3_app, s3_stub):
+        """Verifica que `flask thumbnails generate` pregenera el catálogo."""
+        from app.data.pokeneas import POKENEAS_DATA
+        for pokenea in POKENEAS_DATA[:2]:
+            s3_stub.put(pokenea['imagen'], make_jpeg(400, 400))
+        
+        result = s3_app.test_cli_runner().invoke(args=['thumbnails', 'generate', '--workers', '2'])
+        
+        assert '2 generadas' in result.output
+        assert f"{len(POKENEAS_DATA) - 2} sin original" in result.output
+    
+    def test_generate_all_bounds_pending_work(self, s3_app, s3_stub):
+        """Verifica que generate_all no lee más claves de las que caben en vuelo y escribe al terminar cada una."""
+        keys = [f"pokeneas/{index:03d}.jpg" for index in range(8)]
+        for key in keys:
+            s3_stub.put(key, make_jpeg(200, 200))
+        written_before = []
+        
+        with s3_app.app_context():
+            service = get_thumbnail_service()
+            
+            def key_source():
+                for index, key in enumerate(keys):
+                    written_before.append(sum(
+                        os.path.exists(service.cache.path_for(160, previous)) for previous in keys[:index]
+                    ))
+                    yield key
+            
+            report = service.generate_all(key_source(), workers=1, max_pending=2)
+        
+        assert report["generated"] == 8
+        # Con 2 en vuelo, al pedir la clave i ya se escribieron al menos i - 2
+        assert all(written >= index - 2 for index, written in enumerate(written_before))
+
+
+class TestThumbnailCache:
+    """Tests para la caché en disco."""
+    
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Verifica que al superar el presupuesto se borran las más antiguas."""
+        cache = ThumbnailCache(str(tmp_path), max_bytes=2500)
+        cache.put(160, 'a', b'x' * 1000)
+        cache.put(160, 'b', b'x' * 1000)
+        old = time.time() - 60
+        os.utime(cache.path_for(160, 'b'), (old, old))
+        os.utime(cache.path_for(160, 'a'), (old - 10, old - 10))
+        # Un acierto marca 'a' como usada recientemente
+        cache.get(160, 'a')
+        
+        cache.put(160, 'c', b'x' * 1000)
+        
+        assert cache.get(160, 'a') is not None
+        assert cache.get(160, 'b') is None
+        assert cache.get(160, 'c') is not None
+    
+    def test_transparent_png_flattened(self):
+        """Verifica que un PNG con transparencia se convierte a JPEG."""
+        buffer = io.BytesIO()
+        Image.new('RGBA', (100, 50), (0, 0, 0, 0)).save(buffer, 'PNG')
+        
+        variants = resize_variants(buffer.getvalue(), [40])
+        
+        assert Image.open(io.BytesIO(variants[40])).size == (40, 20)
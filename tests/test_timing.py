@@ -0,0 +1,49 @@
+"""
+Tests para la cabecera Server-Timing.
+"""
+import json
+from unittest.mock import patch
+from app import create_app
+from app.config import TestingConfig
+
+
+class TestServerTiming:
+    """Tests para la instrumentación por etapas."""
+    
+    def test_view_reports_stage_spans(self, client):
+        """Verifica que /pokenea reporta las etapas del camino caliente."""
+        response = client.get('/pokenea')
+        header = response.headers['Server-Timing']
+        names = [entry.split(';')[0] for entry in header.split(', ')]
+        
+        assert names[:3] == ['service', 'storage', 'cache']
+        assert names[-1] == 'total'
+    
+    def test_uncached_view_reports_render(self, app, client):
+        """Verifica que un render real aparece como etapa."""
+        app.config['PAGE_CACHE_ENABLED'] = False
+        
+        response = client.get('/pokenea')
+        
+        assert 'render;dur=' in response.headers['Server-Timing']
+    
+    def test_timing_can_be_disabled(self):
+        """Verifica que SERVER_TIMING_ENABLED=False quita la cabecera."""
+        with patch.object(TestingConfig, 'SERVER_TIMING_ENABLED', False):
+            app = create_app('testing')
+        
+        response = app.test_client().get('/api/pokenea')
+        
+        assert 'Server-Timing' not in response.headers
+    
+    def test_structured_log_line(self, app, client):
+        """Verifica que SERVER_TIMING_LOG emite una línea JSON por petición."""
+        app.config['SERVER_TIMING_LOG'] = True
+        
+        with patch.object(app.logger, 'info') as mock_info:
+            client.get('/api/pokenea')
+        
+        entry = json.loads(mock_info.call_args.args[0])
+        assert entry['event'] == 'request_timing'
+        assert entry['path'] == '/api/pokenea'
+        assert 'service' in entry['spans']